@@ -0,0 +1,121 @@
+"""
+Load test for the JSON HTTP API (coterm.server).
+
+Starts ``python -m coterm.server`` on a free port, then runs each scenario
+with several client threads, each on its own keep-alive connection, and
+prints request latency percentiles and throughput. Every request prices a
+different quote, so nothing is answered from the calculation cache. The
+"new connection" row opens a connection per request, to show what
+keep-alive saves.
+
+    python benchmarks/bench_api.py [requests per scenario] [clients] [server workers]
+"""
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BATCH_SIZE = 25
+
+
+def quote(i, billing_term="Annual"):
+    """A 10-line quote; i makes every quote different."""
+    return {
+        "line_items": [
+            {"description": f"Service {n}", "quantity": 10 + n + i, "annual_unit_fee": 120.0 + 7 * n,
+             "additional_licenses": n % 4}
+            for n in range(10)
+        ],
+        "agreement_term": 36,
+        "months_remaining": 20.5,
+        "extension_months": 12,
+        "billing_term": billing_term,
+    }
+
+
+SCENARIOS = [
+    ("calculate", "/v1/calculate", lambda i: quote(i), True),
+    ("calculate, new connection", "/v1/calculate", lambda i: quote(i), False),
+    (f"calculate x{BATCH_SIZE} batch", "/v1/calculate",
+     lambda i: [quote(i * BATCH_SIZE + n) for n in range(BATCH_SIZE)], True),
+    ("months-remaining", "/v1/months-remaining",
+     lambda i: {"co_termed_start_date": "2026-01-01", "agreement_start_date": f"2024-{1 + i % 12:02d}-15",
+                "agreement_term": 36}, True),
+    ("email", "/v1/email", lambda i: quote(i, "Monthly"), True),
+    ("pdf", "/v1/pdf", lambda i: quote(i, "Prepaid"), True),
+]
+
+
+def start_server(workers):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "coterm.server", "--port", "0", "--quiet", "--workers", str(workers)],
+        cwd=ROOT, stdout=subprocess.PIPE, text=True
+    )
+    banner = server.stdout.readline()  # "Serving the co-terming API on http://127.0.0.1:PORT/v1/ ..."
+    port = int(banner.split("http://")[1].split("/")[0].rsplit(":", 1)[1])
+    return server, port
+
+
+def run_client(port, path, bodies, keep_alive, latencies):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    for body in bodies:
+        payload = json.dumps(body)
+        started = time.perf_counter()
+        connection.request("POST", path, payload, {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        response.read()
+        latencies.append((time.perf_counter() - started) * 1000)
+        if response.status != 200:
+            raise RuntimeError(f"{path} returned {response.status}")
+        if not keep_alive:
+            connection.close()
+    connection.close()
+
+
+def run_scenario(port, path, make_body, keep_alive, num_requests, clients, first=0):
+    bodies = [make_body(i) for i in range(first, first + num_requests)]
+    latencies = []
+    threads = [
+        threading.Thread(target=run_client, args=(port, path, bodies[c::clients], keep_alive, latencies))
+        for c in range(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return np.percentile(latencies, [50, 90, 99]), max(latencies), num_requests / elapsed
+
+
+def main():
+    num_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    server, port = start_server(workers)
+    try:
+        # Warm up imports and the worker threads
+        for path in ("/v1/calculate", "/v1/email", "/v1/pdf"):
+            run_scenario(port, path, lambda i: quote(-1 - i), True, 4 * clients, clients)
+
+        print(f"{num_requests} requests per scenario, {clients} clients, {workers} server workers")
+        print(f"{'scenario':>26}  {'p50 ms':>7}  {'p90 ms':>7}  {'p99 ms':>7}  {'max ms':>7}  {'req/s':>7}")
+        for index, (name, path, make_body, keep_alive) in enumerate(SCENARIOS):
+            # Each scenario gets its own quotes, so none are in the cache from an earlier one
+            (p50, p90, p99), worst, rate = run_scenario(port, path, make_body, keep_alive, num_requests, clients,
+                                                        first=index * BATCH_SIZE * num_requests)
+            print(f"{name:>26}  {p50:>7.2f}  {p90:>7.2f}  {p99:>7.2f}  {worst:>7.2f}  {rate:>7.1f}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
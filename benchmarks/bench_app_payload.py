@@ -0,0 +1,73 @@
+"""
+Streamlit rerun payload benchmark.
+
+Runs app.py headlessly with streamlit.testing (AppTest) and reports, for a
+full-script rerun of the calculator page with a calculated quote, the bytes
+of the messages sent to the browser and the server time of the rerun. It
+reports both stylesheet modes: served from static/ (the default in
+.streamlit/config.toml) and inlined (static serving off).
+
+    python benchmarks/bench_app_payload.py [path/to/app.py] [reruns]
+
+Pass another checkout's app.py to compare against it.
+"""
+import os
+import statistics
+import sys
+import time
+
+from streamlit import config
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+
+def recording_payloads():
+    """Patches the test script runner to record the serialized size of each run's messages."""
+    payloads = []
+    run = LocalScriptRunner.run
+
+    def recording_run(self, *args, **kwargs):
+        tree = run(self, *args, **kwargs)
+        payloads.append(sum(msg.ByteSize() for msg in self.forward_msgs()))
+        return tree
+
+    LocalScriptRunner.run = recording_run
+    return payloads
+
+
+def measure(app_path, reruns, payloads):
+    at = AppTest.from_file(app_path, default_timeout=120)
+    at.run()
+    at.text_input(key="service_0").input("Webex Suite")
+    at.number_input(key="fee_0").set_value(147.96)
+    at.run()
+    [b for b in at.button if b.label == "Calculate Costs"][0].click().run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+    del payloads[:]
+    times = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        at.run()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(payloads), statistics.median(times)
+
+
+def main():
+    app_path = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+    reruns = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    os.chdir(os.path.dirname(app_path))  # the app reads logo.png and static/ relative to its directory
+    payloads = recording_payloads()
+
+    print(f"{app_path}, median of {reruns} full reruns")
+    print(f"{'stylesheet':>12}  {'payload bytes':>13}  {'rerun ms':>8}")
+    for mode, static_serving in (("served", True), ("inlined", False)):
+        config.set_option("server.enableStaticServing", static_serving)
+        payload, rerun_ms = measure(app_path, reruns, payloads)
+        print(f"{mode:>12}  {payload:>13,.0f}  {rerun_ms:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
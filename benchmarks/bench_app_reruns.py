@@ -0,0 +1,97 @@
+"""
+Streamlit interaction latency benchmark.
+
+Drives app.py headlessly with streamlit.testing (AppTest), loads a quote of
+line items and calculates it, then times one widget interaction per tab two
+ways: as a full-script rerun (how every interaction ran before the tabs were
+fragments) and as a rerun scoped to that tab's fragment (what the browser
+asks for when a widget inside an st.fragment changes). AppTest only ever
+requests full reruns, so the scoped rerun is requested by patching the
+RerunData it sends with the fragment's id.
+
+    python benchmarks/bench_app_reruns.py [line_items] [repeats]
+"""
+import contextlib
+import functools
+import os
+import statistics
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import local_script_runner
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+# Tab (in the order the fragments register), then the interaction timed on it
+INTERACTIONS = [
+    ("Agreement Info", lambda at, i: at.number_input(key="agreement_term").set_value(36 + 12 * (i % 2))),
+    ("Licensing", lambda at, i: at.number_input(key="qty_0").set_value(5 + i % 2)),
+    ("Results", lambda at, i: at.checkbox(key="integer_cents").set_value(i % 2 == 0)),
+    ("Email Template", lambda at, i: at.text_input(key="email_subject").input(f"Co-Term quote v{i}")),
+]
+
+
+@contextlib.contextmanager
+def scoped_to(fragment_id):
+    """Makes the next AppTest run a rerun of one fragment instead of the whole script."""
+    original = local_script_runner.RerunData
+    local_script_runner.RerunData = functools.partial(original, fragment_id_queue=[fragment_id])
+    try:
+        yield
+    finally:
+        local_script_runner.RerunData = original
+
+
+def fragment_ids(at):
+    """The app's fragment ids in registration order (one per tab)."""
+    sequence = at._fragment_storage._registration_sequence_by_id
+    return sorted(sequence, key=sequence.get)
+
+
+def loaded_app(num_items):
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.run()
+    [n for n in at.number_input if n.label == "Number of Line Items:"][0].set_value(num_items).run()
+    for i in range(num_items):
+        at.text_input(key=f"service_{i}").input(f"Service {i}")
+        at.number_input(key=f"fee_{i}").set_value(120.0 + i)
+    at.run()
+    [b for b in at.button if b.label == "Calculate Costs"][0].click().run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return at
+
+
+def timed_ms(at, interact, i, fragment_id=None):
+    interact(at, i)
+    started = time.perf_counter()
+    if fragment_id is None:
+        at.run()
+    else:
+        with scoped_to(fragment_id):
+            at.run()
+    elapsed = (time.perf_counter() - started) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    # A scoped run only returns the fragment's elements; rebuild the full page untimed
+    at.run()
+    return elapsed
+
+
+def main():
+    num_items = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    at = loaded_app(num_items)
+    ids = fragment_ids(at)
+
+    print(f"{num_items} line items, median of {repeats} interactions")
+    print(f"{'tab':>15}  {'full rerun ms':>13}  {'fragment ms':>11}  {'speedup':>7}")
+    for (tab, interact), fragment_id in zip(INTERACTIONS, ids):
+        full = statistics.median(timed_ms(at, interact, i) for i in range(repeats))
+        scoped = statistics.median(timed_ms(at, interact, i, fragment_id) for i in range(repeats))
+        print(f"{tab:>15}  {full:>13.1f}  {scoped:>11.1f}  {full / scoped:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
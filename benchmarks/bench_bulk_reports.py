@@ -0,0 +1,62 @@
+"""
+Bulk PDF report benchmark.
+
+Prices a synthetic portfolio of 1,000 agreements with calculate_portfolio and
+renders every PDF report with generate_pdfs, at 1, 2, 4, ... worker processes
+up to the CPU count, printing throughput and speedup over one worker.
+
+    python benchmarks/bench_bulk_reports.py [agreements]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coterm import BILLING_TERMS, calculate_portfolio, generate_pdfs  # noqa: E402
+from coterm.batch import split_portfolio  # noqa: E402
+
+
+def synthetic_portfolio(num_agreements, lines_per_agreement=8):
+    rng = np.random.default_rng(7)
+    rows = num_agreements * lines_per_agreement
+    agreement = np.repeat(np.arange(num_agreements), lines_per_agreement)
+    start = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 700, num_agreements), unit="D")
+    term = rng.choice([12, 24, 36, 60], num_agreements)
+    return pd.DataFrame({
+        "Agreement ID": [f"AG-{i:05d}" for i in agreement],
+        "Agreement Start Date": start[agreement],
+        "Agreement Term": term[agreement],
+        "Co-Termed Start Date": start[agreement] + pd.Timedelta(days=200),
+        "Billing Term": np.array(BILLING_TERMS)[agreement % len(BILLING_TERMS)],
+        "Extension Months": 12,
+        "Cloud Service Description": [f"Service {i % lines_per_agreement}" for i in range(rows)],
+        "Unit Quantity": rng.integers(1, 500, rows),
+        "Annual Unit Fee": rng.integers(1000, 300000, rows) / 100,
+        "Additional Licenses": rng.integers(0, 40, rows),
+    })
+
+
+def main():
+    num_agreements = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    lines, totals = calculate_portfolio(synthetic_portfolio(num_agreements))
+    reports = list(split_portfolio(lines, totals))
+
+    cpu_count = os.cpu_count() or 1
+    worker_counts = sorted({1, cpu_count} | {2 ** i for i in range(1, 8) if 2 ** i < cpu_count})
+    print(f"{num_agreements} agreements, {cpu_count} CPU(s)")
+    print(f"{'workers':>7}  {'seconds':>8}  {'reports/s':>10}  {'speedup':>8}")
+    baseline = None
+    for workers in worker_counts:
+        started = time.perf_counter()
+        rendered = sum(report.error is None for report in generate_pdfs(reports, workers=workers))
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        print(f"{workers:>7}  {elapsed:>8.2f}  {rendered / elapsed:>10.1f}  {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Server-side chart image benchmark.
+
+Draws the cost comparison chart for 500 distinct quotes per billing term as
+PNG bytes (the same image goes into emails and PDF reports), then times
+generate_pdf with and without the chart. Every quote has different totals,
+so nothing is served from chart_cache.
+
+    python benchmarks/bench_chart_images.py [quotes]
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coterm import BILLING_TERMS, calculate_costs, generate_pdf  # noqa: E402
+from coterm.charts import chart_cache, cost_chart_data, render_chart_png  # noqa: E402
+
+
+def quotes(num_quotes, billing_term):
+    for i in range(num_quotes):
+        data = pd.DataFrame({
+            "Cloud Service Description": ["Calling", "Meetings", "Contact Center"],
+            "Unit Quantity": [100 + i, 50, 10 + i % 40],
+            "Annual Unit Fee": [147.96, 220.0 + i, 1800.0],
+            "Additional Licenses": [i % 9, 3, 1],
+        })
+        yield calculate_costs(data, 36, 20.5, 12, billing_term)
+
+
+def per_quote_ms(function, items):
+    started = time.perf_counter()
+    for item in items:
+        function(item)
+    return (time.perf_counter() - started) * 1000 / len(items)
+
+
+def main():
+    num_quotes = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print(f"{'term':>8}  {'png ms':>7}  {'pdf ms':>7}  {'pdf+chart ms':>12}")
+    for billing_term in BILLING_TERMS:
+        results = list(quotes(num_quotes, billing_term))
+        charts = [cost_chart_data(result) for result in results]
+        png = per_quote_ms(lambda data: render_chart_png(data, billing_term), charts)
+        plain = per_quote_ms(lambda result: generate_pdf(result, include_chart=False), results)
+        # Start from an empty cache so every report draws its chart
+        chart_cache.clear()
+        charted = per_quote_ms(lambda result: generate_pdf(result), results)
+        print(f"{billing_term:>8}  {png:>7.2f}  {plain:>7.2f}  {charted:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Bulk report job queue benchmark.
+
+Builds a synthetic portfolio and renders every agreement's PDF report two
+ways: synchronously with write_pdf_reports (what a Streamlit script thread
+would have to sit through) and as a BulkReportQueue job. For the job it
+reports how long submit() holds the caller, how long until the first
+progress update, and the end-to-end time including emails.
+
+    python benchmarks/bench_job_queue.py [agreements] [workers]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coterm import BulkReportQueue, calculate_portfolio, write_pdf_reports  # noqa: E402
+from coterm.batch import split_portfolio  # noqa: E402
+
+
+def make_portfolio(num_agreements, items_per_agreement=5, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = num_agreements * items_per_agreement
+    agreement = np.repeat(np.arange(num_agreements), items_per_agreement)
+    start = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, num_agreements), unit="D")
+    return pd.DataFrame({
+        "Agreement ID": [f"AG-{i}" for i in agreement],
+        "Agreement Start Date": start[agreement],
+        "Agreement Term": np.repeat(rng.choice([36, 60], num_agreements), items_per_agreement),
+        "Co-Termed Start Date": pd.Timestamp("2025-06-01"),
+        "Billing Term": np.repeat(rng.choice(["Annual", "Monthly", "Prepaid"], num_agreements), items_per_agreement),
+        "Cloud Service Description": [f"Service {i % items_per_agreement}" for i in range(rows)],
+        "Unit Quantity": rng.integers(1, 200, rows),
+        "Annual Unit Fee": rng.integers(1000, 50000, rows) / 100,
+        "Additional Licenses": rng.integers(0, 20, rows),
+        "Extension Months": 0,
+    })
+
+
+def main():
+    num_agreements = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    portfolio = make_portfolio(num_agreements)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        lines, totals = calculate_portfolio(portfolio)
+        write_pdf_reports(split_portfolio(lines, totals), os.path.join(tmp, "sync"), workers=workers)
+        synchronous = time.perf_counter() - started
+
+        queue = BulkReportQueue(os.path.join(tmp, "jobs"), workers=workers)
+        try:
+            started = time.perf_counter()
+            job_id = queue.submit(portfolio, include_chart=True, emails=True)
+            submitted = time.perf_counter() - started
+            first_progress = None
+            while queue.status(job_id).state not in ("done", "failed", "cancelled"):
+                if first_progress is None and queue.status(job_id).done:
+                    first_progress = time.perf_counter() - started
+                time.sleep(0.01)
+            finished = time.perf_counter() - started
+            status = queue.status(job_id)
+        finally:
+            queue.shutdown()
+
+    print(f"{num_agreements} agreements, {workers} worker process(es)")
+    print(f"synchronous write_pdf_reports: caller blocked {synchronous * 1000:,.0f} ms")
+    print(f"job queue: submit() {submitted * 1000:.1f} ms, first progress {(first_progress or finished) * 1000:,.0f} ms, "
+          f"{status.state} in {finished * 1000:,.0f} ms (PDFs and emails)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Line-item benchmark for a Licensing tab rerun, at 50, 500 and 5,000 items.
+
+First times line-item assembly: turning the widget values into the
+DataFrame handed to calculate_costs, with the old per-row pd.concat loop
+against LineItemBuffer, each followed by calculate_costs. Then times whole
+reruns of app.py driven headlessly with streamlit.testing (AppTest), widget
+rendering included: a full-script rerun and a rerun of the Licensing
+fragment after one quantity is edited, in Form mode (four widgets per item)
+and Grid mode (one data editor).
+
+    python benchmarks/bench_line_items.py [item counts ...]
+
+AppTest parses every element of every run, which makes Form mode with
+thousands of items too slow to measure (500 items already takes seconds per
+rerun); Form mode is skipped above FORM_MAX_ITEMS.
+"""
+import os
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coterm import LINE_ITEM_COLUMNS, LineItemBuffer, calculate_costs  # noqa: E402
+from bench_app_reruns import APP_PATH, fragment_ids, scoped_to  # noqa: E402
+
+RERUN_REPEATS = 3
+FORM_MAX_ITEMS = 500
+
+
+def widget_values(num_items):
+    return [(f"Service {i}", 10 + i % 50, 120.0 + i % 7, i % 3) for i in range(num_items)]
+
+
+def build_with_concat(values):
+    data = pd.DataFrame(columns=LINE_ITEM_COLUMNS)
+    for service, qty, fee, add_lic in values:
+        row_data = {
+            "Cloud Service Description": service,
+            "Unit Quantity": qty,
+            "Annual Unit Fee": fee,
+            "Additional Licenses": add_lic,
+        }
+        data = pd.concat([data, pd.DataFrame([row_data])], ignore_index=True)
+    return data
+
+
+def build_with_buffer(values):
+    line_items = LineItemBuffer()
+    for service, qty, fee, add_lic in values:
+        line_items.append(service, qty, fee, add_lic)
+    return line_items.to_frame()
+
+
+def time_rerun(build, values, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        data = build(values)
+        calculate_costs(data, 36, 30.5, 12, "Annual")
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def loaded_app(num_items, entry_mode):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    if entry_mode == "Grid":
+        at.session_state["line_item_entry_mode"] = "Grid"
+        at.session_state["grid_line_items"] = build_with_buffer(widget_values(num_items))
+        at.run()
+    else:
+        at.run()
+        [n for n in at.number_input if n.label == "Number of Line Items:"][0].set_value(num_items).run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return at
+
+
+def edit_quantity(at, entry_mode, i):
+    if entry_mode == "Grid":
+        # What the data editor sends back after a cell edit
+        at.session_state["line_item_grid"] = {"edited_rows": {0: {"Unit Quantity": 20 + i % 2}},
+                                              "added_rows": [], "deleted_rows": []}
+    else:
+        at.number_input(key="qty_0").set_value(5 + i % 2)
+
+
+def time_app_rerun(at, entry_mode, fragment_id=None):
+    times = []
+    for i in range(RERUN_REPEATS):
+        edit_quantity(at, entry_mode, i)
+        started = time.perf_counter()
+        if fragment_id is None:
+            at.run()
+        else:
+            with scoped_to(fragment_id):
+                at.run()
+        times.append(time.perf_counter() - started)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        at.run()  # A scoped run only returns the fragment's elements; rebuild the page untimed
+    return statistics.median(times)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [50, 500, 5000]
+    os.chdir(os.path.dirname(APP_PATH))  # the app reads static/ relative to its directory
+
+    print("Line-item assembly + calculate_costs (no widgets)")
+    print(f"{'items':>6}  {'pd.concat loop':>15}  {'LineItemBuffer':>15}  {'speedup':>8}")
+    for num_items in sizes:
+        values = widget_values(num_items)
+        repeat = 5 if num_items < 5000 else 1
+        old = time_rerun(build_with_concat, values, repeat)
+        new = time_rerun(build_with_buffer, values, repeat)
+        print(f"{num_items:>6}  {old * 1000:>12.1f} ms  {new * 1000:>12.1f} ms  {old / new:>7.1f}x")
+
+    print()
+    print(f"app.py rerun after editing one quantity (AppTest, median of {RERUN_REPEATS})")
+    print(f"{'items':>6}  {'mode':>5}  {'full rerun':>13}  {'Licensing fragment':>18}")
+    for num_items in sizes:
+        for entry_mode in ("Form", "Grid"):
+            if entry_mode == "Form" and num_items > FORM_MAX_ITEMS:
+                print(f"{num_items:>6}  {entry_mode:>5}  {'skipped':>13}  {'skipped':>18}")
+                continue
+            at = loaded_app(num_items, entry_mode)
+            full = time_app_rerun(at, entry_mode)
+            scoped = time_app_rerun(at, entry_mode, fragment_ids(at)[1])
+            print(f"{num_items:>6}  {entry_mode:>5}  {full * 1000:>10.1f} ms  {scoped * 1000:>15.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
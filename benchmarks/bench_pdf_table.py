@@ -0,0 +1,44 @@
+"""
+PDF detail table benchmark.
+
+Times generate_pdf for one quote of 1,000 and 10,000 line items per billing
+term; nearly all of that is the "Detailed Service Information" table. Half of
+the service descriptions are long enough to wrap.
+
+    python benchmarks/bench_pdf_table.py
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coterm import BILLING_TERMS, calculate_costs, generate_pdf  # noqa: E402
+
+
+def line_items(num_items):
+    long_name = "Webex Calling Professional Named User License with Extended Support"
+    return pd.DataFrame({
+        "Cloud Service Description": [long_name if i % 2 else f"Service {i}" for i in range(num_items)],
+        "Unit Quantity": [10 + i % 500 for i in range(num_items)],
+        "Annual Unit Fee": [120.0 + i % 3000 for i in range(num_items)],
+        "Additional Licenses": [i % 7 for i in range(num_items)],
+    })
+
+
+def main():
+    print(f"{'items':>6}  {'term':>8}  {'seconds':>8}  {'pages':>6}")
+    for num_items in (1000, 10000):
+        data = line_items(num_items)
+        for billing_term in BILLING_TERMS:
+            result = calculate_costs(data, 36, 20.5, 12, billing_term)
+            started = time.perf_counter()
+            pdf = generate_pdf(result).getvalue()
+            elapsed = time.perf_counter() - started
+            print(f"{num_items:>6}  {billing_term:>8}  {elapsed:>8.2f}  {pdf.count(b'/Type /Page') - 1:>6}")
+
+
+if __name__ == "__main__":
+    main()
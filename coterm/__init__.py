@@ -0,0 +1,81 @@
+"""
+Headless co-terming cost calculator.
+
+The cost engine, PDF report and email template used by the Streamlit app,
+importable without Streamlit. Submodules are loaded on first use so that
+``import coterm`` stays cheap; pandas and fpdf are only imported when a
+function that needs them is accessed.
+"""
+import importlib
+
+_EXPORTS = {
+    "BILLING_TERMS": "engine",
+    "LINE_ITEM_COLUMNS": "engine",
+    "conditional_round": "engine",
+    "calculate_co_termed_months_remaining": "engine",
+    "calculate_costs": "engine",
+    "CalculationResult": "engine",
+    "calculate_all_billing_terms": "engine",
+    "compare_billing_terms": "engine",
+    "COMPARISON_COLUMNS": "engine",
+    "MONTH_CONVENTIONS": "dates",
+    "co_termed_months_remaining": "dates",
+    "LineItemBuffer": "line_items",
+    "normalize_line_items": "line_items",
+    "calculate_portfolio": "batch",
+    "PORTFOLIO_COLUMNS": "batch",
+    "sweep_scenarios": "sweep",
+    "DEFAULT_SWEEP_METRIC": "sweep",
+    "CalculationCache": "cache",
+    "LRUCache": "cache",
+    "report_cache": "cache",
+    "calculation_cache": "cache",
+    "calculation_key": "cache",
+    "asset_cache": "assets",
+    "read_asset": "assets",
+    "pdf_image_info": "assets",
+    "StaticAsset": "assets",
+    "static_asset": "assets",
+    "build_static_asset": "assets",
+    "minify_css": "assets",
+    "COST_CHART_SERIES": "charts",
+    "chart_cache": "charts",
+    "cost_chart_data": "charts",
+    "render_chart_png": "charts",
+    "cached_calculate_costs": "cache",
+    "IncrementalCalculator": "incremental",
+    "to_cents": "money",
+    "dollars": "money",
+    "format_money": "money",
+    "money_formatter": "money",
+    "iter_bom_chunks": "importer",
+    "read_bom": "importer",
+    "stream_bom_costs": "importer",
+    "combine_results": "importer",
+    "map_bom_columns": "importer",
+    "generate_pdf": "report",
+    "generate_pdfs": "bulk",
+    "write_pdf_reports": "bulk",
+    "read_portfolio": "cli",
+    "BulkReportQueue": "jobs",
+    "JobQueueFull": "jobs",
+    "JobStatus": "jobs",
+    "JobStore": "jobs",
+    "bulk_report_queue": "jobs",
+    "generate_email_template": "email_template",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
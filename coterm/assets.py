@@ -0,0 +1,137 @@
+"""
+Process-wide cache for branding images and other static files.
+
+Files are read (and, for PDF images, parsed by fpdf; for stylesheets,
+minified and hashed) once per process and shared by every
+report, bulk job and Streamlit session. Entries are keyed by the file's
+path, modification time and size, so replacing logo.png or static/app.css
+on disk is picked up on the next use without a restart.
+"""
+import collections
+import hashlib
+import os
+import re
+import tempfile
+
+from .cache import LRUCache
+
+
+asset_cache = LRUCache(maxsize=32)
+
+# A static text file after minification, with a short hash of its content for cache-busting file names
+StaticAsset = collections.namedtuple("StaticAsset", ["text", "digest"])
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_WHITESPACE = re.compile(r"\s+")
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+
+
+def _asset_key(kind, path):
+    """(kind, real path, mtime, size) for an existing file, or None if it can't be found."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return kind, os.path.realpath(path), stat.st_mtime_ns, stat.st_size
+
+
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def read_asset(path):
+    """The file's bytes, read once per version of the file; None if it doesn't exist."""
+    key = _asset_key("bytes", path)
+    if key is None:
+        return None
+    return asset_cache.get_or_create(key, lambda: _read_bytes(path))
+
+
+def _parse_image(path):
+    # fpdf parses an image the first time a document places it; do that once in a scratch document
+    from fpdf import FPDF
+    scratch = FPDF()
+    scratch.add_page()
+    scratch.image(path, x=0, y=0, w=1)
+    return scratch.images[path]
+
+
+def pdf_image_info(path):
+    """
+    fpdf's parsed form of an image file (dimensions, colour space, compressed data).
+
+    Returns None if the file doesn't exist. Treat the dict as read-only and
+    place it with PDF.cached_image, which gives each document its own copy.
+    """
+    key = _asset_key("pdf_image", path)
+    if key is None:
+        return None
+    return asset_cache.get_or_create(key, lambda: _parse_image(path))
+
+
+def minify_css(css):
+    """Drops comments and insignificant whitespace from a stylesheet."""
+    css = _CSS_COMMENT.sub("", css)
+    css = _CSS_WHITESPACE.sub(" ", css)
+    css = _CSS_PUNCTUATION.sub(r"\1", css)
+    return css.replace(": ", ":").replace(";}", "}").strip()
+
+
+def _build_static_asset(path, minify):
+    text = _read_bytes(path).decode("utf-8")
+    if minify is not None:
+        text = minify(text)
+    return StaticAsset(text, hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest())
+
+
+def static_asset(path, minify=None):
+    """
+    A text file as a StaticAsset, minified with ``minify`` (e.g. minify_css) and
+    hashed once per version of the file; None if it doesn't exist.
+    """
+    key = _asset_key(("static", getattr(minify, "__name__", None)), path)
+    if key is None:
+        return None
+    return asset_cache.get_or_create(key, lambda: _build_static_asset(path, minify))
+
+
+def _write_static_asset(path, build_dir, minify):
+    asset = static_asset(path, minify)
+    stem, extension = os.path.splitext(os.path.basename(path))
+    name = f"{stem}.{asset.digest}{extension}"
+    target = os.path.join(build_dir, name)
+    if not os.path.exists(target):
+        try:
+            os.makedirs(build_dir, exist_ok=True)
+            # Write then rename, so a concurrent reader never sees a partial file
+            descriptor, partial = tempfile.mkstemp(dir=build_dir, suffix=".tmp")
+            with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+                f.write(asset.text)
+            os.replace(partial, target)
+        except OSError:
+            return None
+    return name
+
+
+def build_static_asset(path, build_dir, minify=None):
+    """
+    Writes the minified file to ``build_dir`` as ``<name>.<digest><ext>``, once per version.
+
+    A browser can cache the result forever, because any change gets a new name.
+
+    Parameters:
+    -----------
+    path: str - The source file, e.g. "static/app.css"
+    build_dir: str - Where the hashed copy goes, e.g. "static/build"
+    minify: callable - Applied to the file's text before hashing (optional)
+
+    Returns:
+    --------
+    str - The hashed file's name inside ``build_dir``, or None if the source is
+    missing or ``build_dir`` can't be written (a read-only deployment, say)
+    """
+    key = _asset_key(("built", os.path.realpath(build_dir), getattr(minify, "__name__", None)), path)
+    if key is None:
+        return None
+    return asset_cache.get_or_create(key, lambda: _write_static_asset(path, build_dir, minify))
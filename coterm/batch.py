@@ -0,0 +1,129 @@
+"""
+Portfolio batch mode: co-term many agreements in one call.
+
+Takes a long-format table with one row per line item and the agreement's
+details repeated on every row, and prices every agreement in one pass over
+the columns instead of calling calculate_costs once per agreement.
+"""
+from typing import Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .dates import co_termed_months_remaining
+from .engine import (BILLING_TERMS, COST_COLUMNS, LINE_ITEM_COLUMNS, TOTAL_COLUMNS, TOTAL_SOURCES, CalculationResult,
+                     _cost_columns, _totals_record)
+
+
+AGREEMENT_COLUMNS = ["Agreement ID", "Agreement Start Date", "Agreement Term", "Co-Termed Start Date", "Billing Term"]
+
+PORTFOLIO_COLUMNS = AGREEMENT_COLUMNS + LINE_ITEM_COLUMNS
+
+
+def calculate_portfolio(df: pd.DataFrame, convention: str = "30.44") -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Prices every agreement in a long-format portfolio table.
+
+    Parameters:
+    -----------
+    df: DataFrame - One row per line item with PORTFOLIO_COLUMNS. The agreement
+        columns are read from the first row of each agreement. An optional
+        "Extension Months" column defaults to 0.
+    convention: str - Months-remaining day-count convention, see
+        co_termed_months_remaining (default "30.44")
+
+    Returns:
+    --------
+    (lines, totals): the line items with the calculate_costs result columns
+    plus "Months Remaining" and "Extension Months", and one row per agreement
+    (indexed by "Agreement ID") with its terms and TOTAL_COLUMNS. Each
+    agreement's numbers match calculate_costs run on that agreement alone.
+    """
+    missing = [col for col in PORTFOLIO_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"calculate_portfolio(): missing columns {missing}")
+    if df["Agreement ID"].isna().any():
+        raise ValueError("calculate_portfolio(): every line item needs an Agreement ID")
+
+    lines = df.copy()
+    if "Extension Months" not in lines.columns:
+        lines["Extension Months"] = 0
+
+    for col in ["Agreement Term", "Extension Months", "Unit Quantity", "Annual Unit Fee", "Additional Licenses"]:
+        lines[col] = pd.to_numeric(lines[col], errors='coerce').fillna(0)
+    lines["Cloud Service Description"] = lines["Cloud Service Description"].astype(str)
+
+    # Agreement-level terms come from each agreement's first row
+    agreement_ids = lines["Agreement ID"]
+    agreements = lines.groupby(agreement_ids, sort=False)[AGREEMENT_COLUMNS[1:] + ["Extension Months"]].first()
+
+    unknown_terms = set(agreements["Billing Term"]) - set(BILLING_TERMS)
+    if unknown_terms:
+        raise ValueError(f"calculate_portfolio(): unknown billing terms {sorted(unknown_terms)}")
+
+    agreements["Months Remaining"] = co_termed_months_remaining(
+        agreements["Co-Termed Start Date"], agreements["Agreement Start Date"], agreements["Agreement Term"],
+        convention
+    )
+    for col in ["Agreement Term", "Billing Term", "Months Remaining", "Extension Months"]:
+        lines[col] = agreement_ids.map(agreements[col])
+
+    # One vectorized pass per billing term over every agreement that uses it
+    billing = lines["Billing Term"]
+    cost_columns = {}
+    for billing_term in BILLING_TERMS:
+        in_term = (billing == billing_term).to_numpy()
+        if not in_term.any():
+            continue
+        group = lines[in_term]
+        columns = _cost_columns(group["Unit Quantity"], group["Annual Unit Fee"], group["Additional Licenses"],
+                                group["Agreement Term"], group["Months Remaining"], group["Extension Months"],
+                                billing_term)
+        for col, values in columns.items():
+            cost_columns.setdefault(col, np.full(len(lines), np.nan))[in_term] = np.asarray(values, dtype=float)
+    for col, values in cost_columns.items():
+        lines[col] = values
+
+    # Pick each line's contribution to the agreement totals, then sum per agreement
+    contributions = {}
+    for total_col in TOTAL_COLUMNS:
+        values = np.zeros(len(lines))
+        for billing_term, sources in TOTAL_SOURCES.items():
+            source = sources[total_col]
+            if source is not None and source in lines.columns:
+                values = np.where((billing == billing_term).to_numpy(), lines[source].to_numpy(dtype=float), values)
+        contributions[total_col] = values
+
+    # Sum each agreement's contiguous block with ndarray.sum(), the same pairwise
+    # summation Series.sum() uses, so totals match calculate_costs to the last bit
+    codes = pd.Index(agreements.index).get_indexer(agreement_ids)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(agreements) + 1))
+    blocks = list(zip(bounds[:-1], bounds[1:]))
+
+    totals = agreements[["Billing Term", "Agreement Term", "Months Remaining", "Extension Months"]].copy()
+    for col in TOTAL_COLUMNS:
+        values = contributions[col][order]
+        totals[col] = [values[start:end].sum() for start, end in blocks]
+    return lines, totals
+
+
+def split_portfolio(lines: pd.DataFrame, totals: pd.DataFrame) -> Iterator[Tuple[object, CalculationResult]]:
+    """
+    Yields (agreement_id, result) for each agreement in calculate_portfolio's
+    output, where result is the CalculationResult calculate_costs would have
+    returned for that agreement, ready for generate_pdf and generate_email_template.
+    """
+    for agreement_id, group in lines.groupby("Agreement ID", sort=False):
+        agreement = totals.loc[agreement_id]
+        billing_term = agreement["Billing Term"]
+        line_items = group[LINE_ITEM_COLUMNS + COST_COLUMNS[billing_term]].reset_index(drop=True)
+        yield agreement_id, CalculationResult(
+            line_items, _totals_record(line_items, billing_term), billing_term,
+            agreement["Agreement Term"], agreement["Months Remaining"], agreement["Extension Months"],
+            total_current_cost=agreement["Total Current Cost"],
+            total_prepaid_cost=agreement["Total Prepaid Cost"],
+            total_first_year_cost=agreement["Total First Year Cost"],
+            total_updated_annual_cost=agreement["Total Updated Annual Cost"],
+            total_subscription_term_fee=agreement["Total Subscription Term Fee"],
+        )
@@ -0,0 +1,236 @@
+"""
+Bulk PDF report generation across worker processes.
+
+generate_pdf is CPU-bound FPDF work, so reports for a portfolio are rendered
+in a ProcessPoolExecutor. Agreements are sent to the workers in chunks, with
+a bounded number of chunks in flight so a large portfolio never sits in
+memory all at once, and results come back in input order. Each report can
+be given a time limit; a report that fails or runs over is recorded as an
+error instead of stopping the run.
+"""
+import collections
+import contextlib
+import hashlib
+import multiprocessing
+import os
+import re
+import signal
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .engine import CalculationResult
+from .report import generate_pdf
+
+
+DEFAULT_CHUNKSIZE = 8
+
+# (agreement ID, PDF bytes or None, error message or None)
+RenderedReport = collections.namedtuple("RenderedReport", ["agreement_id", "pdf", "error"])
+
+# (agreement ID, file path or zip member name or None, error message or None)
+ReportOutcome = collections.namedtuple("ReportOutcome", ["agreement_id", "path", "error"])
+
+
+def safe_filename(agreement_id) -> str:
+    """
+    Turns an agreement ID into a string that is safe to use as a file name.
+
+    IDs that had to be changed get a short hash of the original appended, so
+    "ACME/1", "ACME 1" and "ACME:1" don't all become ACME_1 and overwrite
+    each other; IDs that were already safe are kept as they are.
+    """
+    agreement_id = str(agreement_id)
+    name = re.sub(r"[^\w.-]+", "_", agreement_id).strip("._") or "agreement"
+    if name == agreement_id:
+        return name
+    return f"{name}-{hashlib.blake2b(agreement_id.encode('utf-8'), digest_size=4).hexdigest()}"
+
+
+def process_pool(workers) -> ProcessPoolExecutor:
+    """
+    A ProcessPoolExecutor whose workers don't fork this process. Forking a
+    process with other threads running (the API server, Streamlit) can leave
+    a lock held forever in the child, so workers start from a fresh
+    interpreter (forkserver where available, spawn elsewhere).
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+
+class ReportTimeout(Exception):
+    """Raised inside a worker when one report runs past its time limit."""
+
+
+def _on_alarm(signum, frame):
+    raise ReportTimeout()
+
+
+def _can_use_alarm():
+    # SIGALRM only exists on Unix and is only delivered to the main thread
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+def render_report(agreement_id, result, logo_path=None, timeout=None, include_chart=True) -> RenderedReport:
+    """
+    Renders one agreement's PDF report, catching any error (or running past
+    ``timeout`` seconds, where SIGALRM is available) as a RenderedReport with
+    the error message instead. Meant to run in a worker process.
+    """
+    use_alarm = timeout is not None and _can_use_alarm()
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+    try:
+        # The alarm is set and cleared inside the try, so it can't go off where ReportTimeout isn't caught
+        try:
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+            pdf = generate_pdf(result, logo_path=logo_path, include_chart=include_chart)
+        finally:
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        return RenderedReport(agreement_id, pdf.getvalue(), None)
+    except ReportTimeout:
+        return RenderedReport(agreement_id, None, f"timed out after {timeout:g}s")
+    except Exception as e:
+        # Only the message crosses back to the parent; exceptions may not pickle
+        return RenderedReport(agreement_id, None, f"{type(e).__name__}: {e}")
+    finally:
+        if use_alarm:
+            signal.signal(signal.SIGALRM, previous)
+
+
+def _render_chunk(chunk, logo_path, timeout, include_chart):
+    return [render_report(agreement_id, result, logo_path, timeout, include_chart) for agreement_id, result in chunk]
+
+
+def _chunks(reports, chunksize):
+    chunk = []
+    for report in reports:
+        chunk.append(report)
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def submit_chunks(executor, reports, chunksize, max_pending, render, *args):
+    """
+    Submits ``render(chunk, *args)`` to ``executor`` for each chunk of
+    ``reports``, yielding (chunk, future) in input order.
+
+    Only ``max_pending`` chunks are submitted ahead of the one yielded, and
+    the next chunk is read from ``reports`` only when the caller asks for the
+    next future, so the caller should wait for each future before moving on.
+    Closing the generator cancels the chunks that haven't started.
+    """
+    pending = collections.deque()
+    try:
+        for chunk in _chunks(reports, chunksize):
+            pending.append((chunk, executor.submit(render, chunk, *args)))
+            while len(pending) > max_pending:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+def generate_pdfs(reports: Iterable[Tuple[object, CalculationResult]], workers: Optional[int] = None,
+                  chunksize: int = DEFAULT_CHUNKSIZE, timeout: Optional[float] = None,
+                  logo_path: Optional[str] = None, include_chart: bool = True) -> Iterator[RenderedReport]:
+    """
+    Renders PDF reports in worker processes, yielding them in input order.
+
+    Parameters:
+    -----------
+    reports: iterable of (agreement_id, CalculationResult) - Read lazily, chunk by chunk
+    workers: int - Worker processes (default: CPU count); 1 renders in this process
+    chunksize: int - Agreements sent to a worker at a time
+    timeout: float - Seconds allowed per report (optional)
+    logo_path: str - Logo image for every report (optional)
+    include_chart: bool - Add the cost comparison chart to every report (needs Pillow)
+
+    Returns:
+    --------
+    Iterator of RenderedReport(agreement_id, pdf, error): pdf is the PDF bytes,
+    or None with an error message when the report failed or timed out.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers < 1 or chunksize < 1:
+        raise ValueError("generate_pdfs(): workers and chunksize must be at least 1")
+
+    if workers == 1:
+        for chunk in _chunks(reports, chunksize):
+            yield from _render_chunk(chunk, logo_path, timeout, include_chart)
+        return
+
+    # Without SIGALRM in the workers, fall back to a time limit on the whole chunk
+    chunk_timeout = None
+    if timeout is not None and not hasattr(signal, "setitimer"):
+        chunk_timeout = timeout * chunksize
+
+    with process_pool(workers) as executor:
+        # Keep every worker busy with one chunk queued behind it, and no more
+        submitted = submit_chunks(executor, reports, chunksize, 2 * workers, _render_chunk, logo_path, timeout,
+                                  include_chart)
+        with contextlib.closing(submitted):
+            for chunk, future in submitted:
+                yield from _chunk_results(chunk, future, chunk_timeout)
+
+
+def _chunk_results(chunk, future, chunk_timeout):
+    try:
+        return future.result(timeout=chunk_timeout)
+    except FutureTimeoutError:
+        return [RenderedReport(agreement_id, None, f"timed out after {chunk_timeout:g}s")
+                for agreement_id, _ in chunk]
+    except Exception as e:
+        return [RenderedReport(agreement_id, None, f"{type(e).__name__}: {e}") for agreement_id, _ in chunk]
+
+
+def write_pdf_reports(reports: Iterable[Tuple[object, CalculationResult]], output: str,
+                      workers: Optional[int] = None, chunksize: int = DEFAULT_CHUNKSIZE,
+                      timeout: Optional[float] = None, logo_path: Optional[str] = None,
+                      filename=None, include_chart: bool = True) -> List[ReportOutcome]:
+    """
+    Renders reports with generate_pdfs and writes them to a directory or a zip file.
+
+    ``output`` ending in ".zip" is written as a zip archive, anything else is
+    a directory (created if needed). ``filename(agreement_id)`` names each
+    PDF; by default the agreement ID is made safe for use as a file name.
+    Returns a ReportOutcome per agreement, in input order.
+    """
+    if filename is None:
+        filename = safe_filename
+
+    rendered = generate_pdfs(reports, workers=workers, chunksize=chunksize, timeout=timeout,
+                             logo_path=logo_path, include_chart=include_chart)
+    outcomes = []
+    with contextlib.ExitStack() as stack:
+        archive = None
+        if output.lower().endswith(".zip"):
+            if os.path.dirname(output):
+                os.makedirs(os.path.dirname(output), exist_ok=True)
+            archive = stack.enter_context(zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED))
+        else:
+            os.makedirs(output, exist_ok=True)
+
+        for report in rendered:
+            if report.error is not None:
+                outcomes.append(ReportOutcome(report.agreement_id, None, report.error))
+                continue
+            name = f"{filename(report.agreement_id)}.pdf"
+            if archive is not None:
+                archive.writestr(name, report.pdf)
+                path = name
+            else:
+                path = os.path.join(output, name)
+                with open(path, "wb") as f:
+                    f.write(report.pdf)
+            outcomes.append(ReportOutcome(report.agreement_id, path, None))
+    return outcomes
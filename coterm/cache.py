@@ -0,0 +1,110 @@
+"""
+Memoized cost calculations and rendered reports.
+
+Results are keyed by a stable hash of the normalized line items and the
+agreement inputs, held in a bounded LRU and shared by every caller in the
+process, so the Streamlit sessions on one server reuse each other's results.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from .engine import CalculationResult, calculate_costs
+from .line_items import normalize_line_items
+
+
+def calculation_key(df: pd.DataFrame, agreement_term, months_remaining, extension_months, billing_term,
+                    integer_cents=False) -> str:
+    """Stable hash of normalized line items plus the agreement inputs (and the engine mode)."""
+    line_items = normalize_line_items(df)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.util.hash_pandas_object(line_items, index=False).to_numpy().tobytes())
+    digest.update(repr((int(agreement_term), float(months_remaining), int(extension_months),
+                        str(billing_term))).encode())
+    if integer_cents:
+        digest.update(b"integer_cents")
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """Thread-safe bounded LRU cache with hit/miss counters."""
+
+    def __init__(self, maxsize=256):
+        if maxsize < 1:
+            raise ValueError(f"{type(self).__name__}(): maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._results)
+
+    def get_or_create(self, key, factory):
+        """Returns the cached value for ``key``, calling ``factory()`` to build it on a miss."""
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return result
+
+        # Build outside the lock so one slow entry doesn't block other callers
+        result = factory()
+        with self._lock:
+            self.misses += 1
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._results),
+                    "maxsize": self.maxsize}
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class CalculationCache(LRUCache):
+    """LRU cache of calculate_costs results keyed by calculation_key."""
+
+    def calculate(self, df: pd.DataFrame, agreement_term, months_remaining, extension_months,
+                  billing_term, key=None, engine=None) -> CalculationResult:
+        """
+        calculate_costs, answered from the cache when the same quote was seen before.
+        Pass ``key`` if the caller already computed calculation_key for these inputs,
+        and ``engine`` to price cache misses with something other than calculate_costs
+        (such as IncrementalCalculator.calculate).
+        """
+        if key is None:
+            key = calculation_key(df, agreement_term, months_remaining, extension_months, billing_term)
+        if engine is None:
+            engine = calculate_costs
+
+        result = self.get_or_create(key, lambda: engine(
+            normalize_line_items(df), agreement_term, months_remaining, extension_months, billing_term
+        ))
+
+        # Hand out a copy so callers can't modify the cached result
+        return result.copy()
+
+
+# Process-wide caches used by the app
+calculation_cache = CalculationCache()
+report_cache = LRUCache(maxsize=64)  # Rendered PDF bytes
+
+
+def cached_calculate_costs(df, agreement_term, months_remaining, extension_months, billing_term,
+                           key=None, engine=None) -> CalculationResult:
+    """calculate_costs through the process-wide calculation_cache."""
+    return calculation_cache.calculate(df, agreement_term, months_remaining, extension_months, billing_term, key,
+                                       engine)
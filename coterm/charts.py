@@ -0,0 +1,212 @@
+"""
+The cost comparison chart shown under the calculation results.
+
+The app draws it with Altair, which ships with Streamlit, so the chart needs
+no script from a CDN and works offline and behind proxies. cost_chart_data
+and COST_CHART_SERIES define the bars for every renderer.
+
+PDF reports and emails get the same bars as a PNG drawn with Pillow
+(``pip install cotermcalc[charts]``). Images are cached by their data too, so
+a bulk run renders each distinct chart once.
+"""
+import functools
+import io
+import json
+import math
+
+from .cache import LRUCache
+from .money import dollars, format_money
+
+
+# (chart data key, label, colour) per billing term, in the order the chart draws them
+COST_CHART_SERIES = {
+    "Annual": [
+        ("firstYearCoTerm", "First Year Co-Termed Cost", "#82ca9d"),
+        ("currentCost", "Current Annual Cost", "#8884d8"),
+        ("newAnnual", "Updated Annual Cost", "#ffc658"),
+        ("subscription", "Remaining Total Subscription Cost", "#ff7f50"),
+    ],
+    "Monthly": [
+        ("currentCost", "Current Monthly Cost", "#8884d8"),
+        ("coTermedMonthly", "First Month Co-Termed Cost", "#82ca9d"),
+        ("newMonthly", "New Monthly Cost", "#ffc658"),
+        ("subscription", "Remaining Total Subscription Cost", "#ff7f50"),
+    ],
+    "Prepaid": [
+        ("currentCost", "Current Prepaid Cost (Remaining Months)", "#8884d8"),
+        ("coTermedPrepaid", "Additional Licenses Prepaid Cost", "#82ca9d"),
+        ("subscription", "Remaining Total Subscription Cost", "#ff7f50"),
+    ],
+}
+
+PNG_SIZE = (1200, 540)
+
+chart_cache = LRUCache(maxsize=64)
+
+
+def cost_chart_data(result):
+    """The chart's bar values in dollars (keyed as in COST_CHART_SERIES) for a CalculationResult."""
+    def amount(value):
+        value = float(dollars(value, result.in_cents))
+        return 0.0 if math.isnan(value) else value
+
+    totals = result.totals
+    if result.billing_term == "Monthly":
+        return {
+            "currentCost": amount(result.total_current_cost) / 12,
+            "coTermedMonthly": amount(totals.get("First Month Co-Termed Cost", 0.0)),
+            "newMonthly": amount(result.total_updated_annual_cost) / 12,
+            "subscription": amount(result.total_subscription_term_fee),
+        }
+    if result.billing_term == "Annual":
+        return {
+            "currentCost": amount(result.total_current_cost),
+            "firstYearCoTerm": amount(result.total_first_year_cost),
+            "newAnnual": amount(result.total_updated_annual_cost),
+            "subscription": amount(result.total_subscription_term_fee),
+        }
+    return {
+        "currentCost": amount(totals.get("Current Prepaid Cost", 0.0)),
+        "coTermedPrepaid": amount(totals.get("Prepaid Co-Termed Cost", 0.0)),
+        "subscription": amount(totals.get("Remaining Subscription Total", 0.0)),
+    }
+
+
+def _import_pillow():
+    try:
+        from PIL import Image, ImageDraw, ImageFont
+    except ImportError as e:
+        raise ImportError("Chart images need Pillow: pip install cotermcalc[charts]") from e
+    return Image, ImageDraw, ImageFont
+
+
+@functools.lru_cache(maxsize=None)
+def _font(size):
+    _, _, ImageFont = _import_pillow()
+    return ImageFont.load_default(size=size)
+
+
+_TEXT_COLOR = (49, 51, 63)
+_GRID_COLOR = (225, 225, 225)
+_AXIS_COLOR = (150, 150, 150)
+
+
+@functools.lru_cache(maxsize=None)
+def _palette():
+    """
+    The 16 colours a chart is saved with: white, the grid and axis greys, the
+    bar colours, and a ramp from white to the text colour for anti-aliased
+    text. A 16-colour PNG compresses several times quicker than an RGB one.
+    """
+    Image, _, _ = _import_pillow()
+    bar_colors = dict.fromkeys(color for series in COST_CHART_SERIES.values() for _, _, color in series)
+    colors = [(255, 255, 255), _GRID_COLOR, _AXIS_COLOR] + [_rgb(color) for color in bar_colors]
+    levels = 16 - len(colors)
+    colors += [tuple(round(255 + (channel - 255) * level / (levels - 1)) for channel in _TEXT_COLOR)
+               for level in range(levels)]
+    palette = Image.new("P", (1, 1))
+    palette.putpalette([channel for color in colors for channel in color])
+    return palette
+
+
+def _rgb(color):
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+
+def _draw_text(draw, xy, text, size, anchor):
+    draw.text(xy, text, fill=_TEXT_COLOR, font=_font(size), anchor=anchor)
+
+
+def _nice_step(span, ticks=5):
+    """A 1, 2 or 5 times a power of ten step that splits ``span`` into about ``ticks`` intervals."""
+    raw = span / ticks
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for multiple in (1, 2, 5, 10):
+        if raw <= multiple * magnitude:
+            return multiple * magnitude
+
+
+def _draw_chart(chart_data, billing_term, size):
+    Image, ImageDraw, _ = _import_pillow()
+    width, height = size
+
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    series = COST_CHART_SERIES[billing_term]
+    values = [chart_data.get(key) or 0.0 for key, _, _ in series]
+
+    # Legend across the top, wrapped onto as many rows as it needs
+    swatch, gap = 26, 36
+    rows = [[]]
+    row_width = 0
+    for _, label, color in series:
+        item_width = swatch + 8 + draw.textlength(label, font=_font(19))
+        if rows[-1] and row_width + gap + item_width > width - 40:
+            rows.append([])
+            row_width = 0
+        row_width += (gap if rows[-1] else 0) + item_width
+        rows[-1].append((label, color, item_width))
+    y = 16
+    for row in rows:
+        x = (width - sum(item[2] for item in row) - gap * (len(row) - 1)) / 2
+        for label, color, item_width in row:
+            draw.rectangle([x, y + 2, x + swatch, y + 20], fill=color)
+            _draw_text(draw, (x + swatch + 8, y + 11), label, 19, "lm")
+            x += item_width + gap
+        y += 32
+
+    # Value axis from zero (or the lowest value) to a round number above the highest
+    low, high = min(0.0, *values), max(0.0, *values)
+    step = _nice_step((high - low) or 1.0)
+    low, high = math.floor(low / step) * step, math.ceil(high / step) * step or step
+    left, right, top, bottom = 120, width - 30, y + 24, height - 50
+
+    def y_of(value):
+        return bottom - (value - low) / (high - low) * (bottom - top)
+
+    tick = low
+    while tick <= high + step / 2:
+        draw.line([left, y_of(tick), right, y_of(tick)], fill=_GRID_COLOR, width=1)
+        _draw_text(draw, (left - 10, y_of(tick)), format_money(tick).replace(".00", ""), 18, "rm")
+        tick += step
+    draw.line([left, top, left, bottom], fill=_AXIS_COLOR, width=1)
+    draw.line([left, y_of(0.0), right, y_of(0.0)], fill=_AXIS_COLOR, width=1)
+
+    # One group of bars in the middle of the plot, value labels above (below for negatives)
+    group_width = (right - left) * 0.8
+    bar_width = group_width / len(series)
+    x = left + ((right - left) - group_width) / 2
+    for value, (_, _, color) in zip(values, series):
+        y0, y1 = sorted((y_of(0.0), y_of(value)))
+        draw.rectangle([x + 6, y0, x + bar_width - 6, y1], fill=color)
+        label_y, anchor = (y1 + 6, "mt") if value < 0 else (y0 - 6, "mb")
+        _draw_text(draw, (x + bar_width / 2, label_y), format_money(value), 17, anchor)
+        x += bar_width
+    _draw_text(draw, ((left + right) / 2, bottom + 14), "Cost Comparison", 18, "mt")
+    return image
+
+
+def render_chart_png(chart_data, billing_term, size=PNG_SIZE):
+    """
+    The cost chart as PNG bytes, drawn with Pillow on a white background.
+
+    Parameters:
+    -----------
+    chart_data: dict - Bar values in dollars, keyed as in COST_CHART_SERIES
+        (see cost_chart_data)
+    billing_term: str - "Annual", "Monthly" or "Prepaid"
+    size: tuple - (width, height) in pixels
+
+    Images are cached by their data, so identical charts are drawn once per
+    process. Raises ImportError if Pillow isn't installed.
+    """
+    data_json = json.dumps(chart_data, sort_keys=True)
+
+    def build():
+        Image, _, _ = _import_pillow()
+        image = _draw_chart(chart_data, billing_term, tuple(size))
+        buffer = io.BytesIO()
+        image.quantize(palette=_palette(), dither=Image.Dither.NONE).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    return chart_cache.get_or_create(("png", data_json, billing_term, tuple(size)), build)
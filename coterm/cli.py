@@ -0,0 +1,195 @@
+"""
+Command-line bulk quoting: ``cotermcalc portfolio.csv -o out/``.
+
+Reads a long-format portfolio (see coterm.batch.PORTFOLIO_COLUMNS) from CSV or
+Parquet, prices every agreement with calculate_portfolio and writes the
+processed tables, one PDF report and one email (with its cost chart as a PNG
+when Pillow is installed) per agreement to the output directory. Everything runs locally; nothing is fetched over the network.
+
+``cotermcalc-bom bom.xlsx --term 36 --months-remaining 20.5`` prices a single
+quote from a large BOM file chunk by chunk (see coterm.importer).
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+from .batch import calculate_portfolio, split_portfolio
+from .bulk import DEFAULT_CHUNKSIZE as REPORT_CHUNKSIZE
+from .bulk import safe_filename, write_pdf_reports
+from .charts import cost_chart_data, render_chart_png
+from .dates import MONTH_CONVENTIONS
+from .email_template import generate_email_template
+from .engine import BILLING_TERMS
+from .importer import DEFAULT_CHUNKSIZE, combine_results, stream_bom_costs
+
+
+DATE_COLUMNS = ["Agreement Start Date", "Co-Termed Start Date"]
+
+
+def read_portfolio(path) -> pd.DataFrame:
+    """Reads a portfolio table from a .csv or .parquet file (a path, or an open file with a name)."""
+    extension = os.path.splitext(getattr(path, "name", path))[1].lower()
+    if extension == ".csv":
+        return pd.read_csv(path, parse_dates=DATE_COLUMNS)
+    if extension in (".parquet", ".pq"):
+        try:
+            return pd.read_parquet(path)
+        except ImportError as e:
+            raise ValueError("Reading Parquet portfolios needs pyarrow: pip install pyarrow "
+                             "(or save the portfolio as .csv)") from e
+    raise ValueError(f"Unsupported input file type '{extension}' (expected .csv or .parquet)")
+
+
+def render_email(agreement_id, result, output_dir, include_chart=True):
+    """
+    Writes the email text for one agreement to output_dir/emails and returns
+    its path. The cost chart goes next to it as a PNG to attach, unless
+    include_chart is False or Pillow isn't installed.
+    """
+    path = os.path.join(output_dir, "emails", f"{safe_filename(agreement_id)}.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(generate_email_template(result))
+    if include_chart:
+        try:
+            png = render_chart_png(cost_chart_data(result), result.billing_term)
+        except ImportError:
+            return path
+        with open(os.path.splitext(path)[0] + ".png", "wb") as f:
+            f.write(png)
+    return path
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="cotermcalc",
+        description="Bulk co-terming quotes from a CSV or Parquet portfolio file."
+    )
+    parser.add_argument("input", help="portfolio file (.csv or .parquet), one row per line item")
+    parser.add_argument("-o", "--output-dir", default="cotermcalc_output", help="directory to write results to")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes for PDF rendering (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=REPORT_CHUNKSIZE,
+                        help=f"agreements sent to a worker at a time (default: {REPORT_CHUNKSIZE})")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds allowed per PDF report")
+    parser.add_argument("--zip", action="store_true", help="write PDF reports to reports.zip instead of reports/")
+    parser.add_argument("--months-convention", choices=MONTH_CONVENTIONS, default="30.44",
+                        help="day-count convention for months remaining (default: 30.44)")
+    parser.add_argument("--logo", default=None, help="logo image to place on PDF reports")
+    parser.add_argument("--no-pdf", action="store_true", help="skip PDF reports")
+    parser.add_argument("--no-email", action="store_true", help="skip email templates")
+    parser.add_argument("--no-charts", action="store_true",
+                        help="leave the cost chart out of PDF reports and emails")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.workers < 1 or args.chunksize < 1:
+        print("cotermcalc: --workers and --chunksize must be at least 1", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+
+    try:
+        portfolio = read_portfolio(args.input)
+        lines, totals = calculate_portfolio(portfolio, args.months_convention)
+    except (OSError, ValueError) as e:
+        print(f"cotermcalc: {e}", file=sys.stderr)
+        return 1
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    lines.to_csv(os.path.join(args.output_dir, "line_items.csv"), index=False)
+    totals.to_csv(os.path.join(args.output_dir, "agreement_totals.csv"))
+
+    write_pdf = not args.no_pdf
+    write_email = not args.no_email
+    if write_email:
+        os.makedirs(os.path.join(args.output_dir, "emails"), exist_ok=True)
+
+    def pdf_reports():
+        # Emails are quick, so they are written here while the workers render PDFs
+        for agreement_id, result in split_portfolio(lines, totals):
+            if write_email:
+                render_email(agreement_id, result, args.output_dir, include_chart=not args.no_charts)
+            if write_pdf:
+                yield agreement_id, result
+
+    failures = []
+    if write_pdf:
+        output = os.path.join(args.output_dir, "reports.zip" if args.zip else "reports")
+        outcomes = write_pdf_reports(pdf_reports(), output, workers=args.workers, chunksize=args.chunksize,
+                                     timeout=args.timeout, logo_path=args.logo,
+                                     include_chart=not args.no_charts)
+        failures = [outcome for outcome in outcomes if outcome.error is not None]
+    else:
+        for _ in pdf_reports():
+            pass
+
+    for outcome in failures:
+        print(f"cotermcalc: report for {outcome.agreement_id} failed: {outcome.error}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    rate = len(totals) / elapsed if elapsed > 0 else float("inf")
+    print(f"Processed {len(totals)} agreements ({len(lines)} line items) in {elapsed:.2f}s "
+          f"- {rate:,.1f} agreements/sec, {args.workers} worker(s). Output: {args.output_dir}")
+    return 1 if failures else 0
+
+
+def build_bom_parser():
+    parser = argparse.ArgumentParser(
+        prog="cotermcalc-bom",
+        description="Price one co-terming quote from a CSV, TSV or XLSX bill of materials."
+    )
+    parser.add_argument("input", help="BOM file (.csv, .tsv or .xlsx)")
+    parser.add_argument("--term", type=int, required=True, help="agreement term in months")
+    parser.add_argument("--months-remaining", type=float, required=True, help="months remaining in the agreement")
+    parser.add_argument("--extension", type=int, default=0, help="extension months (default: 0)")
+    parser.add_argument("--billing-term", choices=BILLING_TERMS, default="Annual",
+                        help="billing term (default: Annual)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"rows read and priced at a time (default: {DEFAULT_CHUNKSIZE})")
+    parser.add_argument("-o", "--output", default=None, help="CSV file to write the priced line items to")
+    return parser
+
+
+def bom_main(argv=None):
+    args = build_bom_parser().parse_args(argv)
+    started = time.perf_counter()
+
+    line_count = 0
+
+    def priced_chunks():
+        nonlocal line_count
+        header = True
+        for chunk_result in stream_bom_costs(args.input, args.term, args.months_remaining, args.extension,
+                                             args.billing_term, chunksize=args.chunksize):
+            if args.output:
+                # Append each chunk as it is priced so the whole file is never held in memory
+                chunk_result.line_items.to_csv(args.output, mode="w" if header else "a", header=header,
+                                               index=False)
+                header = False
+            line_count += len(chunk_result.line_items)
+            yield chunk_result
+
+    try:
+        result = combine_results(priced_chunks(), keep_line_items=False)
+    except (OSError, ImportError, ValueError) as e:
+        print(f"cotermcalc-bom: {e}", file=sys.stderr)
+        return 1
+
+    elapsed = time.perf_counter() - started
+    print(f"Priced {line_count} line items ({args.billing_term} billing) in {elapsed:.2f}s")
+    print(f"Total Current Cost: ${result.total_current_cost:,.2f}")
+    print(f"First Payment: ${result.first_period_cost:,.2f}")
+    print(f"Total Updated Annual Cost: ${result.total_updated_annual_cost:,.2f}")
+    print(f"Total Subscription Term Fee: ${result.total_subscription_term_fee:,.2f}")
+    if args.output:
+        print(f"Line items: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Vectorized months-remaining calculations over arrays of dates.
+
+Works on plain numpy datetime64 values. Every date is split into a month
+number and a day of the month with a day-to-month lookup table, and month
+starts and lengths come from precomputed tables too, so an agreement end date
+or a calendar-month anchor is a couple of array lookups rather than a per-row
+DateOffset.
+"""
+import numpy as np
+import pandas as pd
+
+from .engine import _round_cents
+
+
+# Day-count conventions accepted by co_termed_months_remaining
+MONTH_CONVENTIONS = ("30.44", "calendar", "30/360")
+
+_NS_PER_DAY = 86_400_000_000_000
+# Dates datetime64[ns] can hold; casting anything outside wraps around silently
+_NS_FIRST_DAY = np.datetime64("1677-09-22")
+_NS_LAST_DAY = np.datetime64("2262-04-11")
+
+# Month tables covering 1800-01 through 2399-12, indexed by month number
+# (months since _FIRST_MONTH). _MONTH_STARTS has one extra entry so the length
+# of the last month can be read off the next month's start.
+_FIRST_MONTH = np.datetime64("1800-01", "M")
+_LAST_MONTH = np.datetime64("2399-12", "M")
+_MONTH_STARTS = np.arange(_FIRST_MONTH, _LAST_MONTH + 2).astype("datetime64[D]").astype(np.int64)
+_DAYS_IN_MONTH = np.diff(_MONTH_STARTS)
+# Month number of every day in the table range, indexed by days since _MONTH_STARTS[0]
+_DAY_TO_MONTH = np.repeat(np.arange(len(_DAYS_IN_MONTH), dtype=np.int16), _DAYS_IN_MONTH)
+
+
+def _as_datetime64(values) -> np.ndarray:
+    """Coerces dates, Timestamps, strings or datetime64 arrays to datetime64[ns]."""
+    values = np.asarray(values)
+    if not np.issubdtype(values.dtype, np.datetime64):
+        values = np.asarray(pd.to_datetime(values.ravel())).reshape(values.shape)
+    if values.dtype != np.dtype("datetime64[ns]"):
+        dates = values[~np.isnat(values)]
+        if dates.size and (dates.min() < _NS_FIRST_DAY or dates.max() > _NS_LAST_DAY):
+            raise ValueError(f"co_termed_months_remaining(): dates must fall between {_NS_FIRST_DAY} and "
+                             f"{_NS_LAST_DAY}")
+    return values.astype("datetime64[ns]", copy=False)
+
+
+def _split_dates(values: np.ndarray):
+    """
+    Splits datetime64[ns] values into (day number since 1970-01-01, month number
+    into the tables, zero-based day of the month, nanoseconds into the day).
+    """
+    ns = values.view(np.int64)
+    days = ns // _NS_PER_DAY
+    time_of_day = ns - days * _NS_PER_DAY
+    table_day = days - _MONTH_STARTS[0]
+    if table_day.size and (table_day.min() < 0 or table_day.max() >= len(_DAY_TO_MONTH)):
+        raise ValueError(f"co_termed_months_remaining(): dates must fall between {_FIRST_MONTH} and {_LAST_MONTH}")
+    month = _DAY_TO_MONTH[table_day].astype(np.int64)
+    day_of_month = days - _MONTH_STARTS[month]
+    return days, month, day_of_month, time_of_day
+
+
+def _month_anchor(month, day_of_month):
+    """Day number of ``day_of_month`` in ``month``, clipped to the end of shorter months."""
+    return _MONTH_STARTS[month] + np.minimum(day_of_month, _DAYS_IN_MONTH[month] - 1)
+
+
+def co_termed_months_remaining(co_termed_start_dates, agreement_start_dates, agreement_terms,
+                               convention: str = "30.44") -> np.ndarray:
+    """
+    Months remaining from each co-termed start date to its agreement's end date.
+
+    The inputs broadcast against each other, so one agreement can be priced
+    against many co-term dates or the other way around. The agreement end date
+    is ``agreement_start_date + DateOffset(months=agreement_term)``, clipped to
+    the end of the month as pandas does. Results are rounded to two decimals and
+    never negative; missing dates give NaN.
+
+    Parameters:
+    -----------
+    co_termed_start_dates: array-like of dates - When the co-termed subscription starts
+    agreement_start_dates: array-like of dates - When each agreement started
+    agreement_terms: array-like of int - Each agreement's term in months
+    convention: str - How days are turned into months:
+        "30.44"    - days remaining / 30.44, the same numbers as
+                     calculate_co_termed_months_remaining (default)
+        "calendar" - whole calendar months, plus the leftover days as a
+                     fraction of the month they fall in
+        "30/360"   - US 30/360 (bond basis), every month counted as 30 days
+
+    Returns:
+    --------
+    ndarray of float: months remaining, shaped like the broadcast inputs.
+    """
+    if convention not in MONTH_CONVENTIONS:
+        raise ValueError(f"co_termed_months_remaining(): unknown convention '{convention}', "
+                         f"expected one of {MONTH_CONVENTIONS}")
+
+    co_termed, start, terms = np.broadcast_arrays(
+        _as_datetime64(co_termed_start_dates),
+        _as_datetime64(agreement_start_dates),
+        np.asarray(agreement_terms, dtype=np.int64)
+    )
+    missing = np.isnat(co_termed) | np.isnat(start)
+    if missing.any():
+        # Price the rows we can; placeholder dates keep the table lookups in range
+        co_termed = np.where(missing, np.datetime64("1970-01-01", "ns"), co_termed)
+        start = np.where(missing, np.datetime64("1970-01-01", "ns"), start)
+        terms = np.where(missing, 0, terms)
+
+    co_days, co_month, co_day, co_time = _split_dates(co_termed)
+    _, start_month, start_day, start_time = _split_dates(start)
+
+    end_month = start_month + terms
+    if end_month.size and (end_month.min() < 0 or end_month.max() >= len(_DAYS_IN_MONTH) - 1):
+        raise ValueError(f"co_termed_months_remaining(): agreement end dates must fall between "
+                         f"{_FIRST_MONTH} and {_LAST_MONTH}")
+    end_day = np.minimum(start_day, _DAYS_IN_MONTH[end_month] - 1)
+    end_days = _MONTH_STARTS[end_month] + end_day
+
+    if convention == "30.44":
+        # Whole days between the two timestamps, as Timedelta.days counts them
+        days_remaining = ((end_days - co_days) * _NS_PER_DAY + start_time - co_time) // _NS_PER_DAY
+        months_remaining = days_remaining / 30.44
+    elif convention == "calendar":
+        # Step whole months forward from the co-term date without passing the end date,
+        # then count what's left as a share of the month that starts there
+        whole_months = end_month - co_month
+        whole_months -= _month_anchor(co_month + whole_months, co_day) > end_days
+        month_start = _month_anchor(co_month + whole_months, co_day)
+        month_end = _month_anchor(co_month + whole_months + 1, co_day)
+        months_remaining = whole_months + (end_days - month_start) / (month_end - month_start)
+    else:
+        # US 30/360: a 31st counts as the 30th, and so does an end date on the
+        # 31st when the start date is on the 30th or 31st
+        first_day = np.minimum(co_day + 1, 30)
+        last_day = end_day + 1
+        last_day = np.where((last_day == 31) & (first_day == 30), 30, last_day)
+        months_remaining = (30 * (end_month - co_month) + last_day - first_day) / 30
+
+    months_remaining = np.maximum(_round_cents(months_remaining), 0)  # Prevents negative values
+    if missing.any():
+        months_remaining = np.where(missing, np.nan, months_remaining)
+    return months_remaining
@@ -0,0 +1,164 @@
+"""
+Customer email template generation for co-terming results.
+"""
+from .engine import CalculationResult
+from .money import money_formatter
+
+
+def generate_email_template(result: CalculationResult) -> str:
+    """
+    Builds the customer email body for the result's billing term.
+    """
+    if not isinstance(result, CalculationResult):
+        raise ValueError("generate_email_template(): 'result' is not a CalculationResult")
+
+    billing_term = result.billing_term
+    agreement_term = result.agreement_term
+    months_remaining = result.months_remaining
+    current_cost = result.total_current_cost
+    first_cost = result.first_period_cost
+    total_subscription_cost = result.total_subscription_term_fee
+    updated_annual_cost = result.total_updated_annual_cost
+    total_first_year_co_termed_cost = result.total_first_year_cost
+    money = money_formatter(result.in_cents)
+
+    # Extract correct co-term cost and actual license names from the line items
+    license_list = []
+    for row in result.line_items.to_dict("records"):
+        license_entry = {
+            "name": row.get("Cloud Service Description"),
+            "first_year_co_termed": row.get("First Year Co-Termed Cost", 0),
+            "first_month_co_termed": row.get("First Month Co-Termed Cost", 0),
+            "new_monthly_cost": row.get("New Monthly Cost", 0),
+            "current_prepaid_cost": row.get("Current Prepaid Cost", 0),
+            "prepaid_co_termed_cost": row.get("Prepaid Co-Termed Cost", 0)
+        }
+
+        license_list.append(license_entry)
+
+    # ✅ Close the Annual and Monthly breakdowns with the totals
+    totals = result.totals
+    total_entry = {
+        "name": "Total",
+        "first_year_co_termed": totals.get("First Year Co-Termed Cost", 0),
+        "first_month_co_termed": totals.get("First Month Co-Termed Cost", 0),
+        "new_monthly_cost": totals.get("New Monthly Cost", 0),
+    }
+
+    # ✅ Generate the License Cost Breakdown for Prepaid Billing
+    prepaid_license_cost_breakdown = '\n'.join([
+        f"- {license['name']} - Current Prepaid Cost: {money(license['current_prepaid_cost'])}, "
+        f"Additional Licenses Cost: {money(license['prepaid_co_termed_cost'])}"
+        for license in license_list
+    ])
+
+    # ✅ Generate the License Cost Breakdown for Annual Billing
+    annual_license_cost_breakdown = ""
+    if billing_term == "Annual":
+        annual_license_cost_breakdown = '\n'.join([
+            f"- {license['name']} - First Year Co-Termed Cost: {money(license['first_year_co_termed'])}"
+            for license in license_list + [total_entry]
+        ])
+
+    # ✅ Generate the License Cost Breakdown for Monthly Billing
+    monthly_license_cost_breakdown = ""
+    if billing_term == "Monthly":
+        monthly_license_cost_breakdown = '\n'.join([
+            f"- {license['name']} - First Month Co-Termed Cost: {money(license['first_month_co_termed'])}, New Monthly Cost: {money(license['new_monthly_cost'])}"
+            for license in license_list + [total_entry]
+        ])
+
+    # ✅ Update the email template
+    email_templates = {
+        
+        'Monthly': f"""Dear Customer,
+
+We are writing to inform you about the updated co-terming cost for your monthly billing arrangement.
+
+Current Agreement:
+- Current Monthly Cost: {money(current_cost/12)}
+
+### License Cost Breakdown:
+{monthly_license_cost_breakdown}
+
+Updated Cost Summary:
+- First Month Co-Termed Cost: {money(first_cost)}
+- New Monthly Cost: {money(updated_annual_cost/12)}
+- Total Remaining Subscription Cost: {money(total_subscription_cost)}
+
+Key Details:
+- The first month's co-termed cost reflects your current service adjustments.
+- Your total subscription cost covers the entire term of the agreement.
+
+Next Steps:
+1. Please carefully review the cost breakdown above.
+2. If you approve these terms, kindly reply to this email with your confirmation.
+3. If you have any questions or concerns, please contact our sales team.
+
+We appreciate your continued business and look forward to your approval.
+
+Best regards,
+Your Signature""",
+
+        'Annual': f"""Dear Customer,
+
+We are writing to inform you about the updated co-terming cost for your annual billing arrangement.
+
+### Current Agreement:
+- **Current Annual Cost:** {money(current_cost)}
+
+### License Cost Breakdown:
+{annual_license_cost_breakdown}
+
+### Updated Cost Summary:
+- **Total First Year Co-Termed Cost:** {money(total_first_year_co_termed_cost)}
+- **Updated Annual Cost:** {money(updated_annual_cost)}
+- **Total Remaining Subscription Cost:** {money(total_subscription_cost)}
+
+### Key Details:
+- The first year's co-termed cost reflects your current service adjustments.
+- Your total subscription cost covers the entire term of the agreement.
+
+### Next Steps:
+1. Please carefully review the cost breakdown above.
+2. If you approve these terms, kindly reply to this email with your confirmation.
+3. If you have any questions or concerns, please contact our sales team.
+
+We appreciate your continued business and look forward to your approval.
+
+Best regards,  
+Your Signature""",
+    
+        'Prepaid': f"""Dear Customer,
+
+We are writing to inform you about the updated co-terming cost for your prepaid billing arrangement.
+
+### Current Agreement:
+- **Original Agreement Term:** {agreement_term} months
+- **Remaining Months:** {months_remaining:.2f} months
+- **Current Prepaid Cost (Remaining Months):** {money(current_cost)}
+
+### Prepaid License Cost Breakdown:
+{prepaid_license_cost_breakdown}
+
+### Updated Cost Summary:
+- **Additional Licenses Prepaid Cost:** {money(first_cost)}
+- **Total Subscription Cost (All Licenses, Remaining Months):** {money(total_subscription_cost)}
+
+### Key Details:
+- The prepaid costs shown are for the remaining {months_remaining:.2f} months of your service term.
+- Your total subscription cost covers all licenses for the remaining term.
+
+### Next Steps:
+1. Please carefully review the cost breakdown above.
+2. If you approve these terms, kindly reply to this email with your confirmation.
+3. If you have any questions or concerns, please contact our sales team.
+
+We appreciate your continued business and look forward to your approval.
+
+Best regards,
+Your Signature"""
+    }
+    
+    # Return the appropriate template based on billing term
+    return email_templates.get(billing_term, "Invalid billing term")
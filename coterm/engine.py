@@ -0,0 +1,449 @@
+"""
+Co-terming cost engine.
+
+Pure pandas/NumPy math with no Streamlit dependency, so it can be imported by
+batch jobs, scripts and services as well as the app.
+"""
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from .money import check_cents_range, conditional_round_cents, divide_round, to_cents
+
+
+BILLING_TERMS = ("Annual", "Prepaid", "Monthly")
+
+LINE_ITEM_COLUMNS = ["Cloud Service Description", "Unit Quantity", "Annual Unit Fee", "Additional Licenses"]
+
+# Columns calculate_costs adds for each billing term, in order
+COST_COLUMNS = {
+    "Annual": ["Current Monthly Cost", "Current Annual Cost", "Updated Annual Cost",
+               "First Year Co-Termed Cost", "Subscription Term Total Service Fee"],
+    "Prepaid": ["Current Monthly Cost", "Current Annual Cost", "Updated Annual Cost",
+                "Current Prepaid Cost", "Prepaid Co-Termed Cost", "Remaining Subscription Total"],
+    "Monthly": ["Current Monthly Cost", "Current Annual Cost", "Updated Annual Cost",
+                "First Month Co-Termed Cost", "Monthly Co-Termed Cost", "New Monthly Cost",
+                "Subscription Term Total Service Fee"],
+}
+
+TOTAL_COLUMNS = ["Total Current Cost", "Total Prepaid Cost", "Total First Year Cost",
+                 "Total Updated Annual Cost", "Total Subscription Term Fee"]
+
+# The result column each calculate_costs total is summed from, per billing term
+TOTAL_SOURCES = {
+    "Annual": {"Total Current Cost": "Current Annual Cost", "Total Prepaid Cost": None,
+               "Total First Year Cost": "First Year Co-Termed Cost",
+               "Total Updated Annual Cost": "Updated Annual Cost",
+               "Total Subscription Term Fee": "Subscription Term Total Service Fee"},
+    "Prepaid": {"Total Current Cost": "Current Prepaid Cost", "Total Prepaid Cost": "Prepaid Co-Termed Cost",
+                "Total First Year Cost": None, "Total Updated Annual Cost": None,
+                "Total Subscription Term Fee": None},
+    "Monthly": {"Total Current Cost": "Current Annual Cost", "Total Prepaid Cost": None,
+                "Total First Year Cost": None, "Total Updated Annual Cost": "Updated Annual Cost",
+                "Total Subscription Term Fee": "Subscription Term Total Service Fee"},
+}
+
+
+def conditional_round(value, threshold=0.25, exact=True):
+    """
+    Rounds values close to whole numbers based on a threshold.
+
+    Accepts a scalar or a whole column (Series / array-like). Columns are rounded
+    in one pass and give the same numbers as rounding each cell on its own.
+
+    exact: bool - Round half-cents on the exact decimal value, like Python's round()
+        does for floats. Pass False for NumPy's scaled rounding, which is what
+        round() does on NumPy scalars.
+    """
+    if np.isscalar(value):
+        if abs(value - round(value)) < threshold:
+            return round(value)
+        return round(value, 2)  # Keep two decimal places otherwise
+
+    values = np.asarray(value, dtype=float)
+    whole = np.round(values)
+    cents = _round_cents(values, exact)
+
+    rounded = np.where(np.abs(values - whole) < threshold, whole, cents)
+    if isinstance(value, pd.Series):
+        return pd.Series(rounded, index=value.index, name=value.name)
+    return rounded
+
+
+def _round_cents(values, exact=True):
+    """Rounds an array to two decimals; see conditional_round for ``exact``."""
+    cents = np.round(values, 2)
+    if exact:
+        # np.round scales by 100 before rounding, so it can only disagree with
+        # round() when the scaled value sits on a half-cent; redo just those cells
+        scaled = np.abs(values * 100)
+        half_cent = np.abs(scaled - np.floor(scaled) - 0.5) <= 4 * np.spacing(scaled)
+        for i in np.flatnonzero(half_cent):
+            cents.flat[i] = round(float(values.flat[i]), 2)
+    return cents
+
+
+def calculate_co_termed_months_remaining(co_termed_start_date, agreement_start_date, agreement_term: int) -> float:
+    """
+    Calculates months remaining based on the co-termed start date and agreement term.
+    """
+    # Convert dates to pandas Timestamps for compatibility
+    co_termed_start_date = pd.Timestamp(co_termed_start_date)
+    agreement_start_date = pd.Timestamp(agreement_start_date)
+
+    # ✅ Calculate the agreement's original end date
+    agreement_end_date = agreement_start_date + pd.DateOffset(months=agreement_term)
+
+    # ✅ Calculate months remaining from the Co-Term Start Date to the Agreement End Date
+    days_remaining = (agreement_end_date - co_termed_start_date).days
+    months_remaining = days_remaining / 30.44  # Convert days to months
+
+    return max(round(months_remaining, 2), 0)  # Prevents negative values
+
+
+def _shared_cost_columns(quantity, unit_fee, additional):
+    """The cost columns every billing term starts with; they don't depend on the term."""
+    return {
+        'Current Monthly Cost': (unit_fee / 12) * quantity,
+        'Current Annual Cost': quantity * unit_fee,
+        'Updated Annual Cost': (quantity + additional) * unit_fee,
+    }
+
+
+def _cost_columns(quantity, unit_fee, additional, agreement_term, months_remaining, extension_months,
+                  billing_term, shared=None):
+    """
+    Computes the per-line cost columns for one billing term, in display order.
+
+    The agreement parameters may be scalars or arrays aligned with the line items,
+    so the same math prices a single agreement or a whole portfolio at once.
+    Pass ``shared`` (from _shared_cost_columns) to reuse the term-independent
+    columns when pricing several billing terms.
+    """
+    total_term = months_remaining + extension_months
+    months_elapsed = agreement_term - months_remaining
+
+    # Calculate basic values for all billing terms
+    if shared is None:
+        shared = _shared_cost_columns(quantity, unit_fee, additional)
+    columns = dict(shared)
+    new_annual_cost = columns['Updated Annual Cost']
+
+    if billing_term == 'Monthly':
+        fractional_month = months_remaining % 1
+        first_month_factor = np.where(fractional_month > 0, fractional_month, 1.0)
+
+        # ✅ Only calculate First Month Co-Termed Cost for additional licenses
+        columns['First Month Co-Termed Cost'] = conditional_round(
+            (additional * unit_fee / 12) * first_month_factor
+        )
+
+        # ✅ Monthly Co-Termed Cost includes both current + new licenses
+        columns['Monthly Co-Termed Cost'] = conditional_round(new_annual_cost / 12)
+
+        # ✅ New Monthly Cost includes both current + new licenses
+        new_monthly_cost = conditional_round(new_annual_cost / 12)
+        columns['New Monthly Cost'] = new_monthly_cost
+
+        # ✅ Subscription term total (total months)
+        # The per-row version read New Monthly Cost back out of the frame as a
+        # NumPy scalar, so it was rounded NumPy-style; keep that for identical totals
+        columns['Subscription Term Total Service Fee'] = conditional_round(
+            new_monthly_cost * total_term, exact=False
+        )
+
+    elif billing_term == 'Annual':
+        # ✅ First Year Co-Termed Cost ONLY for additional licenses
+        columns['First Year Co-Termed Cost'] = conditional_round(
+            (additional * unit_fee * (12 - (months_elapsed % 12))) / 12
+        )
+
+        # ✅ Subscription Term Total Service Fee based on years remaining
+        years_remaining = total_term / 12
+        columns['Subscription Term Total Service Fee'] = conditional_round(
+            new_annual_cost * years_remaining
+        )
+
+    elif billing_term == 'Prepaid':
+        # ✅ Calculate Current Prepaid Cost for the **full agreement term**
+        current_prepaid_cost = conditional_round(unit_fee * quantity)
+
+        # ✅ Correct **Prepaid Co-Termed Cost Calculation** (based on remaining months)
+        prepaid_co_termed_cost = conditional_round(
+            unit_fee / agreement_term * months_remaining * additional
+        )
+
+        columns['Current Prepaid Cost'] = current_prepaid_cost
+        columns['Prepaid Co-Termed Cost'] = prepaid_co_termed_cost
+        # ✅ Remaining Subscription Total = (Current Prepaid Cost + Prepaid Co-Termed Cost)
+        columns['Remaining Subscription Total'] = current_prepaid_cost + prepaid_co_termed_cost
+
+    return columns
+
+
+def _cost_columns_cents(quantity, unit_fee_cents, additional, agreement_term, months_remaining, extension_months,
+                        billing_term):
+    """
+    _cost_columns in int64 cents.
+
+    Months remaining is taken in hundredths of a month, so every prorated amount
+    is an exact fraction of integers and is rounded once (conditional_round's
+    whole-dollar rule included).
+    """
+    quantity = np.rint(np.asarray(quantity, dtype=float)).astype(np.int64)
+    additional = np.rint(np.asarray(additional, dtype=float)).astype(np.int64)
+    fee = np.asarray(unit_fee_cents, dtype=np.int64)
+    term = np.asarray(agreement_term, dtype=np.int64)
+    remaining = to_cents(months_remaining)  # Hundredths of a month
+    total_term = remaining + 100 * np.asarray(extension_months, dtype=np.int64)
+    check_cents_range(quantity + additional, fee, np.maximum(np.abs(total_term), 1200))
+
+    new_annual_cost = (quantity + additional) * fee
+    columns = {
+        'Current Monthly Cost': divide_round(fee * quantity, 12),
+        'Current Annual Cost': quantity * fee,
+        'Updated Annual Cost': new_annual_cost,
+    }
+
+    if billing_term == 'Monthly':
+        fractional_month = remaining % 100
+        first_month_factor = np.where(fractional_month > 0, fractional_month, 100)
+        columns['First Month Co-Termed Cost'] = conditional_round_cents(
+            additional * fee * first_month_factor, 1200
+        )
+        new_monthly_cost = conditional_round_cents(new_annual_cost, 12)
+        columns['Monthly Co-Termed Cost'] = new_monthly_cost
+        columns['New Monthly Cost'] = new_monthly_cost
+        # The customer is billed the rounded monthly cost, so that is what gets multiplied out
+        columns['Subscription Term Total Service Fee'] = conditional_round_cents(new_monthly_cost * total_term, 100)
+
+    elif billing_term == 'Annual':
+        months_into_year = (100 * term - remaining) % 1200
+        columns['First Year Co-Termed Cost'] = conditional_round_cents(
+            additional * fee * (1200 - months_into_year), 1200
+        )
+        columns['Subscription Term Total Service Fee'] = conditional_round_cents(new_annual_cost * total_term, 1200)
+
+    elif billing_term == 'Prepaid':
+        current_prepaid_cost = conditional_round_cents(fee * quantity, 1)
+        prepaid_co_termed_cost = conditional_round_cents(fee * remaining * additional, 100 * term)
+        columns['Current Prepaid Cost'] = current_prepaid_cost
+        columns['Prepaid Co-Termed Cost'] = prepaid_co_termed_cost
+        columns['Remaining Subscription Total'] = current_prepaid_cost + prepaid_co_termed_cost
+
+    return columns
+
+
+# Label of the totals row in tables built by CalculationResult.to_frame
+TOTAL_ROW_LABEL = "Total Licensing Cost"
+
+
+# Cost columns summed into the totals record for each billing term (the
+# subscription term total is always included when the term has it)
+SUMMED_COLUMNS = {
+    "Prepaid": ["Current Prepaid Cost", "Prepaid Co-Termed Cost", "Remaining Subscription Total",
+                "Subscription Term Total Service Fee"],
+    "Annual": ["First Year Co-Termed Cost", "Current Annual Cost", "Updated Annual Cost",
+               "Subscription Term Total Service Fee"],
+    "Monthly": ["First Month Co-Termed Cost", "Current Monthly Cost", "New Monthly Cost",
+                "Subscription Term Total Service Fee"],
+}
+
+
+def _totals_record(df, billing_term) -> dict:
+    """Column totals for the processed line items, as shown on the "Total Licensing Cost" row."""
+    totals = {
+        "Unit Quantity": df["Unit Quantity"].sum(),
+        "Additional Licenses": df["Additional Licenses"].sum(),
+        "Annual Unit Fee": df["Annual Unit Fee"].mean(),  # Use mean for unit fee
+    }
+
+    # ✅ Add billing term specific columns
+    for col in SUMMED_COLUMNS[billing_term]:
+        if col in df.columns:
+            totals[col] = df[col].sum()
+    return totals
+
+
+class CalculationResult:
+    """
+    The priced quote for one agreement.
+
+    line_items has one row per service with the cost columns for the billing
+    term, totals holds the column totals (quantities, licenses and summed
+    costs), and the total_* attributes are the headline figures. Totals are
+    kept apart from the line items, so no service name is treated specially.
+    When in_cents is set, every amount (the unit fee included) is int64 cents.
+    """
+
+    __slots__ = ("line_items", "totals", "billing_term", "agreement_term", "months_remaining",
+                 "extension_months", "total_current_cost", "total_prepaid_cost", "total_first_year_cost",
+                 "total_updated_annual_cost", "total_subscription_term_fee", "in_cents")
+
+    def __init__(self, line_items: pd.DataFrame, totals: dict, billing_term: str, agreement_term, months_remaining,
+                 extension_months, total_current_cost=0, total_prepaid_cost=0, total_first_year_cost=0,
+                 total_updated_annual_cost=0, total_subscription_term_fee=0, in_cents=False):
+        self.line_items = line_items
+        self.totals = totals
+        self.billing_term = billing_term
+        self.agreement_term = agreement_term
+        self.months_remaining = months_remaining
+        self.extension_months = extension_months
+        self.total_current_cost = total_current_cost
+        self.total_prepaid_cost = total_prepaid_cost
+        self.total_first_year_cost = total_first_year_cost
+        self.total_updated_annual_cost = total_updated_annual_cost
+        self.total_subscription_term_fee = total_subscription_term_fee
+        self.in_cents = in_cents
+
+    def __repr__(self):
+        return (f"CalculationResult(billing_term={self.billing_term!r}, line_items={len(self.line_items)}, "
+                f"total_subscription_term_fee={self.total_subscription_term_fee!r})")
+
+    @property
+    def first_period_cost(self):
+        """What the customer pays first: the first month, first year or prepaid co-termed cost."""
+        if self.billing_term == 'Monthly':
+            return self.totals.get('First Month Co-Termed Cost', 0)
+        elif self.billing_term == 'Annual':
+            return self.total_first_year_cost
+        return self.total_prepaid_cost
+
+    def copy(self) -> "CalculationResult":
+        """A copy whose line_items and totals can be modified without touching this result."""
+        return CalculationResult(
+            self.line_items.copy(), dict(self.totals), self.billing_term, self.agreement_term,
+            self.months_remaining, self.extension_months, self.total_current_cost, self.total_prepaid_cost,
+            self.total_first_year_cost, self.total_updated_annual_cost, self.total_subscription_term_fee,
+            self.in_cents
+        )
+
+    def to_dollars(self) -> "CalculationResult":
+        """This result with amounts in float dollars (a copy if it is in cents)."""
+        if not self.in_cents:
+            return self
+        line_items = self.line_items.copy()
+        for col in ["Annual Unit Fee"] + COST_COLUMNS[self.billing_term]:
+            if col in line_items.columns:
+                line_items[col] = line_items[col] / 100
+        totals = {col: (value if col in ("Unit Quantity", "Additional Licenses") else value / 100)
+                  for col, value in self.totals.items()}
+        return CalculationResult(
+            line_items, totals, self.billing_term, self.agreement_term, self.months_remaining,
+            self.extension_months, self.total_current_cost / 100, self.total_prepaid_cost / 100,
+            self.total_first_year_cost / 100, self.total_updated_annual_cost / 100,
+            self.total_subscription_term_fee / 100
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """The line items with a "Total Licensing Cost" row appended, for display and export."""
+        total_row = pd.DataFrame({"Cloud Service Description": [TOTAL_ROW_LABEL],
+                                  **{col: [value] for col, value in self.totals.items()}})
+        return pd.concat([self.line_items, total_row], ignore_index=True)
+
+
+def _prepare_line_items(df: pd.DataFrame) -> pd.DataFrame:
+    """Copies the line items with numeric cost inputs and a text description column."""
+    df = df.copy()
+
+    # Convert relevant columns to numeric, but exclude "Cloud Service Description"
+    for col in df.select_dtypes(include=['object']).columns:
+        if col != "Cloud Service Description":  # ✅ Prevent license names from becoming numbers
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+    # Ensure "Cloud Service Description" is explicitly kept as text
+    df["Cloud Service Description"] = df["Cloud Service Description"].astype(str)
+    return df
+
+
+def _price_line_items(df: pd.DataFrame, agreement_term, months_remaining, extension_months, billing_term,
+                      shared=None, integer_cents=False) -> CalculationResult:
+    """Adds one billing term's cost columns to prepared line items and totals them."""
+    df = df.copy()
+
+    # Work on whole columns at once instead of row by row
+    if integer_cents:
+        df['Annual Unit Fee'] = to_cents(df['Annual Unit Fee'])
+        columns = _cost_columns_cents(df['Unit Quantity'], df['Annual Unit Fee'], df['Additional Licenses'],
+                                      agreement_term, months_remaining, extension_months, billing_term)
+    else:
+        columns = _cost_columns(df['Unit Quantity'], df['Annual Unit Fee'], df['Additional Licenses'],
+                                agreement_term, months_remaining, extension_months, billing_term, shared)
+    for col, values in columns.items():
+        df[col] = values
+
+    # Final Totals for return values
+    totals = {
+        total_col: (df[source].sum() if source is not None else 0)
+        for total_col, source in TOTAL_SOURCES[billing_term].items()
+    }
+
+    return CalculationResult(
+        df.reset_index(drop=True), _totals_record(df, billing_term), billing_term, agreement_term,
+        months_remaining, extension_months,
+        total_current_cost=totals["Total Current Cost"],
+        total_prepaid_cost=totals["Total Prepaid Cost"],
+        total_first_year_cost=totals["Total First Year Cost"],
+        total_updated_annual_cost=totals["Total Updated Annual Cost"],
+        total_subscription_term_fee=totals["Total Subscription Term Fee"],
+        in_cents=integer_cents,
+    )
+
+
+def calculate_costs(df: pd.DataFrame, agreement_term: int, months_remaining: float, extension_months: int,
+                    billing_term: str, integer_cents: bool = False) -> CalculationResult:
+    """
+    Calculates per-line and total co-terming costs for one agreement.
+
+    Every row of ``df`` is priced as a line item. The totals come back as
+    separate fields on the CalculationResult rather than as an extra row.
+    With integer_cents=True amounts are computed and returned as int64 cents
+    (see _cost_columns_cents), so totals are exact sums; format them with
+    coterm.money.format_money(value, result.in_cents).
+    """
+    return _price_line_items(_prepare_line_items(df), agreement_term, months_remaining, extension_months,
+                             billing_term, integer_cents=integer_cents)
+
+
+def calculate_all_billing_terms(df: pd.DataFrame, agreement_term: int, months_remaining: float,
+                                extension_months: int) -> Dict[str, CalculationResult]:
+    """
+    calculate_costs for every billing term at once, keyed by billing term.
+
+    The line items are prepared and the term-independent columns (current and
+    updated costs) computed once, then shared by the three billing terms.
+    """
+    df = _prepare_line_items(df)
+    shared = _shared_cost_columns(df['Unit Quantity'], df['Annual Unit Fee'], df['Additional Licenses'])
+    return {
+        billing_term: _price_line_items(df, agreement_term, months_remaining, extension_months, billing_term,
+                                        shared)
+        for billing_term in BILLING_TERMS
+    }
+
+
+# Columns of the billing term comparison table
+COMPARISON_COLUMNS = ["Current Cost", "First Payment", "Updated Annual Cost", "Total Over Term"]
+
+
+def compare_billing_terms(results: Dict[str, CalculationResult]) -> pd.DataFrame:
+    """
+    Side-by-side summary of calculate_all_billing_terms, one row per billing term.
+
+    "First Payment" is the first month, first year or prepaid co-termed cost, and
+    "Total Over Term" is the subscription term fee (the remaining subscription
+    total for Prepaid). "Updated Annual Cost" is shown for every term, including
+    Prepaid, whose quote totals leave it out.
+    """
+    rows = {}
+    for billing_term, result in results.items():
+        if billing_term == 'Prepaid':
+            total_over_term = result.totals.get('Remaining Subscription Total', 0)
+        else:
+            total_over_term = result.total_subscription_term_fee
+        rows[billing_term] = [result.total_current_cost, result.first_period_cost,
+                              result.line_items['Updated Annual Cost'].sum(), total_over_term]
+    comparison = pd.DataFrame.from_dict(rows, orient="index", columns=COMPARISON_COLUMNS, dtype=float)
+    comparison.index.name = "Billing Term"
+    return comparison
@@ -0,0 +1,227 @@
+"""
+Streaming import of BOM files (CSV, TSV and XLSX).
+
+BOM exports can run to hundreds of thousands of rows, so they are read in
+fixed-size chunks with every column read as text, mapped onto the four
+line-item columns and coerced with normalize_line_items. Each chunk can go
+through the cost engine on its own and the per-chunk results are combined,
+so memory use depends on the chunk size rather than on the file size.
+"""
+import os
+import re
+from typing import Dict, Iterable, Iterator, Optional
+
+import pandas as pd
+
+from .engine import LINE_ITEM_COLUMNS, CalculationResult, calculate_costs
+from .line_items import normalize_line_items
+
+
+BOM_FILE_TYPES = ("csv", "tsv", "xlsx")
+
+DEFAULT_CHUNKSIZE = 50_000
+
+# Header spellings seen in BOM exports, after _header_key, for each line-item column
+BOM_COLUMN_ALIASES = {
+    "Cloud Service Description": ["cloud service description", "service description", "description",
+                                  "product description", "item description", "service", "product", "item"],
+    "Unit Quantity": ["unit quantity", "quantity", "qty", "current quantity", "licenses", "units"],
+    "Annual Unit Fee": ["annual unit fee", "license cost", "unit fee", "unit price", "unit list price",
+                        "unit net price", "list price", "net price", "price"],
+    "Additional Licenses": ["additional licenses", "additional licences", "add licenses", "additional quantity",
+                            "additional qty", "new licenses"],
+}
+
+# Additional Licenses may be left out of a BOM; it then counts as 0
+REQUIRED_BOM_COLUMNS = ["Cloud Service Description", "Unit Quantity", "Annual Unit Fee"]
+
+
+def _header_key(header) -> str:
+    """Lower-cases a header and drops punctuation such as "($)" so spellings compare equal."""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", str(header).lower()).split())
+
+
+def map_bom_columns(headers: Iterable, column_map: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Works out which file column feeds each line-item column.
+
+    Returns {file header: line-item column}. ``column_map`` ({file header:
+    line-item column}) overrides the automatic matching. Raises ValueError when
+    a required column can't be found.
+    """
+    headers = list(headers)
+    mapping = dict(column_map or {})
+    unknown = set(mapping.values()) - set(LINE_ITEM_COLUMNS)
+    if unknown:
+        raise ValueError(f"map_bom_columns(): unknown line-item columns {sorted(unknown)}")
+
+    keys = {}
+    for header in headers:
+        keys.setdefault(_header_key(header), header)
+
+    for target, aliases in BOM_COLUMN_ALIASES.items():
+        if target in mapping.values():
+            continue
+        for alias in aliases:
+            header = keys.get(alias)
+            if header is not None and header not in mapping:
+                mapping[header] = target
+                break
+
+    missing = [col for col in REQUIRED_BOM_COLUMNS if col not in mapping.values()]
+    if missing:
+        raise ValueError(f"map_bom_columns(): could not find columns for {missing} in {headers}")
+    return mapping
+
+
+def _file_type(source, file_type=None) -> str:
+    if file_type is None:
+        name = source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", "")
+        file_type = os.path.splitext(str(name))[1].lstrip(".").lower()
+        file_type = {"txt": "tsv", "xlsm": "xlsx"}.get(file_type, file_type)
+    if file_type not in BOM_FILE_TYPES:
+        raise ValueError(f"Unsupported BOM file type '{file_type}' (expected one of {BOM_FILE_TYPES})")
+    return file_type
+
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def _text_chunks(source, sep, chunksize, column_map):
+    header = pd.read_csv(source, sep=sep, nrows=0).columns
+    _rewind(source)
+    mapping = map_bom_columns(header, column_map)
+
+    reader = pd.read_csv(source, sep=sep, chunksize=chunksize, usecols=list(mapping),
+                         dtype={col: str for col in mapping}, skipinitialspace=True)
+    for chunk in reader:
+        yield chunk.rename(columns=mapping)
+
+
+def _xlsx_chunks(source, chunksize, column_map, sheet_name):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise ImportError("Reading XLSX BOMs needs openpyxl: pip install openpyxl") from e
+
+    # Read-only mode streams rows from the sheet instead of loading the workbook
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        mapping = map_bom_columns([h for h in header if h is not None], column_map)
+        positions = [i for i, h in enumerate(header) if h in mapping]
+        names = [mapping[header[i]] for i in positions]
+
+        buffer = []
+        for row in rows:
+            buffer.append([str(row[i]) if i < len(row) and row[i] is not None else None for i in positions])
+            if len(buffer) == chunksize:
+                yield pd.DataFrame(buffer, columns=names, dtype=object)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=names, dtype=object)
+    finally:
+        workbook.close()
+
+
+def iter_bom_chunks(source, chunksize: int = DEFAULT_CHUNKSIZE, column_map: Optional[Dict[str, str]] = None,
+                    file_type: Optional[str] = None, sheet_name: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Reads a BOM file chunk by chunk as typed line-item DataFrames.
+
+    Parameters:
+    -----------
+    source: str, path or file-like - The BOM file (an uploaded file works too)
+    chunksize: int - Rows per chunk
+    column_map: dict - Optional {file header: line-item column} overrides
+    file_type: str - "csv", "tsv" or "xlsx"; taken from the file name if omitted
+    sheet_name: str - XLSX sheet to read (default: the first sheet)
+
+    Returns:
+    --------
+    Iterator of DataFrames with LINE_ITEM_COLUMNS, shaped like LineItemBuffer.to_frame().
+    Blank rows are skipped and the row index continues across chunks.
+    """
+    if chunksize < 1:
+        raise ValueError("iter_bom_chunks(): chunksize must be at least 1")
+
+    file_type = _file_type(source, file_type)
+    if file_type == "xlsx":
+        chunks = _xlsx_chunks(source, chunksize, column_map, sheet_name)
+    else:
+        chunks = _text_chunks(source, "\t" if file_type == "tsv" else ",", chunksize, column_map)
+
+    rows_read = 0
+    for chunk in chunks:
+        line_items = normalize_line_items(chunk)
+        line_items.index += rows_read
+        rows_read += len(line_items)
+        if len(line_items):
+            yield line_items
+
+
+def read_bom(source, chunksize: int = DEFAULT_CHUNKSIZE, column_map: Optional[Dict[str, str]] = None,
+             file_type: Optional[str] = None, sheet_name: Optional[str] = None) -> pd.DataFrame:
+    """Reads a whole BOM file into one typed line-item DataFrame (see iter_bom_chunks)."""
+    chunks = list(iter_bom_chunks(source, chunksize, column_map, file_type, sheet_name))
+    if not chunks:
+        return normalize_line_items(pd.DataFrame(columns=LINE_ITEM_COLUMNS))
+    return pd.concat(chunks, ignore_index=True)
+
+
+def stream_bom_costs(source, agreement_term: int, months_remaining: float, extension_months: int,
+                     billing_term: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                     column_map: Optional[Dict[str, str]] = None, file_type: Optional[str] = None,
+                     sheet_name: Optional[str] = None) -> Iterator[CalculationResult]:
+    """Prices a BOM file one chunk at a time, yielding a CalculationResult per chunk."""
+    for line_items in iter_bom_chunks(source, chunksize, column_map, file_type, sheet_name):
+        yield calculate_costs(line_items, agreement_term, months_remaining, extension_months, billing_term)
+
+
+def combine_results(results: Iterable[CalculationResult], keep_line_items: bool = True) -> CalculationResult:
+    """
+    Merges the per-chunk results of one quote into a single CalculationResult.
+
+    With keep_line_items=False only the totals are accumulated and line_items
+    comes back empty (with the right columns), so a whole file can be priced in
+    memory proportional to one chunk.
+    """
+    combined = None
+    frames = []
+    fee_sum = 0.0
+    count = 0
+    headline = ["total_current_cost", "total_prepaid_cost", "total_first_year_cost",
+                "total_updated_annual_cost", "total_subscription_term_fee"]
+
+    for result in results:
+        if combined is None:
+            combined = CalculationResult(
+                result.line_items.iloc[:0], {}, result.billing_term, result.agreement_term,
+                result.months_remaining, result.extension_months, in_cents=result.in_cents
+            )
+        for name in headline:
+            setattr(combined, name, getattr(combined, name) + getattr(result, name))
+        for col, value in result.totals.items():
+            if col != "Annual Unit Fee":
+                combined.totals[col] = combined.totals.get(col, 0) + value
+        fee_sum += result.line_items["Annual Unit Fee"].sum()
+        count += len(result.line_items)
+        if keep_line_items:
+            frames.append(result.line_items)
+
+    if combined is None:
+        raise ValueError("combine_results(): no line items to combine")
+
+    combined.totals["Annual Unit Fee"] = fee_sum / count if count else float("nan")
+    # Keep the totals in the same order as a single calculate_costs run
+    order = list(result.totals)
+    combined.totals = {col: combined.totals[col] for col in order}
+    if keep_line_items:
+        combined.line_items = pd.concat(frames, ignore_index=True)
+    return combined
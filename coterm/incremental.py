@@ -0,0 +1,172 @@
+"""
+Incremental recalculation for interactive editing.
+
+An IncrementalCalculator remembers the last quote it priced: the line-item
+inputs, the per-row cost columns and running column sums. When it is asked to
+price the quote again with the same agreement inputs, it compares the new line
+items with the old ones row by row (row i is line item i, the same item the
+service_{i}/qty_{i}/fee_{i}/add_lic_{i} widgets edit), prices only the rows that
+changed, were added or were removed, and moves the totals by the difference.
+A change to the agreement term, months remaining, extension or billing term
+reprices everything.
+"""
+import numpy as np
+import pandas as pd
+
+from .engine import (COST_COLUMNS, LINE_ITEM_COLUMNS, SUMMED_COLUMNS, TOTAL_SOURCES, CalculationResult, _cost_columns,
+                     _prepare_line_items, _price_line_items)
+
+
+class IncrementalCalculator:
+    """
+    Prices one quote repeatedly, redoing only the line items that changed.
+
+    ``calculate`` takes the same arguments as calculate_costs and returns the same
+    CalculationResult; the per-row columns are identical to a full run, while
+    totals adjusted by deltas can differ from a full re-sum in the last bits
+    of a float (far below a cent).
+    """
+
+    def __init__(self, max_dirty_fraction=0.5):
+        # Above this share of changed rows a full recompute is cheaper than patching
+        self.max_dirty_fraction = max_dirty_fraction
+        self.reset()
+
+    def reset(self):
+        """Forgets the previous quote; the next calculate does a full recompute."""
+        self._params = None
+        self._columns = None  # Column name -> ndarray, line-item inputs followed by cost columns
+        self._descriptions = None  # The description column as a Series, rebuilt only when it changes
+        self._sums = None
+        self.full_recomputes = 0
+        self.incremental_updates = 0
+        self.last_dirty_rows = 0
+
+    def stats(self):
+        return {"full_recomputes": self.full_recomputes, "incremental_updates": self.incremental_updates,
+                "last_dirty_rows": self.last_dirty_rows,
+                "line_items": 0 if self._columns is None else len(self._columns["Unit Quantity"])}
+
+    def calculate(self, df: pd.DataFrame, agreement_term, months_remaining, extension_months,
+                  billing_term) -> CalculationResult:
+        """calculate_costs, reusing the rows that haven't changed since the last call."""
+        params = (agreement_term, months_remaining, extension_months, billing_term)
+        if self._params != params or self._columns is None:
+            return self._full_recompute(_prepare_line_items(df[LINE_ITEM_COLUMNS]), params)
+
+        inputs = self._input_arrays(df)
+        dirty_rows = self._changed_rows(inputs)
+        row_count = len(inputs["Unit Quantity"])
+        changed = len(dirty_rows) + abs(row_count - len(self._columns["Unit Quantity"]))
+        if changed > self.max_dirty_fraction * max(row_count, 1):
+            return self._full_recompute(pd.DataFrame(inputs), params)
+        return self._apply_changes(inputs, dirty_rows, params)
+
+    @staticmethod
+    def _input_arrays(df):
+        """The line-item columns as arrays, coerced the way calculate_costs coerces them."""
+        inputs = {}
+        for col in LINE_ITEM_COLUMNS:
+            values = df[col]
+            if col == "Cloud Service Description":
+                values = values.astype(str)
+            elif values.dtype == object:
+                values = pd.to_numeric(values, errors='coerce').fillna(0)
+            inputs[col] = values.to_numpy()
+        return inputs
+
+    def _changed_rows(self, inputs):
+        """Positions of rows present before and now whose inputs differ."""
+        common = min(len(inputs["Unit Quantity"]), len(self._columns["Unit Quantity"]))
+        changed = np.zeros(common, dtype=bool)
+        for col in LINE_ITEM_COLUMNS:
+            changed |= self._columns[col][:common] != inputs[col][:common]
+        return np.flatnonzero(changed)
+
+    def _full_recompute(self, inputs, params):
+        result = _price_line_items(inputs, *params)
+        line_items = result.line_items
+        self._params = params
+        self._columns = {col: line_items[col].to_numpy(copy=True) for col in line_items.columns}
+        self._descriptions = line_items["Cloud Service Description"]
+        # Running sums of every numeric column, kept up to date by _apply_changes
+        self._sums = {col: line_items[col].sum() for col in self._summed_columns(params[3])}
+        self.full_recomputes += 1
+        self.last_dirty_rows = len(line_items)
+        return result
+
+    @staticmethod
+    def _summed_columns(billing_term):
+        return ["Unit Quantity", "Additional Licenses", "Annual Unit Fee"] + COST_COLUMNS[billing_term]
+
+    @staticmethod
+    def _price_rows(inputs, rows, params):
+        """Input and cost columns for the given row positions (or slice) of ``inputs``."""
+        priced = {col: values[rows] for col, values in inputs.items()}
+        priced.update(_cost_columns(priced['Unit Quantity'], priced['Annual Unit Fee'],
+                                    priced['Additional Licenses'], *params))
+        return priced
+
+    def _apply_changes(self, inputs, dirty_rows, params):
+        previous = self._columns
+        old_count = len(previous["Unit Quantity"])
+        new_count = len(inputs["Unit Quantity"])
+        common = min(old_count, new_count)
+
+        repriced = self._price_rows(inputs, dirty_rows, params)
+        added = self._price_rows(inputs, slice(common, new_count), params)
+
+        # Move the running sums by what changed, was added or was removed
+        for col in self._sums:
+            old_values = previous[col]
+            self._sums[col] += (np.sum(repriced[col]) - np.sum(old_values[dirty_rows])
+                                + np.sum(added[col]) - np.sum(old_values[common:]))
+
+        if new_count != old_count or np.any(previous["Cloud Service Description"][dirty_rows]
+                                            != repriced["Cloud Service Description"]):
+            self._descriptions = None
+
+        columns = {}
+        for col, old_values in previous.items():
+            # An edit can widen a column (a quantity of 7.5 in an int64 column); never cast it back down
+            dtype = np.result_type(old_values, np.asarray(repriced[col]), np.asarray(added[col]))
+            values = old_values[:common].astype(dtype, copy=False)
+            values[dirty_rows] = repriced[col]
+            if new_count > common:
+                values = np.concatenate([values, np.asarray(added[col], dtype=dtype)])
+            columns[col] = values
+        self._columns = columns
+
+        self.incremental_updates += 1
+        self.last_dirty_rows = len(dirty_rows) + abs(new_count - old_count)
+        return self._result(params)
+
+    def _result(self, params) -> CalculationResult:
+        agreement_term, months_remaining, extension_months, billing_term = params
+        if self._descriptions is None:
+            self._descriptions = pd.Series(self._columns["Cloud Service Description"], dtype=str)
+        # The frame copies the arrays, so later patches don't leak into earlier results
+        line_items = pd.DataFrame({**self._columns, "Cloud Service Description": self._descriptions}, copy=True)
+        count = len(line_items)
+
+        totals = {
+            "Unit Quantity": self._sums["Unit Quantity"],
+            "Additional Licenses": self._sums["Additional Licenses"],
+            "Annual Unit Fee": self._sums["Annual Unit Fee"] / count if count else np.nan,
+        }
+        for col in SUMMED_COLUMNS[billing_term]:
+            if col in self._sums:
+                totals[col] = self._sums[col]
+
+        headline = {
+            total_col: (self._sums[source] if source is not None else 0)
+            for total_col, source in TOTAL_SOURCES[billing_term].items()
+        }
+        return CalculationResult(
+            line_items, totals, billing_term, agreement_term, months_remaining, extension_months,
+            total_current_cost=headline["Total Current Cost"],
+            total_prepaid_cost=headline["Total Prepaid Cost"],
+            total_first_year_cost=headline["Total First Year Cost"],
+            total_updated_annual_cost=headline["Total Updated Annual Cost"],
+            total_subscription_term_fee=headline["Total Subscription Term Fee"],
+        )
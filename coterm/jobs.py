@@ -0,0 +1,438 @@
+"""
+In-process job queue for bulk reports that take too long for one request.
+
+A BulkReportQueue runs an asyncio event loop on a background thread. Jobs
+wait in a bounded asyncio.Queue and run one at a time (or ``concurrency``
+at a time): the portfolio is priced with calculate_portfolio on a thread,
+then PDF reports and emails are rendered chunk by chunk in a process pool,
+with a bounded number of chunks in flight. Results are written as they
+arrive to a zip file in the job's directory under the store, next to a
+status.json that tracks progress, so a job's output never has to fit in
+memory and finished jobs are still listed after a restart. Splitting the
+portfolio and writing the zip happen on threads too, so the loop is always
+free to answer cancel() and status reads, and a pool broken by a worker
+dying is replaced for the next job. There is no
+broker: everything runs inside the calling process (the Streamlit server,
+say).
+
+    jobs = bulk_report_queue()
+    job_id = jobs.submit(portfolio)
+    jobs.status(job_id)  # JobStatus(state="running", done=120, total=1000, ...)
+    jobs.cancel(job_id)
+"""
+import asyncio
+import atexit
+import collections
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+import zipfile
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+import pandas as pd
+
+from .batch import PORTFOLIO_COLUMNS, calculate_portfolio, split_portfolio
+from .bulk import DEFAULT_CHUNKSIZE, process_pool, render_report, safe_filename, submit_chunks
+from .charts import cost_chart_data, render_chart_png
+from .email_template import generate_email_template
+
+
+JOB_STATES = ("queued", "running", "done", "failed", "cancelled")
+FINISHED_STATES = ("done", "failed", "cancelled")
+
+DEFAULT_STORE_DIR = os.path.join(tempfile.gettempdir(), "cotermcalc-jobs")
+DEFAULT_MAX_QUEUED = 8
+
+# A job's progress as saved in its status.json; done and failed count agreements, and owner is the
+# PID of the process running the job (None in statuses saved before it was recorded)
+JobStatus = collections.namedtuple(
+    "JobStatus",
+    ["job_id", "name", "state", "total", "done", "failed", "message", "created", "finished", "output", "owner"],
+    defaults=[None]
+)
+
+# Every BulkReportQueue alive in this process, so recovery can tell this process's jobs from a
+# dead process's that had the same PID
+_live_queues = weakref.WeakSet()
+
+
+def _process_exists(pid):
+    """Whether a process with this PID is running; assumed so where that can't be checked without side effects."""
+    if os.name != "posix":
+        return True  # os.kill() would terminate the process on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Someone else's process
+    return True
+
+
+class JobQueueFull(Exception):
+    """Raised by BulkReportQueue.submit when max_queued jobs are already waiting."""
+
+
+def _render_job_chunk(chunk, logo_path, timeout, include_chart, emails):
+    """Runs in a worker process: (RenderedReport, email text or None, chart PNG or None) per agreement."""
+    rendered = []
+    for agreement_id, result in chunk:
+        report = render_report(agreement_id, result, logo_path, timeout, include_chart)
+        email = png = None
+        if emails:
+            email = generate_email_template(result)
+            if include_chart:
+                try:
+                    png = render_chart_png(cost_chart_data(result), result.billing_term)
+                except ImportError:
+                    pass
+        rendered.append((report, email, png))
+    return rendered
+
+
+async def _in_thread(func, *args):
+    """
+    Runs blocking work on the loop's default thread pool. If the job is
+    cancelled meanwhile, waits for the work to finish before passing the
+    cancellation on, so the zip file is never closed mid-write.
+    """
+    future = asyncio.get_running_loop().run_in_executor(None, func, *args)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await asyncio.wait([future])
+        raise
+
+
+def _write_tables(archive, lines, totals):
+    archive.writestr("line_items.csv", lines.to_csv(index=False))
+    archive.writestr("agreement_totals.csv", totals.to_csv())
+
+
+def _write_chunk(archive, rendered):
+    """Adds a rendered chunk's reports (or their errors), emails and chart images to the zip."""
+    for report, email, png in rendered:
+        name = safe_filename(report.agreement_id)
+        if report.error is None:
+            archive.writestr(f"reports/{name}.pdf", report.pdf)
+        else:
+            archive.writestr(f"reports/{name}.error.txt", report.error)
+        if email is not None:
+            archive.writestr(f"emails/{name}.txt", email)
+        if png is not None:
+            archive.writestr(f"emails/{name}.png", png)
+
+
+class JobStore:
+    """One directory per job under ``root``, holding status.json and the job's results.zip."""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def job_dir(self, job_id):
+        return os.path.join(self.root, job_id)
+
+    def output_path(self, job_id):
+        return os.path.join(self.job_dir(job_id), "results.zip")
+
+    def write_status(self, status: JobStatus):
+        """Saves the status atomically, so a reader never sees half a file."""
+        job_dir = self.job_dir(status.job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        descriptor, partial = tempfile.mkstemp(dir=job_dir, suffix=".tmp")
+        with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+            json.dump(status._asdict(), f)
+        os.replace(partial, os.path.join(job_dir, "status.json"))
+
+    def read_status(self, job_id) -> Optional[JobStatus]:
+        try:
+            with open(os.path.join(self.job_dir(job_id), "status.json"), encoding="utf-8") as f:
+                return JobStatus(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def statuses(self) -> List[JobStatus]:
+        """Every job in the store, oldest first."""
+        statuses = [self.read_status(job_id) for job_id in os.listdir(self.root)]
+        return sorted((status for status in statuses if status is not None), key=lambda status: status.created)
+
+
+class _Job:
+    """A waiting or running job's inputs and live progress; only the event loop thread changes it."""
+
+    def __init__(self, status, portfolio, options):
+        self.status = status
+        self.portfolio = portfolio
+        self.options = options
+        self.task = None
+
+
+class BulkReportQueue:
+    """
+    Runs bulk report jobs on a background asyncio loop.
+
+    Parameters:
+    -----------
+    store_dir: str - Where each job's status.json and results.zip are kept
+    max_queued: int - Jobs allowed to wait; submit raises JobQueueFull beyond that
+    workers: int - Worker processes rendering reports (default: CPU count)
+    chunksize: int - Agreements sent to a worker at a time
+    concurrency: int - Jobs running at once; they share the worker processes
+    """
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR, max_queued=DEFAULT_MAX_QUEUED, workers=None,
+                 chunksize=DEFAULT_CHUNKSIZE, concurrency=1):
+        if max_queued < 1 or chunksize < 1 or concurrency < 1:
+            raise ValueError("BulkReportQueue(): max_queued, chunksize and concurrency must be at least 1")
+        self.store = JobStore(store_dir)
+        self.max_queued = max_queued
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.concurrency = concurrency
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._closed = False
+
+        self._recover_interrupted_jobs()
+        _live_queues.add(self)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="cotermcalc-jobs", daemon=True)
+        self._thread.start()
+        self._call(self._start())
+
+    def _call(self, coroutine):
+        """Runs a coroutine on the queue's loop and waits for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    async def _start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._consumers = [asyncio.ensure_future(self._consume()) for _ in range(self.concurrency)]
+
+    def _recover_interrupted_jobs(self):
+        # Jobs that were waiting or running when their process stopped will never finish; jobs of
+        # another live process sharing the store are left alone
+        for status in self.store.statuses():
+            if status.state not in FINISHED_STATES and not self._owner_alive(status):
+                self.store.write_status(status._replace(
+                    state="failed", message="interrupted by a restart", finished=time.time()
+                ))
+
+    @staticmethod
+    def _owner_alive(status):
+        if status.owner is None:
+            return False
+        if status.owner == os.getpid():
+            # The PID may be a restarted process's; only a queue of this one knows its own jobs
+            return any(queue._has_job(status.job_id) for queue in list(_live_queues))
+        return _process_exists(status.owner)
+
+    def _has_job(self, job_id):
+        """Whether this queue is waiting on or running the job."""
+        with self._lock:
+            return job_id in self._jobs
+
+    def submit(self, portfolio: pd.DataFrame, name=None, convention="30.44", logo_path=None, include_chart=True,
+               emails=True, timeout=None) -> str:
+        """
+        Queues a bulk report job and returns its ID.
+
+        Parameters:
+        -----------
+        portfolio: DataFrame - One row per line item with PORTFOLIO_COLUMNS (see calculate_portfolio)
+        name: str - Shown in job listings (default: the job ID)
+        convention: str - Months-remaining day-count convention
+        logo_path: str - Logo image for every PDF report (optional)
+        include_chart: bool - Add the cost chart to reports and emails (needs Pillow)
+        emails: bool - Also write each agreement's email text
+        timeout: float - Seconds allowed per PDF report (optional)
+        """
+        if self._closed:
+            raise RuntimeError("BulkReportQueue.submit(): the queue has been shut down")
+        missing = [col for col in PORTFOLIO_COLUMNS if col not in portfolio.columns]
+        if missing:
+            raise ValueError(f"BulkReportQueue.submit(): missing columns {missing}")
+
+        job_id = uuid.uuid4().hex[:12]
+        status = JobStatus(job_id, name or job_id, "queued", int(portfolio["Agreement ID"].nunique()), 0, 0, None,
+                           time.time(), None, None, os.getpid())
+        options = {"convention": convention, "logo_path": logo_path, "include_chart": include_chart,
+                   "emails": emails, "timeout": timeout}
+        job = _Job(status, portfolio, options)
+        self._call(self._enqueue(job))
+        return job_id
+
+    async def _enqueue(self, job):
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"{self.max_queued} jobs are already waiting; try again when one has started")
+        self._update(job)
+
+    async def _consume(self):
+        while True:
+            job = await self._queue.get()
+            if job.status.state == "queued":  # Not cancelled while it waited
+                job.task = asyncio.ensure_future(self._run(job))
+                # wait() rather than await, so cancelling the job doesn't cancel this consumer
+                await asyncio.wait([job.task])
+            self._queue.task_done()
+
+    def _update(self, job, **changes):
+        """Changes a job's status and saves it; called on the loop thread."""
+        job.status = job.status._replace(**changes)
+        if job.status.state not in FINISHED_STATES:
+            with self._lock:
+                self._jobs[job.status.job_id] = job
+            self.store.write_status(job.status)
+            return
+        # A finished job is only kept in the store, so a long-running process doesn't hold on to
+        # every job (or a cancelled job's portfolio) it has ever run
+        job.portfolio = None
+        self.store.write_status(job.status)
+        with self._lock:
+            self._jobs.pop(job.status.job_id, None)
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = process_pool(self.workers)
+        return self._executor
+
+    async def _run(self, job):
+        loop = asyncio.get_running_loop()
+        options = job.options
+        output = self.store.output_path(job.status.job_id)
+        self._update(job, state="running", output=output)
+        try:
+            lines, totals = await loop.run_in_executor(None, calculate_portfolio, job.portfolio,
+                                                       options["convention"])
+            job.portfolio = None  # The priced lines hold everything still needed
+            for attempt in range(2):
+                executor = self._get_executor()
+                try:
+                    await self._render(job, output, lines, totals, executor)
+                    break
+                except BrokenProcessPool:
+                    # A worker died (killed, out of memory); the pool can't be used again
+                    self._drop_executor(executor)
+                    # If it broke before this job got anything back, start over once on a fresh pool
+                    if attempt or job.status.done:
+                        raise
+        except asyncio.CancelledError:
+            self._update(job, state="cancelled", message=f"cancelled after {job.status.done} agreements",
+                         finished=time.time())
+        except Exception as e:
+            self._update(job, state="failed", message=f"{type(e).__name__}: {e}", finished=time.time())
+        else:
+            message = f"{job.status.failed} reports failed" if job.status.failed else None
+            self._update(job, state="done", message=message, finished=time.time())
+
+    async def _render(self, job, output, lines, totals, executor):
+        """Renders every agreement into a new results.zip; the event loop only waits and counts."""
+        options = job.options
+        with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            await _in_thread(_write_tables, archive, lines, totals)
+
+            # Keep every worker busy with one chunk queued behind it, and no more. Splitting the
+            # portfolio into agreements happens as chunks are read, so that runs on a thread too.
+            submitted = submit_chunks(
+                executor, split_portfolio(lines, totals), self.chunksize, 2 * self.workers,
+                _render_job_chunk, options["logo_path"], options["timeout"], options["include_chart"],
+                options["emails"]
+            )
+            with contextlib.closing(submitted):
+                while True:
+                    submitted_chunk = await _in_thread(next, submitted, None)
+                    if submitted_chunk is None:
+                        break
+                    rendered = await asyncio.wrap_future(submitted_chunk[1])
+                    failed = sum(report.error is not None for report, _, _ in rendered)
+                    try:
+                        await _in_thread(_write_chunk, archive, rendered)
+                    finally:
+                        # A cancel lets the write finish first, so the chunk is in the zip either way
+                        self._update(job, done=job.status.done + len(rendered),
+                                     failed=job.status.failed + failed)
+
+    def _drop_executor(self, executor):
+        """Shuts down a broken worker pool, so the next job starts a new one."""
+        if self._executor is executor:
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def status(self, job_id) -> Optional[JobStatus]:
+        """The job's latest status (read back from the store once it has finished), or None."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.status if job is not None else self.store.read_status(job_id)
+
+    def statuses(self) -> List[JobStatus]:
+        """Every job this queue or the store knows of, oldest first."""
+        statuses = {status.job_id: status for status in self.store.statuses()}
+        with self._lock:
+            statuses.update((job_id, job.status) for job_id, job in self._jobs.items())
+        return sorted(statuses.values(), key=lambda status: status.created)
+
+    def cancel(self, job_id) -> bool:
+        """
+        Cancels a waiting or running job. Reports already rendered stay in its
+        results.zip. Returns False if the job isn't waiting or running.
+        """
+        return self._call(self._cancel(job_id))
+
+    async def _cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.status.state in FINISHED_STATES:
+            return False
+        if job.task is None:
+            self._update(job, state="cancelled", message="cancelled before it started", finished=time.time())
+        else:
+            job.task.cancel()
+        return True
+
+    def shutdown(self):
+        """Cancels every job, stops the loop and the worker processes."""
+        if self._closed:
+            return
+        self._closed = True
+        _live_queues.discard(self)
+        self._call(self._stop())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+
+    async def _stop(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            await self._cancel(job.status.job_id)
+        running = [job.task for job in jobs if job.task is not None]
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*running, *self._consumers, return_exceptions=True)
+
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+
+def bulk_report_queue(store_dir=DEFAULT_STORE_DIR, **kwargs) -> BulkReportQueue:
+    """
+    The process-wide BulkReportQueue, created on first use and shut down at exit.
+    Arguments only apply to that first call.
+    """
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            _default_queue = BulkReportQueue(store_dir, **kwargs)
+            atexit.register(_default_queue.shutdown)
+        return _default_queue
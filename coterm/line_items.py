@@ -0,0 +1,63 @@
+"""
+Columnar buffer for collecting line items before building a DataFrame.
+
+Appending rows to a DataFrame one at a time copies the whole frame on every
+append. The buffer keeps one plain list per column and builds the typed frame
+once, when it is needed.
+"""
+import pandas as pd
+
+from .engine import LINE_ITEM_COLUMNS
+
+
+class LineItemBuffer:
+    """Collects line items column by column and materializes them as one DataFrame."""
+
+    __slots__ = ("descriptions", "quantities", "fees", "additional_licenses")
+
+    def __init__(self):
+        self.descriptions = []
+        self.quantities = []
+        self.fees = []
+        self.additional_licenses = []
+
+    def __len__(self):
+        return len(self.descriptions)
+
+    def append(self, description, quantity, fee, additional_licenses):
+        self.descriptions.append(description)
+        self.quantities.append(quantity)
+        self.fees.append(fee)
+        self.additional_licenses.append(additional_licenses)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Builds the typed line-item DataFrame (text, int, float, int) in one step."""
+        return pd.DataFrame({
+            "Cloud Service Description": pd.Series(self.descriptions, dtype=str),
+            "Unit Quantity": pd.Series(self.quantities, dtype="int64"),
+            "Annual Unit Fee": pd.Series(self.fees, dtype="float64"),
+            "Additional Licenses": pd.Series(self.additional_licenses, dtype="int64"),
+        }, columns=LINE_ITEM_COLUMNS)
+
+
+def normalize_line_items(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Coerces an edited or pasted line-item table to the typed layout to_frame builds.
+
+    Rows left completely blank are dropped, currency text such as "$1,200.00" is
+    parsed, and missing or unreadable numbers count as 0.
+    """
+    df = df.reindex(columns=LINE_ITEM_COLUMNS).dropna(how="all")
+
+    def numeric(col):
+        values = df[col]
+        if not pd.api.types.is_numeric_dtype(values):
+            values = values.astype(str).str.replace(r"[$,\s]", "", regex=True)
+        return pd.to_numeric(values, errors='coerce').fillna(0)
+
+    return pd.DataFrame({
+        "Cloud Service Description": df["Cloud Service Description"].fillna("").astype(str).str.strip(),
+        "Unit Quantity": numeric("Unit Quantity").astype("int64"),
+        "Annual Unit Fee": numeric("Annual Unit Fee").astype("float64"),
+        "Additional Licenses": numeric("Additional Licenses").astype("int64"),
+    }, columns=LINE_ITEM_COLUMNS).reset_index(drop=True)
@@ -0,0 +1,79 @@
+"""
+Integer-cents money helpers.
+
+calculate_costs(..., integer_cents=True) keeps every amount as int64 cents and
+prorates with exact integer numerators and denominators, rounding once per
+value. These helpers convert to and from cents, do that rounding, and format
+amounts as "$x,xxx.xx" for the PDF, email and app tables, for results in
+either unit.
+"""
+import functools
+import math
+
+import numpy as np
+
+
+# Largest intermediate product allowed before int64 arithmetic could overflow
+MAX_CENTS_PRODUCT = 2 ** 62
+
+
+def to_cents(values):
+    """Dollar amounts (scalar or array) as int64 cents, rounded to the nearest cent."""
+    return np.rint(np.asarray(values, dtype=float) * 100).astype(np.int64)
+
+
+def dollars(value, in_cents=False):
+    """An amount in dollars; ``value`` is divided by 100 when it is in cents."""
+    return value / 100 if in_cents else value
+
+
+def divide_round(numerator, denominator):
+    """
+    numerator / denominator rounded to the nearest integer, halves away from zero.
+
+    Both arguments are integers (or int64 arrays); the division is exact, so
+    the only rounding is this one.
+    """
+    numerator = np.asarray(numerator, dtype=np.int64)
+    quotient, remainder = np.divmod(np.abs(numerator), denominator)
+    quotient = quotient + (2 * remainder >= denominator)
+    return np.where(numerator < 0, -quotient, quotient)
+
+
+def conditional_round_cents(numerator, denominator, threshold=25):
+    """
+    conditional_round for the exact amount numerator / denominator cents.
+
+    Amounts within ``threshold`` cents of a whole dollar become that dollar;
+    everything else is rounded to the cent. Returns int64 cents.
+    """
+    numerator = np.asarray(numerator, dtype=np.int64)
+    denominator = np.asarray(denominator, dtype=np.int64)
+    whole_dollars = divide_round(numerator, 100 * denominator)
+    near_whole = np.abs(numerator - 100 * whole_dollars * denominator) < threshold * denominator
+    return np.where(near_whole, 100 * whole_dollars, divide_round(numerator, denominator))
+
+
+def check_cents_range(*factors):
+    """Raises OverflowError if the product of the factors' largest magnitudes could overflow int64."""
+    bound = 1
+    for factor in factors:
+        bound *= max(int(np.max(np.abs(factor), initial=0)), 1)
+    if bound > MAX_CENTS_PRODUCT:
+        raise OverflowError("Amounts are too large for integer-cents arithmetic; use the float engine")
+
+
+def format_money(value, in_cents=False) -> str:
+    """Formats an amount as "$x,xxx.xx"; ``in_cents`` says ``value`` is in cents."""
+    if not in_cents or (isinstance(value, float) and math.isnan(value)):
+        return "${:,.2f}".format(dollars(value, in_cents))
+    # Whole cents format exactly; fractions (averages, monthly shares) round half away from zero
+    cents = int(math.floor(abs(value) + 0.5)) if isinstance(value, float) else abs(int(value))
+    whole, part = divmod(cents, 100)
+    sign = "-" if value < 0 and cents else ""
+    return f"${sign}{whole:,}.{part:02d}"
+
+
+def money_formatter(in_cents=False):
+    """format_money bound to a unit, for Styler.format and similar callbacks."""
+    return functools.partial(format_money, in_cents=in_cents)
@@ -0,0 +1,185 @@
+"""
+Declarative tables for the PDF report.
+
+A table is a list of TableColumn specs. draw_table formats every column in
+one pass before drawing anything, then emits the rows in a single loop: long
+text is word-wrapped to the column width, rows alternate fill colours, and
+the header row is drawn again at the top of every page the table runs onto.
+"""
+import collections
+
+
+# kind is "text", "count" or "money"; source is the line-item column (or totals key)
+TableColumn = collections.namedtuple("TableColumn", ["header", "width", "source", "kind"])
+
+_ALIGN = {"text": "L", "count": "C", "money": "R"}
+
+HEADER_HEIGHT = 10
+ROW_HEIGHT = 8
+WRAPPED_LINE_HEIGHT = 4  # Line pitch inside a wrapped cell (body text is 8pt, about 2.8mm)
+
+# The "Detailed Service Information" table for each billing term
+DETAIL_TABLE_COLUMNS = {
+    "Annual": [
+        TableColumn("Service Description", 65, "Cloud Service Description", "text"),
+        TableColumn("Quantity", 22, "Unit Quantity", "count"),
+        TableColumn("Unit Fee", 30, "Annual Unit Fee", "money"),
+        TableColumn("Add. Licenses", 25, "Additional Licenses", "count"),
+        TableColumn("First Year Cost", 40, "First Year Co-Termed Cost", "money"),
+        TableColumn("Current Annual", 40, "Current Annual Cost", "money"),
+        TableColumn("Updated Annual", 40, "Updated Annual Cost", "money"),
+    ],
+    "Monthly": [
+        TableColumn("Service Description", 65, "Cloud Service Description", "text"),
+        TableColumn("Quantity", 22, "Unit Quantity", "count"),
+        TableColumn("Unit Fee", 30, "Annual Unit Fee", "money"),
+        TableColumn("Add. Licenses", 25, "Additional Licenses", "count"),
+        TableColumn("First Month Cost", 35, "First Month Co-Termed Cost", "money"),
+        TableColumn("Current Monthly", 35, "Current Monthly Cost", "money"),
+        TableColumn("New Monthly", 35, "New Monthly Cost", "money"),
+    ],
+    "Prepaid": [
+        TableColumn("Service Description", 65, "Cloud Service Description", "text"),
+        TableColumn("Quantity", 25, "Unit Quantity", "count"),
+        TableColumn("Unit Fee", 40, "Annual Unit Fee", "money"),
+        TableColumn("Add. Licenses", 30, "Additional Licenses", "count"),
+        TableColumn("Current Prepaid", 40, "Current Prepaid Cost", "money"),
+        TableColumn("Additional Cost", 40, "Prepaid Co-Termed Cost", "money"),
+    ],
+}
+
+
+def format_column(column, values, money_format):
+    """The display strings for one column's values (a Series or list); None becomes ""."""
+    if column.kind == "count":
+        return ["" if value is None else str(int(value)) for value in list(values)]
+    if column.kind == "money":
+        return ["" if value is None else money_format(value) for value in list(values)]
+    return ["" if value is None else str(value) for value in list(values)]
+
+
+def wrap_text(pdf, text, width):
+    """Splits ``text`` into lines no wider than ``width`` in the current font (words are kept whole where possible)."""
+    if pdf.get_string_width(text) <= width:
+        return [text]
+
+    lines = []
+    line = ""
+    for word in text.split():
+        candidate = f"{line} {word}" if line else word
+        if pdf.get_string_width(candidate) <= width:
+            line = candidate
+            continue
+        if line:
+            lines.append(line)
+        # A single word wider than the column is broken between characters
+        while pdf.get_string_width(word) > width and len(word) > 1:
+            cut = len(word) - 1
+            while cut > 1 and pdf.get_string_width(word[:cut]) > width:
+                cut -= 1
+            lines.append(word[:cut])
+            word = word[cut:]
+        line = word
+    if line:
+        lines.append(line)
+    return lines or [""]
+
+
+def _draw_header(pdf, columns, x, fill_color):
+    pdf.set_fill_color(*fill_color)
+    pdf.set_text_color(255, 255, 255)
+    pdf.set_font('Arial', 'B', 9)
+    pdf.set_x(x)
+    for column in columns:
+        pdf.cell(column.width, HEADER_HEIGHT, column.header, 1, 0, 'C', 1)
+    pdf.ln(HEADER_HEIGHT)
+
+
+def _row_height(columns, cells):
+    line_count = max((len(cell) for cell, column in zip(cells, columns) if column.kind == "text"), default=1)
+    return ROW_HEIGHT if line_count == 1 else max(ROW_HEIGHT, line_count * WRAPPED_LINE_HEIGHT + 2)
+
+
+def _draw_row(pdf, columns, x, cells, height, fill):
+    """Draws one row; ``cells`` holds a list of wrapped lines for text columns and a string otherwise."""
+    y = pdf.get_y()
+    pdf.set_x(x)
+    for cell, column in zip(cells, columns):
+        if column.kind != "text":
+            pdf.cell(column.width, height, cell, 1, 0, _ALIGN[column.kind], fill)
+        elif len(cell) == 1:
+            pdf.cell(column.width, height, cell[0], 1, 0, 'L', fill)
+        else:
+            # Box first, then the lines centred in it without borders
+            cell_x = pdf.get_x()
+            pdf.rect(cell_x, y, column.width, height, 'DF' if fill else 'D')
+            top = y + (height - len(cell) * WRAPPED_LINE_HEIGHT) / 2
+            for i, line in enumerate(cell):
+                pdf.set_xy(cell_x, top + i * WRAPPED_LINE_HEIGHT)
+                pdf.cell(column.width, WRAPPED_LINE_HEIGHT, line, 0, 0, 'L')
+            pdf.set_xy(cell_x + column.width, y)
+    pdf.set_y(y + height)
+
+
+def draw_table(pdf, columns, frame, money_format, total_row=None, header_color=(41, 128, 185),
+               total_color=(52, 73, 94), x=None):
+    """
+    Draws a table of ``frame``'s rows with the given TableColumns.
+
+    Parameters:
+    -----------
+    pdf: FPDF - The document, positioned where the table starts
+    columns: list of TableColumn - What to show, in order
+    frame: DataFrame - One table row per row; missing source columns show as 0
+    money_format: callable - Formats "money" columns
+    total_row: dict - Optional values for a highlighted last row, keyed by source column;
+        a value of None leaves the cell empty
+    header_color, total_color: tuple - RGB fills for the header and total rows
+    x: float - Left edge (default: the left margin)
+    """
+    x = pdf.l_margin if x is None else x
+    pdf.set_font('Arial', '', 8)
+    text_width = {column.source: column.width - 2 * pdf.c_margin for column in columns if column.kind == "text"}
+
+    # Format every column up front; the drawing loop only looks strings up
+    formatted = []
+    for column in columns:
+        values = frame[column.source] if column.source in frame.columns else [0] * len(frame)
+        strings = format_column(column, values, money_format)
+        if column.kind == "text":
+            strings = [wrap_text(pdf, text, text_width[column.source]) for text in strings]
+        formatted.append(strings)
+    rows = zip(*formatted)
+
+    # Start on a new page if the header and a few rows won't fit
+    if pdf.get_y() > pdf.h - 60:
+        pdf.add_page()
+    _draw_header(pdf, columns, x, header_color)
+
+    body_fills = ((240, 240, 240), (255, 255, 255))
+    pdf.set_font('Arial', '', 8)
+    pdf.set_text_color(0, 0, 0)
+    for index, cells in enumerate(rows):
+        height = _row_height(columns, cells)
+        if pdf.get_y() + height > pdf.page_break_trigger:
+            pdf.add_page()
+            _draw_header(pdf, columns, x, header_color)
+            pdf.set_font('Arial', '', 8)
+            pdf.set_text_color(0, 0, 0)
+        pdf.set_fill_color(*body_fills[index % 2])
+        _draw_row(pdf, columns, x, cells, height, 1)
+
+    if total_row is not None:
+        pdf.set_font('Arial', 'B', 9)
+        cells = []
+        for column in columns:
+            text = format_column(column, [total_row.get(column.source, 0)], money_format)[0]
+            cells.append(wrap_text(pdf, text, text_width[column.source]) if column.kind == "text" else text)
+        height = _row_height(columns, cells)
+        if pdf.get_y() + height > pdf.page_break_trigger:
+            pdf.add_page()
+            _draw_header(pdf, columns, x, header_color)
+            pdf.set_font('Arial', 'B', 9)
+        pdf.set_fill_color(*total_color)
+        pdf.set_text_color(255, 255, 255)
+        _draw_row(pdf, columns, x, cells, height, 1)
@@ -0,0 +1,440 @@
+"""
+PDF report generation for co-terming results.
+"""
+import io
+import os
+import tempfile
+from datetime import datetime
+from typing import Optional
+
+from fpdf import FPDF
+
+from .assets import pdf_image_info
+from .charts import PNG_SIZE, cost_chart_data, render_chart_png
+from .engine import TOTAL_ROW_LABEL, CalculationResult
+from .money import money_formatter
+from .pdf_table import DETAIL_TABLE_COLUMNS, draw_table
+
+
+class PDF(FPDF):
+    def __init__(self, logo_path=None, **kwargs):
+        super().__init__(**kwargs)
+        self.logo_path = logo_path
+        self.has_header_logo = False  # Track if we've added the logo already
+        self._string_widths = {}  # (font, style, size, text) -> width; tables measure the same strings often
+        
+    def header(self):
+        # Only add the logo in the header if specified
+        # We'll set has_header_logo to True to indicate the logo will be handled by the header
+        if self.logo_path and self.has_header_logo and self.cached_image(self.logo_path, x=15, y=8, w=40):
+            self.ln(20)
+
+    def cached_image(self, path, x=None, y=None, w=0, h=0):
+        """
+        Places an image parsed once per process (see coterm.assets) instead of
+        once per document; returns False if the file doesn't exist.
+        """
+        info = pdf_image_info(path)
+        if info is None:
+            return False
+        if path not in self.images:
+            # fpdf numbers images per document and records object numbers in the dict, so copy it
+            self.images[path] = dict(info, i=len(self.images) + 1)
+        self.image(path, x=x, y=y, w=w, h=h)
+        return True
+        
+    def get_string_width(self, s):
+        key = (self.font_family, self.font_style, self.font_size_pt, s)
+        width = self._string_widths.get(key)
+        if width is None:
+            width = self._string_widths[key] = super().get_string_width(s)
+        return width
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font("Arial", "I", 8)
+        self.set_text_color(128, 128, 128)
+        self.cell(0, 10, f"Page {self.page_no()} of {{nb}}", 0, 0, 'C')
+        
+    # Style functions remain unchanged
+    def header_style(self):
+        self.set_font("Arial", "B", 11)
+        self.set_text_color(52, 73, 94)
+        
+    def section_header_style(self):
+        self.set_font("Arial", "B", 12)
+        self.set_text_color(41, 128, 185)
+        
+    def normal_style(self):
+        self.set_font("Arial", "", 9)
+        self.set_text_color(0, 0, 0)
+        
+    def highlight_style(self):
+        self.set_font("Arial", "B", 10)
+        self.set_text_color(39, 174, 96)
+
+
+def generate_pdf(result: CalculationResult, logo_path: Optional[str] = None,
+                 include_chart: bool = True) -> io.BytesIO:
+    """
+    Creates a professionally formatted PDF report for co-terming cost calculation results.
+    
+    Parameters:
+    -----------
+    result: CalculationResult - The priced quote from calculate_costs
+    logo_path: str - Path to company logo (optional)
+    include_chart: bool - Add the cost comparison chart (needs Pillow; left out without it)
+    
+    Returns:
+    --------
+    BytesIO: A buffer containing the PDF data
+    """
+    billing_term = result.billing_term
+    agreement_term = result.agreement_term
+    months_remaining = result.months_remaining
+    extension_months = result.extension_months
+    total_current_cost = result.total_current_cost
+    total_prepaid_cost = result.total_prepaid_cost
+    total_first_year_cost = result.total_first_year_cost
+    total_updated_annual_cost = result.total_updated_annual_cost
+    total_subscription_term_fee = result.total_subscription_term_fee
+    totals = result.totals
+
+    # Helper function for money formatting (amounts may be integer cents)
+    money_format = money_formatter(result.in_cents)
+    
+    # Create PDF object using our custom subclass and pass the logo_path
+    pdf = PDF(orientation='L', logo_path=None)  # Initialize without logo first
+    pdf.alias_nb_pages()
+    pdf.add_page()
+
+    # Define colors for consistent use throughout the document
+    primary_color = (41, 128, 185)    # Blue
+    secondary_color = (52, 73, 94)    # Dark blue-gray
+    accent_color = (39, 174, 96)      # Green
+    light_bg = (245, 247, 250)        # Light background
+    border_color = (189, 195, 199)    # Light gray
+    
+    # Set margins
+    pdf.set_left_margin(15)
+    pdf.set_right_margin(15)
+    pdf.set_top_margin(15)
+
+    # ------ COVER PAGE HEADER SECTION ------
+    # Manually add logo to the first page for better control
+    try:
+        # Position the logo in the top left (a missing file just leaves it out)
+        if logo_path:
+            pdf.cached_image(logo_path, x=15, y=15, w=40)
+        pdf.set_y(10)  # Ensure content starts below logo
+    except Exception as e:
+        print(f"Could not add logo: {e}")
+        pdf.set_y(30)  # Default position if logo fails
+    
+    # Add date to the upper right corner
+    pdf.set_y(15)
+    pdf.set_x(pdf.w - 80)
+    pdf.normal_style()
+    pdf.cell(65, 6, f"Generated on: {datetime.today().strftime('%B %d, %Y')}", 0, 1, 'R')
+    
+    # Document title - positioned to start after logo
+    pdf.set_y(20)  # Start content below the logo
+    pdf.set_font("Arial", "B", 24)
+    pdf.set_text_color(*primary_color)
+    pdf.cell(0, 20, "Co-Terming Cost Report", 0, 1, 'C')
+    
+    # Billing term subtitle
+    pdf.set_font("Arial", "B", 16)
+    pdf.set_text_color(*secondary_color)
+    pdf.cell(0, 15, f"{billing_term} Billing", 0, 1, 'C')
+    
+    # Add a horizontal divider
+    pdf.set_y(pdf.get_y() + 5)
+    pdf.set_draw_color(*border_color)
+    pdf.set_line_width(0.5)
+    pdf.line(15, pdf.get_y(), pdf.w - 15, pdf.get_y())
+    
+    # ------ AGREEMENT SUMMARY SECTION ------
+    pdf.set_y(pdf.get_y() + 10)
+    pdf.section_header_style()
+    pdf.cell(0, 10, "Agreement Summary", 0, 1, 'L')
+    
+    # Define column width for two-column layout
+    page_width = pdf.w - 30  # Account for left & right margins
+    col_width = page_width / 2  # Two equal columns
+    
+    # Capture the current Y position for the top of both boxes
+    summary_top = pdf.get_y()
+    box_height = 45  # Fixed box height for alignment
+
+    # Left column: Agreement Details Box
+    pdf.set_x(15)
+    pdf.set_fill_color(*light_bg)
+    pdf.rect(15, summary_top, col_width - 5, box_height, 'F')  # Draw background
+    
+    pdf.set_y(summary_top + 5)
+    pdf.set_x(20)
+    pdf.highlight_style()
+    pdf.cell(col_width - 10, 7, "Agreement Details", 0, 1)
+    
+    pdf.normal_style()
+    pdf.set_x(20)
+    pdf.cell(80, 6, f"Agreement Term:", 0, 0)
+    pdf.cell(col_width - 90, 6, f"{agreement_term:.2f} months", 0, 1)
+    
+    pdf.set_x(20)
+    pdf.cell(80, 6, f"Remaining Months:", 0, 0)
+    pdf.cell(col_width - 90, 6, f"{months_remaining:.2f} months", 0, 1)
+    
+    if extension_months > 0:
+        pdf.set_x(20)
+        pdf.cell(80, 6, f"Extension Period:", 0, 0)
+        pdf.cell(col_width - 90, 6, f"{extension_months} months", 0, 1)
+    
+    pdf.set_x(20)
+    pdf.cell(80, 6, f"Total Term:", 0, 0)
+    pdf.cell(col_width - 90, 6, f"{months_remaining + extension_months:.2f} months", 0, 1)
+
+    # Right column: Cost Overview Box
+    pdf.set_y(summary_top)  # Reset to same top position as left box
+    pdf.set_x(15 + col_width + 5)
+    pdf.set_fill_color(*light_bg)
+    pdf.rect(15 + col_width + 5, summary_top, col_width - 5, box_height, 'F')  # Draw background
+    
+    pdf.set_y(summary_top + 5)
+    pdf.set_x(20 + col_width + 5)
+    pdf.highlight_style()
+    pdf.cell(col_width - 10, 7, "Cost Overview", 0, 1)
+    
+    pdf.normal_style()
+    pdf.set_x(20 + col_width + 5)
+    
+    # Display costs based on billing term - use proper label and value based on billing term
+    if billing_term == 'Monthly':
+        # Monthly costs
+        current_monthly = total_current_cost / 12
+        new_monthly = total_updated_annual_cost / 12
+        
+        # Get the first month co-termed cost
+        first_month_co_termed = totals.get('First Month Co-Termed Cost', 0)
+        
+        pdf.cell(80, 6, f"Current Monthly Cost:", 0, 0)
+        pdf.cell(col_width - 90, 6, money_format(current_monthly), 0, 1)
+        
+        pdf.set_x(20 + col_width + 5)
+        pdf.cell(80, 6, f"First Month Co-Termed Cost:", 0, 0)
+        pdf.cell(col_width - 90, 6, money_format(first_month_co_termed), 0, 1)
+        
+        pdf.set_x(20 + col_width + 5)
+        pdf.cell(80, 6, f"New Monthly Cost:", 0, 0)
+        pdf.cell(col_width - 90, 6, money_format(new_monthly), 0, 1)
+    
+    elif billing_term == 'Annual':
+        pdf.cell(80, 6, f"Current Annual Cost:", 0, 0)
+        pdf.cell(col_width - 90, 6, money_format(total_current_cost), 0, 1)
+        
+        pdf.set_x(20 + col_width + 5)
+        pdf.cell(80, 6, f"First Year Co-Termed Cost:", 0, 0)
+        pdf.cell(col_width - 90, 6, money_format(total_first_year_cost), 0, 1)
+        
+        pdf.set_x(20 + col_width + 5)
+        pdf.cell(80, 6, f"Updated Annual Cost:", 0, 0)
+        pdf.cell(col_width - 90, 6, money_format(total_updated_annual_cost), 0, 1)
+    
+    else:  # Prepaid
+        pdf.cell(80, 6, f"Current Prepaid Cost:", 0, 0)
+        pdf.cell(col_width - 90, 6, money_format(total_current_cost), 0, 1)
+        
+        pdf.set_x(20 + col_width + 5)
+        pdf.cell(80, 6, f"Additional Licenses Cost:", 0, 0)
+        pdf.cell(col_width - 90, 6, money_format(total_prepaid_cost), 0, 1)
+        
+        pdf.set_x(20 + col_width + 5)
+        pdf.cell(80, 6, f"Total Remaining Cost:", 0, 0)
+        
+        remaining_total = float(totals.get('Remaining Subscription Total', 0))
+        
+        pdf.cell(col_width - 90, 6, money_format(remaining_total), 0, 1)
+
+    # Ensure the next content starts below both boxes
+    pdf.set_y(summary_top + box_height + 10)  # Add spacing after boxes
+    
+    # ------ REPORT NOTES SECTION ------
+    pdf.ln(15)
+    pdf.section_header_style()
+    pdf.cell(0, 10, "Notes", 0, 1, 'L')
+    
+    pdf.set_font("Arial", "", 9)
+    pdf.set_text_color(80, 80, 80)
+    pdf.cell(0, 8, "- This report was generated automatically by the Co-Terming Cost Calculator.", 0, 1, 'L')
+    pdf.cell(0, 8, "- All figures are based on the information provided and may be subject to change.", 0, 1, 'L')
+    pdf.cell(0, 8, f"- This proposal is valid for 30 days from {datetime.today().strftime('%B %d, %Y')}.", 0, 1, 'L')
+    
+    # ------ DETAILED SERVICE INFORMATION SECTION ------
+    pdf.add_page()
+    
+    # Now we can set the logo for all subsequent pages
+    if logo_path:
+        pdf.logo_path = logo_path
+    
+    pdf.section_header_style()
+    pdf.cell(0, 10, "Detailed Service Information", 0, 1, 'L')
+    pdf.normal_style()
+    pdf.cell(0, 5, "The following table details all services included in this agreement:", 0, 1, 'L')
+    pdf.ln(5)
+    
+    # ------ SERVICE DETAILS TABLE ------
+    # ✅ Columns for each billing term are declared in pdf_table.DETAIL_TABLE_COLUMNS
+    total_row = None
+    if totals:
+        total_row = {**totals, "Cloud Service Description": TOTAL_ROW_LABEL, "Annual Unit Fee": None}
+    draw_table(pdf, DETAIL_TABLE_COLUMNS[billing_term], result.line_items, money_format, total_row=total_row,
+               header_color=primary_color, total_color=secondary_color)
+    pdf.ln(5)
+    
+    # ------ LICENSE SUMMARY SECTION ------
+    pdf.add_page()
+    pdf.section_header_style()
+    pdf.cell(0, 10, "License Summary", 0, 1, 'L')
+    
+    pdf.set_fill_color(*light_bg)
+    pdf.rect(15, pdf.get_y(), pdf.w - 30, 50, 'F')
+    
+    pdf.set_y(pdf.get_y() + 5)
+    pdf.normal_style()
+    
+    total_current = totals.get('Unit Quantity', 0)
+    total_additional = totals.get('Additional Licenses', 0)
+    total_all = total_current + total_additional
+    
+    pdf.set_x(30)
+    pdf.cell(100, 8, "Current Licenses:", 0, 0)
+    pdf.cell(50, 8, f"{int(total_current)}", 0, 1)
+    
+    pdf.set_x(30)
+    pdf.cell(100, 8, "Additional Licenses:", 0, 0)
+    pdf.cell(50, 8, f"{int(total_additional)}", 0, 1)
+    
+    pdf.set_x(30)
+    pdf.set_font("Arial", "B", 10)
+    pdf.cell(100, 8, "Total Licenses After Co-Terming:", 0, 0)
+    pdf.cell(50, 8, f"{int(total_all)}", 0, 1)
+    
+    if total_current > 0:
+        percentage = (total_additional / total_current * 100)
+        pdf.set_x(30)
+        pdf.set_font("Arial", "I", 9)
+        pdf.cell(0, 8, f"Adding {int(total_additional)} licenses represents a {percentage:.1f}% increase", 0, 1)
+    
+    # ------ FINANCIAL SUMMARY SECTION ------
+    pdf.ln(15)
+    pdf.section_header_style()
+    pdf.cell(0, 10, "Financial Summary", 0, 1, 'L')
+    
+    pdf.set_fill_color(*light_bg)
+    pdf.rect(15, pdf.get_y(), pdf.w - 30, 60, 'F')
+    
+    pdf.set_y(pdf.get_y() + 5)
+    pdf.set_x(30)
+    
+    # Display detailed financial summary with appropriate billing term
+    if billing_term == 'Annual':
+        pdf.set_font("Arial", "B", 10)
+        pdf.cell(100, 8, "Current Annual Cost:", 0, 0)
+        pdf.cell(50, 8, money_format(total_current_cost), 0, 1)
+        
+        pdf.set_x(30)
+        pdf.cell(100, 8, "First Year Co-Termed Cost:", 0, 0)
+        pdf.cell(50, 8, money_format(total_first_year_cost), 0, 1)
+        
+        pdf.set_x(30)
+        pdf.cell(100, 8, "Updated Annual Cost:", 0, 0)
+        pdf.cell(50, 8, money_format(total_updated_annual_cost), 0, 1)
+        
+        if total_current_cost > 0:
+            percentage = ((total_updated_annual_cost - total_current_cost) / total_current_cost * 100)
+            pdf.set_x(30)
+            pdf.set_font("Arial", "I", 9)
+            change_text = "increase" if percentage > 0 else "decrease"
+            pdf.cell(0, 8, f"The updated annual cost represents a {abs(percentage):.1f}% {change_text}", 0, 1)
+    
+    elif billing_term == 'Monthly':
+        current_monthly = total_current_cost / 12
+        new_monthly = total_updated_annual_cost / 12
+        
+        pdf.set_font("Arial", "B", 10)
+        pdf.set_x(30)
+        pdf.cell(100, 8, "Current Monthly Cost:", 0, 0)
+        pdf.cell(50, 8, money_format(current_monthly), 0, 1)
+        
+        pdf.set_x(30)
+        first_month_total = totals.get('First Month Co-Termed Cost', 0)
+        pdf.cell(100, 8, "First Month Co-Termed Cost:", 0, 0)
+        pdf.cell(50, 8, money_format(first_month_total), 0, 1)
+        
+        pdf.set_x(30)
+        pdf.cell(100, 8, "New Monthly Cost:", 0, 0)
+        pdf.cell(50, 8, money_format(new_monthly), 0, 1)
+        
+        if current_monthly > 0:
+            percentage = ((new_monthly - current_monthly) / current_monthly * 100)
+            pdf.set_x(30)
+            pdf.set_font("Arial", "I", 9)
+            change_text = "increase" if percentage > 0 else "decrease"
+            pdf.cell(0, 8, f"The new monthly cost represents a {abs(percentage):.1f}% {change_text}", 0, 1)
+            
+    else:  # Prepaid
+        pdf.set_font("Arial", "B", 10)
+        pdf.set_x(30)
+        pdf.cell(100, 8, "Current Prepaid Cost (Remaining):", 0, 0)
+        pdf.cell(50, 8, money_format(total_current_cost), 0, 1)
+        
+        pdf.set_x(30)
+        pdf.cell(100, 8, "Additional Licenses Prepaid Cost:", 0, 0)
+        pdf.cell(50, 8, money_format(total_prepaid_cost), 0, 1)
+        
+        remaining_total = float(totals.get('Remaining Subscription Total', 0))
+        
+        pdf.set_x(30)
+        pdf.cell(100, 8, "Total Remaining Subscription Cost:", 0, 0)
+        pdf.cell(50, 8, money_format(remaining_total), 0, 1)
+    
+    # Total subscription cost summary
+    pdf.ln(5)
+    pdf.set_x(30)
+    pdf.set_font("Arial", "B", 12)
+    pdf.set_text_color(*accent_color)
+    pdf.cell(100, 10, "Total Subscription Term Fee:", 0, 0)
+    pdf.cell(50, 10, money_format(total_subscription_term_fee), 0, 1)
+
+    # ------ COST COMPARISON CHART ------
+    chart = None
+    if include_chart:
+        try:
+            chart = render_chart_png(cost_chart_data(result), billing_term)
+        except ImportError:
+            pass
+    if chart is not None:
+        chart_width = 200
+        chart_height = chart_width * PNG_SIZE[1] / PNG_SIZE[0]
+        if pdf.get_y() + 25 + chart_height > pdf.page_break_trigger:
+            pdf.add_page()
+        else:
+            pdf.ln(10)
+        pdf.section_header_style()
+        pdf.cell(0, 10, "Cost Comparison", 0, 1, 'L')
+        # fpdf 1.7 only reads images from a file, which it parses as soon as it is placed
+        with tempfile.TemporaryDirectory() as tmp:
+            chart_path = os.path.join(tmp, "cost_chart.png")
+            with open(chart_path, "wb") as f:
+                f.write(chart)
+            pdf.image(chart_path, x=(pdf.w - chart_width) / 2, y=pdf.get_y() + 2, w=chart_width)
+
+    
+    # Output the PDF to a buffer
+    pdf_buffer = io.BytesIO()
+    pdf_data = pdf.output(dest='S').encode('latin1')
+    pdf_buffer.write(pdf_data)
+    pdf_buffer.seek(0)
+    
+    return pdf_buffer
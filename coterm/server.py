@@ -0,0 +1,355 @@
+"""
+JSON HTTP API for the cost engine: ``cotermcalc-api --port 8765``.
+
+Lets other tools get co-term numbers without scraping the Streamlit page.
+Built on the standard library's http.server; every endpoint takes a POSTed
+JSON object, or a JSON array of them to do several in one request (the
+response is then an array in the same order, with {"error": ...} in place
+of any item that failed).
+
+    POST /v1/calculate         quote -> priced line items and totals
+    POST /v1/months-remaining  {"co_termed_start_date", "agreement_start_date",
+                                "agreement_term"[, "convention"]} -> {"months_remaining"}
+    POST /v1/pdf               quote -> the PDF report (application/pdf; base64 in
+                                "pdf_base64" for arrays)
+    POST /v1/email             quote -> {"email"}
+    GET  /v1/health            -> {"status": "ok"}
+
+A quote is {"line_items": [...], "agreement_term", "billing_term"} plus
+"months_remaining" (or "agreement_start_date" and "co_termed_start_date" to
+work it out), "extension_months" (default 0) and "integer_cents" (default
+false). Line items use the engine's column names ("Cloud Service
+Description", "Unit Quantity", "Annual Unit Fee", "Additional Licenses") or
+the short names in LINE_ITEM_FIELDS. Quotes go through the process-wide
+calculation_cache, and PDFs through report_cache.
+
+Connections are kept alive (HTTP/1.1) and served by a fixed pool of worker
+threads, so each worker holds one client connection at a time.
+"""
+import argparse
+import base64
+import collections
+import concurrent.futures
+import functools
+import http.server
+import json
+import math
+import sys
+from datetime import date
+
+import pandas as pd
+
+from .cache import cached_calculate_costs, calculation_key, report_cache
+from .dates import MONTH_CONVENTIONS, co_termed_months_remaining
+from .email_template import generate_email_template
+from .engine import BILLING_TERMS, LINE_ITEM_COLUMNS, calculate_costs
+from .report import generate_pdf
+
+
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 8
+MAX_BODY_BYTES = 16 * 1024 * 1024
+IDLE_TIMEOUT = 30  # Seconds an idle keep-alive connection may hold a worker
+
+# Short JSON names accepted for the line-item columns
+LINE_ITEM_FIELDS = {
+    "description": "Cloud Service Description",
+    "quantity": "Unit Quantity",
+    "annual_unit_fee": "Annual Unit Fee",
+    "additional_licenses": "Additional Licenses",
+}
+
+# The headline figures of a CalculationResult, in response order
+RESULT_TOTALS = ["total_current_cost", "total_prepaid_cost", "total_first_year_cost",
+                 "total_updated_annual_cost", "total_subscription_term_fee", "first_period_cost"]
+
+# handle(body) returns a JSON-ready object, or bytes sent as content_type
+Endpoint = collections.namedtuple("Endpoint", ["handle", "content_type"])
+
+
+def _required(body, field):
+    if field not in body:
+        raise ValueError(f"missing field '{field}'")
+    return body[field]
+
+
+def _count(body, field, minimum, default=None):
+    """A whole-number field (months, terms) of at least ``minimum``; required unless a default is given."""
+    value = _required(body, field) if default is None else body.get(field, default)
+    try:
+        number = int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"'{field}' must be a whole number, got {value!r}") from None
+    if number < minimum:
+        raise ValueError(f"'{field}' must be at least {minimum}, got {value!r}")
+    return number
+
+
+def _json_value(value):
+    """A pandas/numpy scalar as a plain JSON value (NaN becomes null)."""
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+def _date(body, field):
+    """A required date field as a Timestamp; null or unparseable dates are a ValueError, not NaT."""
+    value = _required(body, field)
+    try:
+        timestamp = pd.Timestamp(value) if isinstance(value, str) else pd.NaT
+    except ValueError:
+        timestamp = pd.NaT
+    if pd.isna(timestamp):
+        raise ValueError(f"'{field}' must be a date string, got {value!r}")
+    return timestamp
+
+
+def _months_remaining(body):
+    if body.get("convention", "30.44") not in MONTH_CONVENTIONS:
+        raise ValueError(f"'convention' must be one of {list(MONTH_CONVENTIONS)}")
+    months = co_termed_months_remaining(
+        _date(body, "co_termed_start_date"),
+        _date(body, "agreement_start_date"),
+        _count(body, "agreement_term", 1),
+        body.get("convention", "30.44")
+    )
+    return float(months)
+
+
+def parse_quote(body):
+    """
+    Reads a quote request into calculate_costs arguments (the line items as sent, not yet normalized).
+
+    Returns:
+    --------
+    (line_items, agreement_term, months_remaining, extension_months, billing_term, integer_cents);
+    raises ValueError naming the first missing or invalid field
+    """
+    if not isinstance(body, dict):
+        raise ValueError("expected a JSON object")
+    line_items = _required(body, "line_items")
+    if not isinstance(line_items, list) or not all(isinstance(item, dict) for item in line_items):
+        raise ValueError("'line_items' must be a list of objects")
+    if not line_items:
+        raise ValueError("'line_items' is empty")
+    frame = pd.DataFrame([{LINE_ITEM_FIELDS.get(field, field): value for field, value in item.items()}
+                          for item in line_items])
+    unknown = [col for col in frame.columns if col not in LINE_ITEM_COLUMNS]
+    if unknown:
+        raise ValueError(f"unknown line item fields {unknown}")
+
+    billing_term = _required(body, "billing_term")
+    if billing_term not in BILLING_TERMS:
+        raise ValueError(f"'billing_term' must be one of {list(BILLING_TERMS)}")
+    agreement_term = _count(body, "agreement_term", 1)
+    if "months_remaining" in body:
+        months_remaining = float(body["months_remaining"])
+        if not math.isfinite(months_remaining) or months_remaining < 0:
+            raise ValueError(f"'months_remaining' must be a finite number of at least 0, "
+                             f"got {body['months_remaining']!r}")
+    else:
+        months_remaining = _months_remaining(body)
+    extension_months = _count(body, "extension_months", 0, default=0)
+    # calculation_key and the calculation cache normalize the line items themselves
+    return (frame, agreement_term, months_remaining, extension_months, billing_term,
+            bool(body.get("integer_cents", False)))
+
+
+def price_quote(body):
+    """The CalculationResult and calculation_key for a quote request."""
+    line_items, agreement_term, months_remaining, extension_months, billing_term, integer_cents = parse_quote(body)
+    key = calculation_key(line_items, agreement_term, months_remaining, extension_months, billing_term,
+                          integer_cents=integer_cents)
+    engine = functools.partial(calculate_costs, integer_cents=True) if integer_cents else None
+    result = cached_calculate_costs(line_items, agreement_term, months_remaining, extension_months, billing_term,
+                                    key=key, engine=engine)
+    return result, key
+
+
+def result_to_json(result):
+    """A CalculationResult as a JSON-ready dict (amounts in cents when result.in_cents)."""
+    line_items = result.line_items
+    return {
+        "billing_term": result.billing_term,
+        "agreement_term": _json_value(result.agreement_term),
+        "months_remaining": _json_value(result.months_remaining),
+        "extension_months": _json_value(result.extension_months),
+        "in_cents": result.in_cents,
+        "totals": {name: _json_value(getattr(result, name)) for name in RESULT_TOTALS},
+        "column_totals": {col: _json_value(value) for col, value in result.totals.items()},
+        "line_items": [
+            {col: _json_value(value) for col, value in zip(line_items.columns, row)}
+            for row in line_items.itertuples(index=False, name=None)
+        ],
+    }
+
+
+def calculate_endpoint(body):
+    result, _ = price_quote(body)
+    return result_to_json(result)
+
+
+def months_remaining_endpoint(body):
+    if not isinstance(body, dict):
+        raise ValueError("expected a JSON object")
+    return {"months_remaining": _months_remaining(body)}
+
+
+def pdf_endpoint(body, logo_path=None):
+    result, key = price_quote(body)
+    include_chart = bool(body.get("include_chart", True))
+    # The report is dated, so yesterday's cached PDF must not be served today
+    return report_cache.get_or_create(
+        ("api", key, include_chart, logo_path, date.today().isoformat()),
+        lambda: generate_pdf(result, logo_path=logo_path, include_chart=include_chart).getvalue()
+    )
+
+
+def email_endpoint(body):
+    result, _ = price_quote(body)
+    return {"email": generate_email_template(result)}
+
+
+ENDPOINTS = {
+    "/v1/calculate": Endpoint(calculate_endpoint, "application/json"),
+    "/v1/months-remaining": Endpoint(months_remaining_endpoint, "application/json"),
+    "/v1/pdf": Endpoint(pdf_endpoint, "application/pdf"),
+    "/v1/email": Endpoint(email_endpoint, "application/json"),
+}
+
+
+class CotermRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive; every response sets Content-Length
+    # Headers and body go out as separate writes; without TCP_NODELAY each kept-alive
+    # request waits ~40ms on the client's delayed ACK
+    disable_nagle_algorithm = True
+    server_version = "cotermcalc-api/1.1"
+    timeout = IDLE_TIMEOUT
+
+    def do_GET(self):
+        if self.path == "/v1/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": f"no such endpoint: GET {self.path}"})
+
+    def do_POST(self):
+        endpoint = self.server.endpoints.get(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            # The body isn't read, so the connection can't be reused
+            self.close_connection = True
+            self._send_json(413, {"error": f"request body over {MAX_BODY_BYTES} bytes"})
+            return
+        raw_body = self.rfile.read(length)
+        if endpoint is None:
+            self._send_json(404, {"error": f"no such endpoint: POST {self.path}"})
+            return
+        try:
+            body = json.loads(raw_body)
+        except ValueError as e:
+            self._send_json(400, {"error": f"invalid JSON: {e}"})
+            return
+
+        if isinstance(body, list):
+            self._send_json(200, [self._batch_item(endpoint, item) for item in body])
+            return
+        status, response = self._handle(endpoint, body)
+        if isinstance(response, bytes):
+            self._send(status, endpoint.content_type, response)
+        else:
+            self._send_json(status, response)
+
+    def _handle(self, endpoint, body):
+        """(status, response) for one request body; errors become {"error": message}."""
+        try:
+            return 200, endpoint.handle(body)
+        except (ValueError, TypeError) as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            self.log_error("%s failed: %r", self.path, e)
+            return 500, {"error": f"internal error: {e}"}
+
+    def _batch_item(self, endpoint, item):
+        _, response = self._handle(endpoint, item)
+        if isinstance(response, bytes):
+            return {"pdf_base64": base64.b64encode(response).decode("ascii")}
+        return response
+
+    def _send_json(self, status, payload):
+        self._send(status, "application/json", json.dumps(payload).encode("utf-8"))
+
+    def _send(self, status, content_type, data):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.access_log:
+            super().log_message(format, *args)
+
+
+class CotermHTTPServer(http.server.HTTPServer):
+    """An HTTPServer that hands each connection to a fixed pool of worker threads."""
+
+    request_queue_size = 128
+
+    def __init__(self, address, workers=DEFAULT_WORKERS, logo_path=None, access_log=True):
+        super().__init__(address, CotermRequestHandler)
+        self.endpoints = dict(ENDPOINTS)
+        self.endpoints["/v1/pdf"] = Endpoint(functools.partial(pdf_endpoint, logo_path=logo_path), "application/pdf")
+        self.access_log = access_log
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cotermcalc-api")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._serve_connection, request, client_address)
+
+    def _serve_connection(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="cotermcalc-api",
+        description="Serve the co-terming cost engine as a JSON HTTP API."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port (default: {DEFAULT_PORT}; 0 picks one)")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"worker threads, i.e. connections served at once (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--logo", default=None, help="logo image to place on PDF reports")
+    parser.add_argument("--quiet", action="store_true", help="don't log each request")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.workers < 1:
+        print("cotermcalc-api: --workers must be at least 1", file=sys.stderr)
+        return 2
+
+    server = CotermHTTPServer((args.host, args.port), workers=args.workers, logo_path=args.logo,
+                              access_log=not args.quiet)
+    host, port = server.server_address[:2]
+    print(f"Serving the co-terming API on http://{host}:{port}/v1/ with {args.workers} worker(s)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Scenario sweeps: price one quote across a grid of co-term dates and extensions.
+
+Answers "what if we co-term next month instead, or extend 12 vs 24 months?"
+without re-entering the quote. Months remaining is computed for every date at
+once, and the cost engine runs over a (dates x extensions x line items) array
+so the whole grid is priced in a single vectorized pass.
+"""
+import numpy as np
+import pandas as pd
+
+from .dates import co_termed_months_remaining
+from .engine import BILLING_TERMS, TOTAL_COLUMNS, TOTAL_SOURCES, _cost_columns
+from .line_items import normalize_line_items
+
+
+# The headline figure to chart for each billing term
+DEFAULT_SWEEP_METRIC = {
+    "Annual": "Total Subscription Term Fee",
+    "Monthly": "Total Subscription Term Fee",
+    "Prepaid": "Total Prepaid Cost",
+}
+
+
+def sweep_scenarios(df: pd.DataFrame, agreement_start_date, agreement_term: int, co_termed_start_dates,
+                    extension_months, billing_term: str, convention: str = "30.44") -> pd.DataFrame:
+    """
+    Prices a quote for every combination of co-termed start date and extension length.
+
+    Parameters:
+    -----------
+    df: DataFrame - The line items (LINE_ITEM_COLUMNS)
+    agreement_start_date: date - Start of the existing agreement
+    agreement_term: int - The full agreement term in months
+    co_termed_start_dates: sequence of dates - Candidate co-termed start dates
+    extension_months: sequence of int - Candidate extension lengths in months
+    billing_term: str - The billing term (Annual, Monthly, Prepaid)
+    convention: str - Months-remaining day-count convention, see co_termed_months_remaining
+
+    Returns:
+    --------
+    DataFrame: one row per scenario with "Co-Termed Start Date", "Extension Months",
+    "Months Remaining" and the calculate_costs totals (TOTAL_COLUMNS).
+    """
+    if billing_term not in BILLING_TERMS:
+        raise ValueError(f"sweep_scenarios(): unknown billing term '{billing_term}'")
+
+    line_items = normalize_line_items(df)
+    co_termed_dates = pd.DatetimeIndex(pd.to_datetime(list(co_termed_start_dates)))
+    extensions = np.asarray(list(extension_months), dtype=np.int64)
+    shape = (len(co_termed_dates), len(extensions))
+
+    months_remaining = co_termed_months_remaining(
+        co_termed_dates, pd.Timestamp(agreement_start_date), agreement_term, convention
+    )
+
+    # Axes: co-termed date x extension x line item. Columns that don't depend on
+    # the date or the extension stay broadcast and are only computed once.
+    columns = _cost_columns(
+        line_items["Unit Quantity"].to_numpy()[None, None, :],
+        line_items["Annual Unit Fee"].to_numpy()[None, None, :],
+        line_items["Additional Licenses"].to_numpy()[None, None, :],
+        agreement_term,
+        months_remaining[:, None, None],
+        extensions[None, :, None],
+        billing_term
+    )
+
+    scenarios = pd.DataFrame({
+        "Co-Termed Start Date": np.repeat(co_termed_dates, len(extensions)),
+        "Extension Months": np.tile(extensions, len(co_termed_dates)),
+        "Months Remaining": np.repeat(months_remaining, len(extensions)),
+    })
+    for total_col in TOTAL_COLUMNS:
+        source = TOTAL_SOURCES[billing_term][total_col]
+        if source is None:
+            scenarios[total_col] = 0.0
+        else:
+            totals = np.asarray(columns[source], dtype=float).sum(axis=-1)
+            scenarios[total_col] = np.broadcast_to(totals, shape).ravel()
+    return scenarios
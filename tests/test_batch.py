@@ -0,0 +1,89 @@
+"""Portfolio batch mode: every agreement priced as calculate_costs would price it alone."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from coterm import calculate_costs, calculate_portfolio, co_termed_months_remaining
+from coterm.batch import split_portfolio
+from coterm.engine import COST_COLUMNS, LINE_ITEM_COLUMNS, TOTAL_COLUMNS
+
+# (agreement ID, start date, term, co-termed start date, billing term, extension months)
+AGREEMENTS = [
+    ("AG-1", "2024-01-15", 36, "2025-06-01", "Annual", 0),
+    ("AG-2", "2023-03-31", 60, "2025-02-28", "Monthly", 12),
+    ("AG-3", "2024-07-01", 12, "2025-01-17", "Prepaid", 0),
+    ("AG-4", "2022-11-30", 48, "2025-08-15", "Annual", 6),
+    ("AG-5", "2024-02-29", 24, "2024-09-10", "Prepaid", 3),
+]
+
+
+def make_portfolio(seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for agreement_id, start, term, co_termed_start, billing_term, extension in AGREEMENTS:
+        for i in range(int(rng.integers(1, 6))):
+            rows.append({
+                "Agreement ID": agreement_id,
+                "Agreement Start Date": pd.Timestamp(start),
+                "Agreement Term": term,
+                "Co-Termed Start Date": pd.Timestamp(co_termed_start),
+                "Billing Term": billing_term,
+                "Cloud Service Description": f"Service {i}",
+                "Unit Quantity": int(rng.integers(0, 500)),
+                # Some fees end in a half cent
+                "Annual Unit Fee": round(float(rng.integers(100, 500_000)) / 100 + 0.005 * (i % 2), 3),
+                "Additional Licenses": int(rng.integers(0, 50)),
+                "Extension Months": extension,
+            })
+    # Interleave the agreements so no agreement's rows are contiguous
+    return pd.DataFrame(rows).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def expected_result(portfolio, agreement_id):
+    rows = portfolio[portfolio["Agreement ID"] == agreement_id]
+    agreement = rows.iloc[0]
+    months_remaining = float(co_termed_months_remaining(
+        [agreement["Co-Termed Start Date"]], [agreement["Agreement Start Date"]], [agreement["Agreement Term"]]
+    )[0])
+    return calculate_costs(rows[LINE_ITEM_COLUMNS], int(agreement["Agreement Term"]), months_remaining,
+                           int(agreement["Extension Months"]), agreement["Billing Term"])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_portfolio_matches_calculate_costs(seed):
+    portfolio = make_portfolio(seed)
+    lines, totals = calculate_portfolio(portfolio)
+    assert list(totals.index) == list(dict.fromkeys(portfolio["Agreement ID"]))
+
+    results = dict(split_portfolio(lines, totals))
+    assert sorted(results) == sorted(agreement[0] for agreement in AGREEMENTS)
+    for agreement_id, result in results.items():
+        expected = expected_result(portfolio, agreement_id)
+        billing_term = expected.billing_term
+        assert (result.billing_term, result.agreement_term, result.extension_months) == (
+            billing_term, expected.agreement_term, expected.extension_months)
+        assert result.months_remaining == expected.months_remaining
+
+        columns = LINE_ITEM_COLUMNS + COST_COLUMNS[billing_term]
+        pd.testing.assert_frame_equal(result.line_items, expected.line_items[columns], check_dtype=False,
+                                      check_exact=True)
+        assert result.totals == expected.totals
+        for total_col in TOTAL_COLUMNS:
+            attribute = total_col.lower().replace(" ", "_")
+            assert totals.loc[agreement_id, total_col] == getattr(expected, attribute), total_col
+
+
+def test_missing_extension_months_default_to_zero():
+    portfolio = make_portfolio().drop(columns="Extension Months")
+    _, totals = calculate_portfolio(portfolio)
+    assert (totals["Extension Months"] == 0).all()
+
+
+@pytest.mark.parametrize("change, message", [
+    (lambda df: df.drop(columns="Billing Term"), "missing columns"),
+    (lambda df: df.assign(**{"Agreement ID": None}), "Agreement ID"),
+    (lambda df: df.assign(**{"Billing Term": "Quarterly"}), "unknown billing terms"),
+])
+def test_bad_portfolios_are_rejected(change, message):
+    with pytest.raises(ValueError, match=message):
+        calculate_portfolio(change(make_portfolio()))
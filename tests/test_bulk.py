@@ -0,0 +1,48 @@
+"""Bulk report writing: file names and the worker process pool."""
+import signal
+import zipfile
+
+import pandas as pd
+import pytest
+
+from coterm import calculate_costs, generate_pdfs, write_pdf_reports
+from coterm.bulk import safe_filename
+
+
+def test_safe_filename_keeps_distinct_ids_distinct():
+    ids = ["ACME/1", "ACME 1", "ACME:1", "ACME_1", "ACME..1", "../ACME_1"]
+    names = [safe_filename(agreement_id) for agreement_id in ids]
+    assert len(set(names)) == len(ids)
+    assert safe_filename("ACME_1") == "ACME_1"
+    assert all("/" not in name and not name.startswith(".") for name in names)
+    assert safe_filename("ACME/1") == safe_filename("ACME/1")
+
+
+def quote():
+    return calculate_costs(pd.DataFrame({
+        "Cloud Service Description": ["Webex Suite"],
+        "Unit Quantity": [10],
+        "Annual Unit Fee": [147.96],
+        "Additional Licenses": [2],
+    }), 36, 20.5, 12, "Annual")
+
+
+def test_colliding_ids_get_separate_zip_members(tmp_path):
+    result = quote()
+    reports = [(agreement_id, result) for agreement_id in ["ACME/1", "ACME 1", "ACME:1"]]
+    output = str(tmp_path / "reports.zip")
+
+    outcomes = write_pdf_reports(reports, output, workers=2, chunksize=1, include_chart=False)
+
+    assert [outcome.error for outcome in outcomes] == [None, None, None]
+    with zipfile.ZipFile(output) as archive:
+        assert sorted(archive.namelist()) == sorted(outcome.path for outcome in outcomes)
+        assert len(archive.namelist()) == 3
+
+
+@pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="needs SIGALRM")
+def test_timeouts_are_reported_however_short():
+    # workers=1 renders here, on the main thread, so the per-report alarm is used
+    rendered = list(generate_pdfs([(i, quote()) for i in range(300)], workers=1, timeout=1e-5, include_chart=False))
+    assert [report.error for report in rendered] == ["timed out after 1e-05s"] * 300
+    assert signal.getsignal(signal.SIGALRM) == signal.SIG_DFL
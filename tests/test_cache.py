@@ -0,0 +1,121 @@
+"""Calculation cache: LRU order, counters, cache keys and cached results."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from coterm import CalculationCache, LRUCache, calculate_costs, calculation_key, normalize_line_items
+
+LINE_ITEMS = pd.DataFrame({
+    "Cloud Service Description": ["Webex Suite", "Webex Calling"],
+    "Unit Quantity": [10, 25],
+    "Annual Unit Fee": [1200.0, 147.96],
+    "Additional Licenses": [2, 0],
+})
+
+# The same line items as typed into the editor: text numbers, currency symbols,
+# stray whitespace and a row left blank
+EDITED_LINE_ITEMS = pd.DataFrame({
+    "Cloud Service Description": [" Webex Suite", None, "Webex Calling "],
+    "Unit Quantity": ["10", None, "25"],
+    "Annual Unit Fee": ["$1,200.00", None, "147.96"],
+    "Additional Licenses": ["2", None, None],
+})
+
+QUOTE = (36, 20.5, 12, "Annual")
+
+
+def test_lru_evicts_the_least_recently_used_entry():
+    cache = LRUCache(maxsize=2)
+    cache.get_or_create("a", lambda: "A")
+    cache.get_or_create("b", lambda: "B")
+    assert cache.get_or_create("a", lambda: pytest.fail("'a' should be cached")) == "A"
+    cache.get_or_create("c", lambda: "C")  # Evicts "b", used less recently than "a"
+
+    assert list(cache._results) == ["a", "c"]
+    assert cache.get_or_create("b", lambda: "B again") == "B again"
+    assert list(cache._results) == ["c", "b"]
+
+
+def test_counters_and_clear():
+    cache = LRUCache(maxsize=2)
+    for key in ["a", "a", "b", "a", "c", "b"]:
+        cache.get_or_create(key, lambda: key.upper())
+    # "b" was evicted by "c", so its second lookup is a miss
+    assert cache.stats() == {"hits": 2, "misses": 4, "size": 2, "maxsize": 2}
+    cache.clear()
+    assert cache.stats() == {"hits": 0, "misses": 0, "size": 0, "maxsize": 2}
+    assert len(cache) == 0
+
+
+def test_maxsize_must_be_positive():
+    with pytest.raises(ValueError, match="maxsize"):
+        CalculationCache(maxsize=0)
+
+
+def test_normalize_line_items():
+    normalized = normalize_line_items(EDITED_LINE_ITEMS)
+    pd.testing.assert_frame_equal(normalized, LINE_ITEMS, check_dtype=False)
+    assert normalized.dtypes.iloc[1:].tolist() == [np.dtype("int64"), np.dtype("float64"), np.dtype("int64")]
+    # Unreadable numbers count as 0
+    junk = pd.DataFrame({"Cloud Service Description": ["X"], "Unit Quantity": ["lots"],
+                         "Annual Unit Fee": ["n/a"], "Additional Licenses": [np.nan]})
+    assert normalize_line_items(junk).iloc[0, 1:].tolist() == [0, 0.0, 0]
+
+
+def test_equivalent_line_items_share_a_key():
+    assert calculation_key(EDITED_LINE_ITEMS, *QUOTE) == calculation_key(LINE_ITEMS, *QUOTE)
+
+
+@pytest.mark.parametrize("changed", [
+    (LINE_ITEMS.assign(**{"Unit Quantity": [11, 25]}), *QUOTE),
+    (LINE_ITEMS.iloc[::-1], *QUOTE),
+    (LINE_ITEMS, 24, 20.5, 12, "Annual"),
+    (LINE_ITEMS, 36, 20.25, 12, "Annual"),
+    (LINE_ITEMS, 36, 20.5, 0, "Annual"),
+    (LINE_ITEMS, 36, 20.5, 12, "Monthly"),
+])
+def test_any_input_changes_the_key(changed):
+    assert calculation_key(*changed) != calculation_key(LINE_ITEMS, *QUOTE)
+
+
+def test_integer_cents_changes_the_key():
+    assert calculation_key(LINE_ITEMS, *QUOTE, integer_cents=True) != calculation_key(LINE_ITEMS, *QUOTE)
+
+
+@pytest.mark.parametrize("billing_term", ["Annual", "Monthly", "Prepaid"])
+def test_cache_hits_match_calculate_costs(billing_term):
+    cache = CalculationCache()
+    quote = (36, 20.5, 12, billing_term)
+    expected = calculate_costs(LINE_ITEMS, *quote)
+    first = cache.calculate(EDITED_LINE_ITEMS, *quote)
+    hit = cache.calculate(LINE_ITEMS, *quote)
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    for result in (first, hit):
+        pd.testing.assert_frame_equal(result.to_frame(), expected.to_frame(), check_exact=True)
+        assert (result.total_current_cost, result.total_prepaid_cost, result.total_first_year_cost,
+                result.total_updated_annual_cost, result.total_subscription_term_fee) == (
+            expected.total_current_cost, expected.total_prepaid_cost, expected.total_first_year_cost,
+            expected.total_updated_annual_cost, expected.total_subscription_term_fee)
+
+
+def test_cached_results_are_copies():
+    cache = CalculationCache()
+    result = cache.calculate(LINE_ITEMS, *QUOTE)
+    result.line_items.loc[0, "Unit Quantity"] = 999
+    result.totals["Unit Quantity"] = 999
+    again = cache.calculate(LINE_ITEMS, *QUOTE)
+    assert again.line_items.loc[0, "Unit Quantity"] == 10 and again.totals["Unit Quantity"] == 35
+
+
+def test_key_and_engine_are_used():
+    cache = CalculationCache()
+    calls = []
+
+    def engine(df, *quote):
+        calls.append(quote)
+        return calculate_costs(df, *quote)
+
+    cache.calculate(LINE_ITEMS, *QUOTE, key="precomputed", engine=engine)
+    cache.calculate(LINE_ITEMS.iloc[:1], *QUOTE, key="precomputed", engine=engine)
+    assert calls == [QUOTE] and list(cache._results) == ["precomputed"]
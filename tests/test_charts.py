@@ -0,0 +1,48 @@
+"""Server-side cost chart images for PDF reports and emails."""
+import io
+
+import pandas as pd
+import pytest
+
+from coterm import calculate_costs, generate_pdf
+from coterm.charts import COST_CHART_SERIES, PNG_SIZE, chart_cache, cost_chart_data, render_chart_png
+
+Image = pytest.importorskip("PIL.Image")
+
+LINE_ITEMS = pd.DataFrame({
+    "Cloud Service Description": ["Webex Suite", "Webex Calling"],
+    "Unit Quantity": [10, 25],
+    "Annual Unit Fee": [1200.0, 147.96],
+    "Additional Licenses": [2, 0],
+})
+
+
+@pytest.mark.parametrize("billing_term", list(COST_CHART_SERIES))
+def test_chart_png(billing_term):
+    result = calculate_costs(LINE_ITEMS, 36, 20.5, 12, billing_term)
+    chart_data = cost_chart_data(result)
+    assert set(chart_data) == {key for key, _, _ in COST_CHART_SERIES[billing_term]}
+
+    png = render_chart_png(chart_data, billing_term)
+    image = Image.open(io.BytesIO(png))
+    assert image.format == "PNG" and image.size == PNG_SIZE and image.mode == "P"
+    # Every bar colour is drawn
+    colors = {color for _, color in image.convert("RGB").getcolors()}
+    for _, _, color in COST_CHART_SERIES[billing_term]:
+        assert tuple(int(color[i:i + 2], 16) for i in (1, 3, 5)) in colors
+
+    hits = chart_cache.hits
+    assert render_chart_png(dict(chart_data), billing_term) is png and chart_cache.hits == hits + 1
+
+
+def test_negative_bars_are_drawn():
+    png = render_chart_png({"currentCost": -500.0, "coTermedPrepaid": 250.0, "subscription": -250.0}, "Prepaid")
+    assert Image.open(io.BytesIO(png)).size == PNG_SIZE
+
+
+def test_reports_embed_the_chart():
+    result = calculate_costs(LINE_ITEMS, 36, 20.5, 12, "Annual")
+    with_chart = generate_pdf(result).getvalue()
+    without_chart = generate_pdf(result, include_chart=False).getvalue()
+    assert with_chart.count(b"/Subtype /Image") == 1 and b"/Subtype /Image" not in without_chart
+    assert b"/Width 1200" in with_chart and b"/Height 540" in with_chart
@@ -0,0 +1,53 @@
+"""Billing term comparison: every row against a single calculate_costs run."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from coterm import calculate_all_billing_terms, calculate_costs, compare_billing_terms
+from coterm.engine import BILLING_TERMS, COMPARISON_COLUMNS
+
+LINE_ITEMS = pd.DataFrame({
+    "Cloud Service Description": ["Webex Suite", "Webex Calling", "Webex Meetings"],
+    "Unit Quantity": [10, 25, 7],
+    "Annual Unit Fee": [1200.0, 147.965, 2.675],
+    "Additional Licenses": [2, 0, 5],
+})
+
+
+def headline_totals(result):
+    return [result.total_current_cost, result.total_prepaid_cost, result.total_first_year_cost,
+            result.total_updated_annual_cost, result.total_subscription_term_fee]
+
+
+@pytest.mark.parametrize("months_remaining, extension_months", [(20.5, 12), (35.97, 0), (0.25, 6), (12, 0)])
+def test_every_comparison_row_matches_calculate_costs(months_remaining, extension_months):
+    comparison = compare_billing_terms(calculate_all_billing_terms(LINE_ITEMS, 36, months_remaining,
+                                                                   extension_months))
+    assert list(comparison.index) == list(BILLING_TERMS) and list(comparison.columns) == COMPARISON_COLUMNS
+
+    for billing_term in BILLING_TERMS:
+        result = calculate_costs(LINE_ITEMS, 36, months_remaining, extension_months, billing_term)
+        if billing_term == "Monthly":
+            first_payment = result.line_items["First Month Co-Termed Cost"].sum()
+        elif billing_term == "Annual":
+            first_payment = result.total_first_year_cost
+        else:
+            first_payment = result.total_prepaid_cost
+        if billing_term == "Prepaid":
+            total_over_term = result.line_items["Remaining Subscription Total"].sum()
+        else:
+            total_over_term = result.total_subscription_term_fee
+        expected = [result.total_current_cost, first_payment, result.line_items["Updated Annual Cost"].sum(),
+                    total_over_term]
+        assert comparison.loc[billing_term].tolist() == expected, billing_term
+
+
+def test_shared_columns_match_separate_runs():
+    results = calculate_all_billing_terms(LINE_ITEMS, 36, 20.5, 12)
+    for billing_term, result in results.items():
+        expected = calculate_costs(LINE_ITEMS, 36, 20.5, 12, billing_term)
+        pd.testing.assert_frame_equal(result.to_frame(), expected.to_frame(), check_exact=True)
+        assert headline_totals(result) == headline_totals(expected)
+    # Results for different terms don't share line item frames
+    results["Annual"].line_items.loc[0, "Unit Quantity"] = 0
+    assert np.all(results["Monthly"].line_items["Unit Quantity"] == LINE_ITEMS["Unit Quantity"])
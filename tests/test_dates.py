@@ -0,0 +1,113 @@
+"""
+co_termed_months_remaining against per-date references.
+
+The "30.44" convention must give the same numbers as the scalar
+calculate_co_termed_months_remaining; "calendar" and "30/360" are checked
+against straightforward relativedelta implementations of their definitions.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from dateutil.relativedelta import relativedelta
+
+from coterm import calculate_co_termed_months_remaining, co_termed_months_remaining
+
+
+def calendar_reference(co_termed, start, term):
+    """Whole calendar months stepped from the co-term date, plus leftover days over that month's length."""
+    co_termed, start = pd.Timestamp(co_termed).to_pydatetime(), pd.Timestamp(start).to_pydatetime()
+    end = start + relativedelta(months=term)
+    if co_termed >= end:
+        return 0.0
+    months = 0
+    while co_termed + relativedelta(months=months + 1) <= end:
+        months += 1
+    month_start = co_termed + relativedelta(months=months)
+    month_end = co_termed + relativedelta(months=months + 1)
+    return max(round(months + (end - month_start).days / (month_end - month_start).days, 2), 0)
+
+
+def us_30_360_reference(co_termed, start, term):
+    """US 30/360 (bond basis) months between the co-term date and the agreement end date."""
+    co_termed, start = pd.Timestamp(co_termed).to_pydatetime(), pd.Timestamp(start).to_pydatetime()
+    end = start + relativedelta(months=term)
+    first_day = min(co_termed.day, 30)
+    last_day = end.day
+    if last_day == 31 and first_day == 30:
+        last_day = 30
+    days = 360 * (end.year - co_termed.year) + 30 * (end.month - co_termed.month) + last_day - first_day
+    return max(round(days / 30, 2), 0)
+
+
+def random_dates(seed, size):
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2015-01-01") + rng.integers(0, 4000, size).astype("timedelta64[D]")
+    co_termed = start + rng.integers(-100, 3000, size).astype("timedelta64[D]")
+    return co_termed, start, rng.integers(1, 84, size)
+
+
+# Month ends, a leap day, and co-term dates on days the end month doesn't have
+EDGE_CASES = [
+    ("2025-01-31", "2024-02-29", 12),
+    ("2024-02-29", "2023-03-31", 24),
+    ("2024-03-31", "2022-01-31", 25),
+    ("2025-02-28", "2024-02-29", 12),
+    ("2024-02-29", "2024-02-29", 48),
+    ("2025-05-30", "2024-08-31", 18),
+    ("2025-06-15", "2025-01-31", 1),
+    ("2026-01-01", "2025-12-31", 12),
+    ("2025-03-31", "2023-03-30", 36),
+    ("2027-01-01", "2024-01-15", 12),
+]
+
+
+def test_30_44_matches_scalar_engine():
+    co_termed, start, terms = random_dates(1, 5000)
+    expected = [calculate_co_termed_months_remaining(c, s, int(t)) for c, s, t in zip(co_termed, start, terms)]
+    np.testing.assert_array_equal(co_termed_months_remaining(co_termed, start, terms), expected)
+
+
+def test_30_44_matches_scalar_engine_with_time_of_day():
+    rng = np.random.default_rng(2)
+    co_termed, start, terms = random_dates(2, 2000)
+    start = pd.to_datetime(start) + pd.to_timedelta(rng.integers(0, 86400, 2000), unit="s")
+    co_termed = pd.to_datetime(co_termed) + pd.to_timedelta(rng.integers(0, 86400, 2000), unit="s")
+    expected = [calculate_co_termed_months_remaining(c, s, int(t)) for c, s, t in zip(co_termed, start, terms)]
+    np.testing.assert_array_equal(co_termed_months_remaining(co_termed, start, terms), expected)
+
+
+@pytest.mark.parametrize("convention, reference", [
+    ("calendar", calendar_reference),
+    ("30/360", us_30_360_reference),
+])
+def test_conventions_match_reference(convention, reference):
+    co_termed, start, terms = random_dates(3, 3000)
+    expected = [reference(c, s, int(t)) for c, s, t in zip(co_termed, start, terms)]
+    np.testing.assert_array_equal(co_termed_months_remaining(co_termed, start, terms, convention), expected)
+
+
+@pytest.mark.parametrize("convention, reference", [
+    ("30.44", lambda c, s, t: calculate_co_termed_months_remaining(c, s, t)),
+    ("calendar", calendar_reference),
+    ("30/360", us_30_360_reference),
+])
+@pytest.mark.parametrize("co_termed, start, term", EDGE_CASES)
+def test_month_end_and_leap_day(convention, reference, co_termed, start, term):
+    assert co_termed_months_remaining([co_termed], [start], [term], convention)[0] == reference(co_termed, start, term)
+
+
+def test_missing_dates_give_nan_and_broadcast():
+    months = co_termed_months_remaining(np.array(["2025-01-15", "NaT"], dtype="datetime64[D]"), "2024-01-15", 24)
+    assert months[0] == calculate_co_termed_months_remaining("2025-01-15", "2024-01-15", 24)
+    assert np.isnan(months[1])
+
+
+def test_rejects_unknown_convention_and_out_of_range_dates():
+    with pytest.raises(ValueError):
+        co_termed_months_remaining(["2025-01-01"], ["2024-01-01"], [12], "actual/365")
+    with pytest.raises(ValueError):
+        co_termed_months_remaining(["2025-01-01"], ["1700-01-01"], [12])
+    with pytest.raises(ValueError):  # Past what datetime64[ns] can hold
+        co_termed_months_remaining(["2025-01-01"], ["2300-06-01"], [12])
+    with pytest.raises(ValueError):  # Ends after the month tables
+        co_termed_months_remaining(["2025-01-01"], ["2262-01-01"], [12 * 150])
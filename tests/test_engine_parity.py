@@ -0,0 +1,184 @@
+"""
+Parity of the vectorized calculate_costs with the original row-by-row engine.
+
+baseline_calculate_costs is a frozen copy of calculate_costs from app.py
+before it was vectorized (iterrows()/df.at), kept here as the reference.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from coterm import calculate_costs
+from coterm.engine import conditional_round
+
+
+def baseline_conditional_round(value, threshold=0.25):
+    """Rounds values close to whole numbers based on a threshold."""
+    if abs(value - round(value)) < threshold:
+        return round(value)
+    return round(value, 2)  # Keep two decimal places otherwise
+
+
+def baseline_calculate_costs(df, agreement_term, months_remaining, extension_months, billing_term):
+    conditional_round = baseline_conditional_round
+    total_term = months_remaining + extension_months
+    months_elapsed = agreement_term - months_remaining
+
+    for col in df.select_dtypes(include=['object']).columns:
+        if col != "Cloud Service Description":
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    df["Cloud Service Description"] = df["Cloud Service Description"].astype(str)
+
+    total_current_cost = 0
+    total_prepaid_cost = 0
+    total_first_year_cost = 0
+    total_updated_annual_cost = 0
+    total_subscription_term_fee = 0
+
+    for index, row in df.iterrows():
+        current_monthly_cost = (row['Annual Unit Fee'] / 12) * row['Unit Quantity']
+        current_annual_cost = row['Unit Quantity'] * row['Annual Unit Fee']
+        new_annual_cost = (row['Unit Quantity'] + row['Additional Licenses']) * row['Annual Unit Fee']
+
+        df.at[index, 'Current Monthly Cost'] = current_monthly_cost
+        df.at[index, 'Current Annual Cost'] = current_annual_cost
+        df.at[index, 'Updated Annual Cost'] = new_annual_cost
+
+        if billing_term == 'Monthly':
+            fractional_month = months_remaining % 1
+            first_month_factor = fractional_month if fractional_month > 0 else 1.0
+            df.at[index, 'First Month Co-Termed Cost'] = conditional_round(
+                (row['Additional Licenses'] * row['Annual Unit Fee'] / 12) * first_month_factor
+            )
+            df.at[index, 'Monthly Co-Termed Cost'] = conditional_round(
+                ((row['Unit Quantity'] + row['Additional Licenses']) * row['Annual Unit Fee']) / 12
+            )
+            df.at[index, 'New Monthly Cost'] = conditional_round(
+                ((row['Unit Quantity'] + row['Additional Licenses']) * row['Annual Unit Fee']) / 12
+            )
+            # Reads New Monthly Cost back as a NumPy scalar, so round() is NumPy's here
+            df.at[index, 'Subscription Term Total Service Fee'] = conditional_round(
+                df.at[index, 'New Monthly Cost'] * total_term
+            )
+
+        elif billing_term == 'Annual':
+            df.at[index, 'First Year Co-Termed Cost'] = conditional_round(
+                (row['Additional Licenses'] * row['Annual Unit Fee'] * (12 - (months_elapsed % 12))) / 12
+            )
+            years_remaining = total_term / 12
+            df.at[index, 'Subscription Term Total Service Fee'] = conditional_round(
+                new_annual_cost * years_remaining
+            )
+
+        elif billing_term == 'Prepaid':
+            for col in ['Current Prepaid Cost', 'Prepaid Co-Termed Cost', 'Remaining Subscription Total']:
+                if col not in df.columns:
+                    df[col] = 0.0
+            current_prepaid_cost = conditional_round(
+                row['Annual Unit Fee'] * row['Unit Quantity']
+            )
+            prepaid_co_termed_cost = conditional_round(
+                row['Annual Unit Fee'] / agreement_term * months_remaining * row['Additional Licenses']
+            )
+            remaining_subscription_total = current_prepaid_cost + prepaid_co_termed_cost
+            df.at[index, 'Current Prepaid Cost'] = current_prepaid_cost
+            df.at[index, 'Prepaid Co-Termed Cost'] = prepaid_co_termed_cost
+            df.at[index, 'Remaining Subscription Total'] = remaining_subscription_total
+
+    df = df[df["Cloud Service Description"] != "Total Licensing Cost"].copy()
+    df["Cloud Service Description"] = df["Cloud Service Description"].astype(str)
+
+    total_row_data = {
+        "Cloud Service Description": ["Total Licensing Cost"],
+        "Unit Quantity": [df["Unit Quantity"].sum()],
+        "Additional Licenses": [df["Additional Licenses"].sum()],
+        "Annual Unit Fee": [df["Annual Unit Fee"].mean()],
+    }
+    summed = {
+        "Prepaid": ["Current Prepaid Cost", "Prepaid Co-Termed Cost", "Remaining Subscription Total"],
+        "Annual": ["First Year Co-Termed Cost", "Current Annual Cost", "Updated Annual Cost"],
+        "Monthly": ["First Month Co-Termed Cost", "Current Monthly Cost", "New Monthly Cost"],
+    }[billing_term]
+    for col in summed + ["Subscription Term Total Service Fee"]:
+        if col in df.columns:
+            total_row_data[col] = [df[col].sum()]
+    df = pd.concat([df, pd.DataFrame(total_row_data)], ignore_index=True)
+
+    line_items = df['Cloud Service Description'] != 'Total Licensing Cost'
+    total_current_cost = df.loc[line_items, 'Current Annual Cost'].sum()
+    if billing_term == 'Prepaid':
+        total_current_cost = df.loc[line_items, 'Current Prepaid Cost'].sum()
+        total_prepaid_cost = df.loc[line_items, 'Prepaid Co-Termed Cost'].sum()
+    elif billing_term == 'Annual':
+        total_first_year_cost = df.loc[line_items, 'First Year Co-Termed Cost'].sum()
+        total_updated_annual_cost = df.loc[line_items, 'Updated Annual Cost'].sum()
+        total_subscription_term_fee = df.loc[line_items, 'Subscription Term Total Service Fee'].sum()
+    else:
+        total_subscription_term_fee = df.loc[line_items, 'Subscription Term Total Service Fee'].sum()
+        total_updated_annual_cost = df.loc[line_items, 'Updated Annual Cost'].sum()
+
+    return (df, total_current_cost, total_prepaid_cost, total_first_year_cost, total_updated_annual_cost,
+            total_subscription_term_fee)
+
+
+def random_quote(rng):
+    """A random quote; about a third of the unit fees end in a half cent."""
+    num_items = int(rng.integers(1, 13))
+    fees = rng.integers(100, 5_000_000, num_items) / 100
+    half_cent = rng.random(num_items) < 0.35
+    fees = np.where(half_cent, fees + 0.005, fees).round(3)
+    df = pd.DataFrame({
+        "Cloud Service Description": [f"Service {i}" for i in range(num_items)],
+        "Unit Quantity": rng.integers(0, 500, num_items),
+        "Annual Unit Fee": fees,
+        "Additional Licenses": rng.integers(0, 50, num_items),
+    })
+    agreement_term = int(rng.choice([12, 24, 36, 48, 60]))
+    months_remaining = float(round(rng.uniform(0, agreement_term), 2))
+    extension_months = int(rng.integers(0, 25))
+    return df, agreement_term, months_remaining, extension_months
+
+
+def assert_parity(df, agreement_term, months_remaining, extension_months, billing_term):
+    expected, *expected_totals = baseline_calculate_costs(df.copy(), agreement_term, months_remaining,
+                                                          extension_months, billing_term)
+    result = calculate_costs(df, agreement_term, months_remaining, extension_months, billing_term)
+
+    pd.testing.assert_frame_equal(result.to_frame(), expected, check_dtype=False, check_exact=True)
+    totals = [result.total_current_cost, result.total_prepaid_cost, result.total_first_year_cost,
+              result.total_updated_annual_cost, result.total_subscription_term_fee]
+    assert totals == expected_totals
+
+
+@pytest.mark.parametrize("billing_term", ["Annual", "Monthly", "Prepaid"])
+@pytest.mark.parametrize("seed", range(40))
+def test_random_quotes_match_baseline(billing_term, seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(5):
+        assert_parity(*random_quote(rng), billing_term)
+
+
+@pytest.mark.parametrize("billing_term", ["Annual", "Monthly", "Prepaid"])
+def test_half_cent_amounts_match_baseline(billing_term):
+    # Fees whose costs land exactly on, or a float's width from, a half cent
+    df = pd.DataFrame({
+        "Cloud Service Description": ["A", "B", "C", "D"],
+        "Unit Quantity": [1, 3, 7, 12],
+        "Annual Unit Fee": [0.125, 100.005, 2.675, 1.015],
+        "Additional Licenses": [1, 2, 5, 11],
+    })
+    assert_parity(df, 36, 20.5, 12, billing_term)
+
+
+def test_monthly_subscription_fee_uses_numpy_rounding():
+    # The baseline rounded the subscription fee NumPy-style (see conditional_round(exact=False))
+    rng = np.random.default_rng(1234)
+    mismatches = 0
+    for _ in range(300):
+        df, agreement_term, months_remaining, extension_months = random_quote(rng)
+        monthly = (df["Unit Quantity"] + df["Additional Licenses"]) * df["Annual Unit Fee"] / 12
+        products = conditional_round(monthly) * (months_remaining + extension_months)
+        mismatches += int((np.round(products, 2) != [round(float(p), 2) for p in products]).sum())
+        assert_parity(df, agreement_term, months_remaining, extension_months, "Monthly")
+    # The random quotes must actually reach cells where the two roundings differ
+    assert mismatches > 0
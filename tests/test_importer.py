@@ -0,0 +1,142 @@
+"""BOM import: column mapping, chunked reading and error paths; portfolio files for bulk mode."""
+import io
+
+import pandas as pd
+import pytest
+
+from coterm import (calculate_costs, combine_results, iter_bom_chunks, map_bom_columns, read_bom,
+                    read_portfolio, stream_bom_costs)
+from coterm.engine import LINE_ITEM_COLUMNS
+
+BOM_CSV = """Product Description,Qty,Unit Price ($),New Licenses,Notes
+Webex Suite,10,"$1,200.00",2,renewal
+Webex Calling, 25 ,147.96,,
+,,,,
+Webex Meetings,5,99.5,1,
+Webex Events,1,2500,0,
+"""
+
+EXPECTED = pd.DataFrame({
+    "Cloud Service Description": ["Webex Suite", "Webex Calling", "Webex Meetings", "Webex Events"],
+    "Unit Quantity": [10, 25, 5, 1],
+    "Annual Unit Fee": [1200.0, 147.96, 99.5, 2500.0],
+    "Additional Licenses": [2, 0, 1, 0],
+})
+
+
+def bom_file(text=BOM_CSV, name="bom.csv"):
+    source = io.BytesIO(text.encode())
+    source.name = name
+    return source
+
+
+def test_headers_are_matched_by_alias():
+    assert map_bom_columns(["Product Description", "Qty", "Unit Price ($)", "New Licenses", "Notes"]) == {
+        "Product Description": "Cloud Service Description",
+        "Qty": "Unit Quantity",
+        "Unit Price ($)": "Annual Unit Fee",
+        "New Licenses": "Additional Licenses",
+    }
+    # The first alias found wins, and Additional Licenses is optional
+    assert map_bom_columns(["Description", "Service", "Quantity", "License Cost"]) == {
+        "Description": "Cloud Service Description", "Quantity": "Unit Quantity", "License Cost": "Annual Unit Fee",
+    }
+
+
+def test_column_map_overrides_aliases():
+    mapping = map_bom_columns(["SKU Name", "Qty", "Price", "Cost"], {"SKU Name": "Cloud Service Description",
+                                                                      "Cost": "Annual Unit Fee"})
+    assert mapping == {"SKU Name": "Cloud Service Description", "Cost": "Annual Unit Fee", "Qty": "Unit Quantity"}
+
+
+@pytest.mark.parametrize("headers, column_map, message", [
+    (["Description", "Qty"], None, "Annual Unit Fee"),
+    (["Description", "Qty", "Price"], {"Price": "Discount"}, "unknown line-item columns"),
+])
+def test_bad_mappings_are_rejected(headers, column_map, message):
+    with pytest.raises(ValueError, match=message):
+        map_bom_columns(headers, column_map)
+
+
+def test_read_bom():
+    pd.testing.assert_frame_equal(read_bom(bom_file()), EXPECTED)
+
+
+def test_tsv_and_explicit_file_type():
+    tsv = BOM_CSV.replace('"$1,200.00"', "$1200.00").replace(",", "\t")
+    pd.testing.assert_frame_equal(read_bom(bom_file(tsv, "bom.txt")), EXPECTED)
+    pd.testing.assert_frame_equal(read_bom(bom_file(tsv, "upload"), file_type="tsv"), EXPECTED)
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 3, 100])
+def test_chunks_match_a_single_read(chunksize):
+    chunks = list(iter_bom_chunks(bom_file(), chunksize=chunksize))
+    assert all(len(chunk) <= chunksize for chunk in chunks)
+    # The row index continues across chunks
+    pd.testing.assert_frame_equal(pd.concat(chunks), EXPECTED)
+
+
+def test_streamed_costs_match_calculate_costs():
+    quote = (36, 20.5, 12, "Annual")
+    expected = calculate_costs(EXPECTED, *quote)
+    for keep_line_items in (True, False):
+        combined = combine_results(stream_bom_costs(bom_file(), *quote, chunksize=2), keep_line_items)
+        assert combined.total_subscription_term_fee == pytest.approx(expected.total_subscription_term_fee)
+        assert combined.total_first_year_cost == pytest.approx(expected.total_first_year_cost)
+        assert combined.totals == pytest.approx(expected.totals)
+        assert list(combined.totals) == list(expected.totals)
+        assert len(combined.line_items) == (len(EXPECTED) if keep_line_items else 0)
+
+
+def test_xlsx_is_read_in_chunks():
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Description", "Quantity", "Unit Fee", "Additional Licenses"])
+    for row in EXPECTED.itertuples(index=False):
+        sheet.append(list(row))
+    sheet.append([None, None, None, None])
+    source = io.BytesIO()
+    workbook.save(source)
+    source.name = "bom.xlsx"
+
+    chunks = list(iter_bom_chunks(source, chunksize=3))
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), EXPECTED)
+
+
+def test_empty_files_give_an_empty_table():
+    line_items = read_bom(bom_file("Description,Qty,Price\n"))
+    assert line_items.empty and list(line_items.columns) == LINE_ITEM_COLUMNS
+    with pytest.raises(ValueError, match="no line items"):
+        combine_results(stream_bom_costs(bom_file("Description,Qty,Price\n"), 36, 20.5, 0, "Annual"))
+
+
+@pytest.mark.parametrize("source, kwargs, message", [
+    (bom_file(name="bom.pdf"), {}, "Unsupported BOM file type 'pdf'"),
+    (bom_file(), {"chunksize": 0}, "chunksize"),
+    (bom_file("Name,Count\nA,1\n"), {}, "could not find columns"),
+])
+def test_import_errors(source, kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        read_bom(source, **kwargs)
+
+
+def test_read_portfolio_file_types(tmp_path):
+    portfolio = pd.DataFrame({"Agreement ID": ["AG-1"], "Agreement Start Date": [pd.Timestamp("2024-01-15")],
+                              "Co-Termed Start Date": [pd.Timestamp("2025-06-01")]})
+    path = tmp_path / "portfolio.csv"
+    portfolio.to_csv(path, index=False)
+    read = read_portfolio(str(path))
+    assert pd.api.types.is_datetime64_any_dtype(read["Agreement Start Date"])
+    with pytest.raises(ValueError, match="Unsupported input file type '.xlsx'"):
+        read_portfolio(str(tmp_path / "portfolio.xlsx"))
+
+
+def test_parquet_without_pyarrow_is_a_value_error(monkeypatch, tmp_path):
+    def read_parquet(path):
+        raise ImportError("Unable to find a usable engine")
+
+    monkeypatch.setattr(pd, "read_parquet", read_parquet)
+    with pytest.raises(ValueError, match="pyarrow"):
+        read_portfolio(str(tmp_path / "portfolio.parquet"))
@@ -0,0 +1,57 @@
+"""IncrementalCalculator must return what a full calculate_costs run returns."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from coterm import IncrementalCalculator, calculate_costs
+
+
+def quote(num_items=6):
+    return pd.DataFrame({
+        "Cloud Service Description": [f"Service {i}" for i in range(num_items)],
+        "Unit Quantity": np.arange(num_items, dtype=np.int64) + 7,
+        "Annual Unit Fee": 120.0 + 17.5 * np.arange(num_items),
+        "Additional Licenses": np.arange(num_items, dtype=np.int64) % 3,
+    })
+
+
+def assert_same_result(result, expected):
+    pd.testing.assert_frame_equal(result.line_items, expected.line_items, check_dtype=False)
+    assert result.totals.keys() == expected.totals.keys()
+    for col, value in expected.totals.items():
+        assert result.totals[col] == pytest.approx(value, abs=1e-6), col
+    assert result.total_subscription_term_fee == pytest.approx(expected.total_subscription_term_fee, abs=1e-6)
+
+
+@pytest.mark.parametrize("billing_term", ["Annual", "Monthly", "Prepaid"])
+def test_edits_match_full_recompute(billing_term):
+    calculator = IncrementalCalculator()
+    df = quote()
+    params = (36, 20.5, 12, billing_term)
+    calculator.calculate(df, *params)
+
+    edits = [
+        lambda df: df.assign(**{"Annual Unit Fee": df["Annual Unit Fee"].where(df.index != 2, 99.99)}),
+        lambda df: df.assign(**{"Cloud Service Description": df["Cloud Service Description"].where(df.index != 0, "X")}),
+        lambda df: pd.concat([df, quote(1).assign(**{"Cloud Service Description": "Added"})], ignore_index=True),
+        lambda df: df.iloc[:-2].reset_index(drop=True),
+    ]
+    for edit in edits:
+        df = edit(df)
+        assert_same_result(calculator.calculate(df, *params), calculate_costs(df, *params))
+    assert calculator.incremental_updates == len(edits)
+
+
+def test_fractional_quantity_widens_an_integer_column():
+    calculator = IncrementalCalculator()
+    df = quote()
+    calculator.calculate(df, 36, 20.5, 12, "Annual")
+
+    edited = df.astype({"Unit Quantity": float})
+    edited.loc[0, "Unit Quantity"] = 7.5
+    result = calculator.calculate(edited, 36, 20.5, 12, "Annual")
+
+    assert calculator.incremental_updates == 1
+    assert result.line_items.loc[0, "Unit Quantity"] == 7.5
+    assert result.totals["Unit Quantity"] == result.line_items["Unit Quantity"].sum()
+    assert_same_result(result, calculate_costs(edited, 36, 20.5, 12, "Annual"))
@@ -0,0 +1,136 @@
+"""Bulk report job queue: recovery of interrupted jobs and what a queue keeps in memory."""
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import zipfile
+
+import pandas as pd
+import pytest
+
+from coterm import BulkReportQueue, JobStatus, JobStore
+from coterm.jobs import FINISHED_STATES
+
+
+def saved_status(store, job_id, state, owner):
+    status = JobStatus(job_id, job_id, state, 10, 3, 0, None, time.time(), None, None, owner)
+    store.write_status(status)
+    return status
+
+
+@pytest.fixture
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_recovery_only_fails_jobs_of_dead_processes(tmp_path, dead_pid):
+    store = JobStore(str(tmp_path))
+    saved_status(store, "live", "running", os.getppid())
+    saved_status(store, "dead", "running", dead_pid)
+    saved_status(store, "legacy", "queued", None)
+    saved_status(store, "restarted", "running", os.getpid())  # A previous process with this PID
+    saved_status(store, "finished", "done", dead_pid)
+
+    queue = BulkReportQueue(str(tmp_path))
+    try:
+        states = {status.job_id: status.state for status in queue.statuses()}
+    finally:
+        queue.shutdown()
+    assert states == {"live": "running", "dead": "failed", "legacy": "failed", "restarted": "failed",
+                      "finished": "done"}
+
+
+def test_statuses_saved_without_an_owner_still_load(tmp_path):
+    store = JobStore(str(tmp_path))
+    status = saved_status(store, "old", "done", None)
+    fields = status._asdict()
+    del fields["owner"]
+    with open(os.path.join(store.job_dir("old"), "status.json"), "w", encoding="utf-8") as f:
+        json.dump(fields, f)
+    assert store.read_status("old") == status
+
+
+def make_portfolio(num_agreements):
+    agreements = [f"AG-{i}" for i in range(num_agreements) for _ in range(2)]
+    return pd.DataFrame({
+        "Agreement ID": agreements,
+        "Agreement Start Date": pd.Timestamp("2024-01-15"),
+        "Agreement Term": 36,
+        "Co-Termed Start Date": pd.Timestamp("2025-06-01"),
+        "Billing Term": [["Annual", "Monthly", "Prepaid"][i % 3] for i in range(len(agreements))],
+        "Cloud Service Description": ["Calling", "Meetings"] * num_agreements,
+        "Unit Quantity": 10,
+        "Annual Unit Fee": 147.96,
+        "Additional Licenses": 2,
+        "Extension Months": 0,
+    })
+
+
+def wait_for(queue, job_id, until=FINISHED_STATES, timeout=60):
+    deadline = time.time() + timeout
+    while queue.status(job_id).state not in until and time.time() < deadline:
+        time.sleep(0.02)
+    return queue.status(job_id)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = BulkReportQueue(str(tmp_path / "jobs"), workers=1, chunksize=1)
+    yield queue
+    queue.shutdown()
+
+
+def test_finished_jobs_are_only_kept_in_the_store(queue):
+    job_id = queue.submit(make_portfolio(2), include_chart=False)
+    status = wait_for(queue, job_id)
+    assert status.state == "done" and status.done == status.total == 2 and status.failed == 0
+    assert status.owner == os.getpid()
+    assert not queue._has_job(job_id)
+    assert [status.job_id for status in queue.statuses()] == [job_id]
+
+
+def test_progress_counts_failed_reports(queue):
+    # Far too little time for any report
+    job_id = queue.submit(make_portfolio(3), include_chart=False, emails=False, timeout=1e-5)
+    status = wait_for(queue, job_id)
+    assert (status.state, status.done, status.failed, status.message) == ("done", 3, 3, "3 reports failed")
+    with zipfile.ZipFile(status.output) as archive:
+        assert sorted(name for name in archive.namelist() if name.startswith("reports/")) == [
+            f"reports/AG-{i}.error.txt" for i in range(3)
+        ]
+
+
+def test_cancelling_a_running_job_leaves_a_valid_zip(queue):
+    job_id = queue.submit(make_portfolio(200), include_chart=False)
+    deadline = time.time() + 60
+    while queue.status(job_id).done < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert queue.cancel(job_id)
+    status = wait_for(queue, job_id)
+    assert status.state == "cancelled" and 2 <= status.done < status.total
+    assert not queue.cancel(job_id)
+    with zipfile.ZipFile(status.output) as archive:
+        assert archive.testzip() is None
+        names = archive.namelist()
+    assert {"line_items.csv", "agreement_totals.csv"} <= set(names)
+    # Every agreement counted as done is in the zip, and nothing else
+    assert sum(name.startswith("reports/") for name in names) == status.done
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs SIGKILL")
+def test_a_dead_worker_does_not_break_later_jobs(queue):
+    first = queue.submit(make_portfolio(2), include_chart=False)
+    assert wait_for(queue, first).state == "done"
+    broken = queue._executor
+    for pid in list(broken._processes):
+        os.kill(pid, signal.SIGKILL)  # As the OOM killer would
+    time.sleep(0.5)
+
+    second = queue.submit(make_portfolio(2), include_chart=False)
+    status = wait_for(queue, second)
+    assert status.state == "done" and status.done == 2
+    assert queue._executor is not broken
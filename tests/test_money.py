@@ -0,0 +1,162 @@
+"""
+Integer-cents mode: exact Fraction references, agreement with the float
+engine, and the money formatting helpers.
+"""
+import math
+from fractions import Fraction
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from coterm import calculate_costs, format_money
+from coterm.engine import COST_COLUMNS, TOTAL_SOURCES
+from coterm.money import conditional_round_cents, divide_round
+
+
+def round_half_away(value: Fraction) -> int:
+    whole = math.floor(abs(value) + Fraction(1, 2))
+    return whole if value >= 0 else -whole
+
+
+def conditional_round_exact(cents: Fraction) -> int:
+    """conditional_round on an exact amount in cents: within 25 cents of a dollar rounds to the dollar."""
+    whole_dollars = round_half_away(cents / 100)
+    if abs(cents - 100 * whole_dollars) < 25:
+        return 100 * whole_dollars
+    return round_half_away(cents)
+
+
+def reference_cost_columns(quantity, fee_cents, additional, agreement_term, months_remaining, extension_months,
+                           billing_term):
+    """One line item's cost columns in cents, from exact fractions."""
+    months = Fraction(round(months_remaining * 100), 100)
+    total_term = months + extension_months
+    new_annual_cost = (quantity + additional) * fee_cents
+    columns = {
+        "Current Monthly Cost": round_half_away(Fraction(fee_cents * quantity, 12)),
+        "Current Annual Cost": quantity * fee_cents,
+        "Updated Annual Cost": new_annual_cost,
+    }
+    if billing_term == "Monthly":
+        fractional_month = months % 1
+        factor = fractional_month if fractional_month > 0 else 1
+        columns["First Month Co-Termed Cost"] = conditional_round_exact(additional * fee_cents * factor / 12)
+        new_monthly_cost = conditional_round_exact(Fraction(new_annual_cost, 12))
+        columns["Monthly Co-Termed Cost"] = new_monthly_cost
+        columns["New Monthly Cost"] = new_monthly_cost
+        columns["Subscription Term Total Service Fee"] = conditional_round_exact(new_monthly_cost * total_term)
+    elif billing_term == "Annual":
+        columns["First Year Co-Termed Cost"] = conditional_round_exact(
+            additional * fee_cents * (12 - (agreement_term - months) % 12) / 12
+        )
+        columns["Subscription Term Total Service Fee"] = conditional_round_exact(new_annual_cost * total_term / 12)
+    else:
+        current_prepaid_cost = conditional_round_exact(Fraction(fee_cents * quantity))
+        prepaid_co_termed_cost = conditional_round_exact(fee_cents * months * additional / agreement_term)
+        columns["Current Prepaid Cost"] = current_prepaid_cost
+        columns["Prepaid Co-Termed Cost"] = prepaid_co_termed_cost
+        columns["Remaining Subscription Total"] = current_prepaid_cost + prepaid_co_termed_cost
+    return columns
+
+
+def random_quote(rng):
+    num_items = int(rng.integers(1, 12))
+    df = pd.DataFrame({
+        "Cloud Service Description": [f"Service {i}" for i in range(num_items)],
+        "Unit Quantity": rng.integers(0, 900, num_items),
+        "Annual Unit Fee": rng.integers(0, 500_000, num_items) / 100,
+        "Additional Licenses": rng.integers(0, 60, num_items),
+    })
+    agreement_term = int(rng.choice([12, 24, 36, 60]))
+    months_remaining = float(round(rng.uniform(0, agreement_term), 2))
+    extension_months = int(rng.choice([0, 6, 12]))
+    return df, agreement_term, months_remaining, extension_months
+
+
+@pytest.mark.parametrize("billing_term", ["Annual", "Monthly", "Prepaid"])
+@pytest.mark.parametrize("seed", range(20))
+def test_cents_match_exact_fractions(billing_term, seed):
+    df, agreement_term, months_remaining, extension_months = random_quote(np.random.default_rng(seed))
+    result = calculate_costs(df, agreement_term, months_remaining, extension_months, billing_term,
+                             integer_cents=True)
+    assert result.in_cents
+    line_items = result.line_items
+    for col in ["Annual Unit Fee"] + COST_COLUMNS[billing_term]:
+        assert line_items[col].dtype == np.int64, col
+
+    for i, row in df.iterrows():
+        expected = reference_cost_columns(int(row["Unit Quantity"]), round(row["Annual Unit Fee"] * 100),
+                                          int(row["Additional Licenses"]), agreement_term, months_remaining,
+                                          extension_months, billing_term)
+        assert {col: int(line_items.loc[i, col]) for col in expected} == expected
+
+    # Totals are exact integer sums of the line items
+    for total, source in TOTAL_SOURCES[billing_term].items():
+        if source is not None:
+            assert result.totals.get(source, line_items[source].sum()) == line_items[source].sum()
+    assert result.total_current_cost == line_items[TOTAL_SOURCES[billing_term]["Total Current Cost"]].sum()
+
+
+@pytest.mark.parametrize("billing_term", ["Annual", "Monthly", "Prepaid"])
+def test_cents_agree_with_float_engine(billing_term):
+    rng = np.random.default_rng(99)
+    for _ in range(60):
+        df, agreement_term, months_remaining, extension_months = random_quote(rng)
+        floats = calculate_costs(df, agreement_term, months_remaining, extension_months, billing_term)
+        cents = calculate_costs(df, agreement_term, months_remaining, extension_months, billing_term,
+                                integer_cents=True)
+        for col in COST_COLUMNS[billing_term]:
+            exact = cents.line_items[col].to_numpy()
+            difference = np.abs(exact / 100 - floats.line_items[col].to_numpy())
+            # Both round to the cent, but the float engine rounds a value a float's width from the exact
+            # one, so a half cent can go the other way
+            tolerance = 0.01 + 1e-6
+            if billing_term == "Monthly" and col == "Subscription Term Total Service Fee":
+                # Multiplies out the monthly cost, which may already differ by the rules above
+                monthly = np.abs(cents.line_items["New Monthly Cost"].to_numpy() / 100
+                                 - floats.line_items["New Monthly Cost"].to_numpy())
+                tolerance = tolerance + monthly * (months_remaining + extension_months)
+            # An amount about 25 cents from a dollar can fall on either side of conditional_round's
+            # whole-dollar threshold, so one engine snaps it to the dollar and the other doesn't
+            snapped = (exact % 100 == 0) | (floats.line_items[col].to_numpy() % 1 == 0)
+            assert np.all((difference <= tolerance) | (snapped & (difference <= tolerance + 0.25))), \
+                (col, difference.max())
+
+
+def test_divide_round_halves_away_from_zero():
+    np.testing.assert_array_equal(divide_round(np.array([5, -5, 4, -4, 6, 15, -15]), 10), [1, -1, 0, 0, 1, 2, -2])
+    # 1,075 / 1 cents is $10.75: not within 25 cents of a dollar, so it stays; 1,076 is near $11
+    np.testing.assert_array_equal(conditional_round_cents(np.array([1075, 1076, -1076, 1024]), 1),
+                                  [1075, 1100, -1100, 1000])
+
+
+@pytest.mark.parametrize("value, in_cents, expected", [
+    (0, True, "$0.00"),
+    (5, True, "$0.05"),
+    (-5, True, "$-0.05"),
+    (123456789, True, "$1,234,567.89"),
+    (np.int64(-100), True, "$-1.00"),
+    (12.5, True, "$0.13"),
+    (-12.5, True, "$-0.13"),
+    (-0.4, True, "$0.00"),
+    (1234.4999, True, "$12.34"),
+    (float("nan"), True, "$nan"),
+    (1234.5, False, "$1,234.50"),
+    (-1234.5, False, "$-1,234.50"),
+])
+def test_format_money(value, in_cents, expected):
+    assert format_money(value, in_cents) == expected
+
+
+def test_overflow_is_refused():
+    df = pd.DataFrame({
+        "Cloud Service Description": ["Huge"],
+        "Unit Quantity": [10 ** 9],
+        "Annual Unit Fee": [10.0 ** 9],
+        "Additional Licenses": [0],
+    })
+    with pytest.raises(OverflowError):
+        calculate_costs(df, 36, 20.5, 12, "Annual", integer_cents=True)
+    # The same quote scaled down fits
+    calculate_costs(df.assign(**{"Unit Quantity": 10 ** 4}), 36, 20.5, 12, "Annual", integer_cents=True)
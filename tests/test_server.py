@@ -0,0 +1,110 @@
+"""JSON API: request validation and the PDF cache key."""
+import http.client
+import json
+import threading
+from datetime import date
+
+import pytest
+
+import coterm.server
+from coterm import report_cache
+from coterm.server import CotermHTTPServer, months_remaining_endpoint, parse_quote, pdf_endpoint
+
+QUOTE = {
+    "line_items": [{"description": "Webex Suite", "quantity": 10, "annual_unit_fee": 147.96,
+                    "additional_licenses": 2}],
+    "agreement_term": 36,
+    "months_remaining": 20.5,
+    "billing_term": "Annual",
+}
+
+
+@pytest.fixture
+def api():
+    server = CotermHTTPServer(("127.0.0.1", 0), workers=1, access_log=False)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    connection = http.client.HTTPConnection(*server.server_address[:2])
+
+    def post(path, body):
+        connection.request("POST", path, json.dumps(body), {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    yield post
+    connection.close()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("co_termed_start_date", [None, "", "junk", "2025-13-45", 20250601])
+def test_bad_dates_are_rejected(co_termed_start_date):
+    body = {"co_termed_start_date": co_termed_start_date, "agreement_start_date": "2024-01-15", "agreement_term": 36}
+    with pytest.raises(ValueError, match="co_termed_start_date"):
+        months_remaining_endpoint(body)
+    quote = {key: value for key, value in QUOTE.items() if key != "months_remaining"}
+    with pytest.raises(ValueError, match="co_termed_start_date"):
+        parse_quote(dict(quote, co_termed_start_date=co_termed_start_date, agreement_start_date="2024-01-15"))
+
+
+@pytest.mark.parametrize("months_remaining", [float("nan"), float("inf")])
+def test_non_finite_months_are_rejected(months_remaining):
+    with pytest.raises(ValueError, match="months_remaining"):
+        parse_quote(dict(QUOTE, months_remaining=months_remaining))
+
+
+@pytest.mark.parametrize("field, value", [
+    ("agreement_term", 0),
+    ("agreement_term", -12),
+    ("agreement_term", None),
+    ("agreement_term", float("inf")),
+    ("extension_months", -1),
+    ("extension_months", "twelve"),
+    ("months_remaining", -0.5),
+])
+def test_out_of_range_terms_are_rejected(field, value):
+    with pytest.raises(ValueError, match=field):
+        parse_quote(dict(QUOTE, **{field: value}))
+
+
+def test_months_remaining_needs_a_positive_term():
+    body = {"co_termed_start_date": "2025-06-01", "agreement_start_date": "2024-01-15", "agreement_term": 0}
+    with pytest.raises(ValueError, match="agreement_term"):
+        months_remaining_endpoint(body)
+    # Zero months left and no extension are fine
+    assert parse_quote(dict(QUOTE, months_remaining=0, extension_months=0))[2:4] == (0.0, 0)
+
+
+def test_bad_input_is_a_400(api):
+    status, response = api("/v1/months-remaining", {"co_termed_start_date": None,
+                                                    "agreement_start_date": "2024-01-15", "agreement_term": 36})
+    assert status == 400 and "co_termed_start_date" in response["error"]
+    # json.dumps writes NaN, which json.loads reads back
+    status, response = api("/v1/calculate", dict(QUOTE, months_remaining=float("nan")))
+    assert status == 400 and "months_remaining" in response["error"]
+    # A zero term used to divide by zero and answer with Infinity, which isn't JSON
+    for integer_cents in (False, True):
+        status, response = api("/v1/calculate", dict(QUOTE, agreement_term=0, billing_term="Prepaid",
+                                                     integer_cents=integer_cents))
+        assert status == 400 and "agreement_term" in response["error"]
+    status, response = api("/v1/months-remaining", {"co_termed_start_date": "2025-06-01",
+                                                    "agreement_start_date": "2024-01-15", "agreement_term": 36})
+    assert status == 200 and response["months_remaining"] > 0
+
+
+def test_pdf_cache_is_per_day(monkeypatch):
+    class FixedDate:
+        day = date(2026, 1, 1)
+
+        @classmethod
+        def today(cls):
+            return cls.day
+
+    monkeypatch.setattr(coterm.server, "date", FixedDate)
+    quote = dict(QUOTE, include_chart=False)
+    first = pdf_endpoint(quote)
+    misses = report_cache.misses
+    assert pdf_endpoint(quote) == first and report_cache.misses == misses
+    # The report is dated, so the next day renders it again
+    FixedDate.day = date(2026, 1, 2)
+    pdf_endpoint(quote)
+    assert report_cache.misses == misses + 1
@@ -0,0 +1,44 @@
+"""Scenario sweeps: every cell of the grid against a single calculate_costs run."""
+import pandas as pd
+import pytest
+
+from coterm import calculate_costs, co_termed_months_remaining, sweep_scenarios
+from coterm.engine import BILLING_TERMS, TOTAL_COLUMNS
+
+LINE_ITEMS = pd.DataFrame({
+    "Cloud Service Description": ["Webex Suite", "Webex Calling", "Webex Meetings"],
+    "Unit Quantity": [10, 25, 7],
+    "Annual Unit Fee": [1200.0, 147.965, 2.675],
+    "Additional Licenses": [2, 0, 5],
+})
+
+AGREEMENT_START = pd.Timestamp("2024-01-31")
+CO_TERMED_DATES = pd.to_datetime(["2024-02-29", "2025-06-01", "2025-12-31", "2026-11-15"])
+EXTENSIONS = [0, 6, 12, 24]
+
+
+def headline_totals(result):
+    return [result.total_current_cost, result.total_prepaid_cost, result.total_first_year_cost,
+            result.total_updated_annual_cost, result.total_subscription_term_fee]
+
+
+@pytest.mark.parametrize("convention", ["30.44", "calendar", "30/360"])
+@pytest.mark.parametrize("billing_term", BILLING_TERMS)
+def test_every_sweep_cell_matches_calculate_costs(billing_term, convention):
+    scenarios = sweep_scenarios(LINE_ITEMS, AGREEMENT_START, 36, CO_TERMED_DATES, EXTENSIONS, billing_term,
+                                convention)
+    assert len(scenarios) == len(CO_TERMED_DATES) * len(EXTENSIONS)
+
+    for row in scenarios.itertuples(index=False):
+        co_termed_date, extension, months_remaining = row[:3]
+        assert months_remaining == co_termed_months_remaining(
+            [co_termed_date], [AGREEMENT_START], [36], convention)[0]
+        expected = calculate_costs(LINE_ITEMS, 36, months_remaining, extension, billing_term)
+        assert list(row[3:]) == headline_totals(expected), (co_termed_date, extension)
+    assert list(scenarios.columns[3:]) == TOTAL_COLUMNS
+
+
+def test_sweep_rejects_unknown_billing_terms():
+    with pytest.raises(ValueError, match="Quarterly"):
+        sweep_scenarios(LINE_ITEMS, AGREEMENT_START, 36, CO_TERMED_DATES, EXTENSIONS, "Quarterly")
+